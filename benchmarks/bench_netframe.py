@@ -0,0 +1,209 @@
+"""
+Benchmarks for NetFrame build, attribute, join and export paths
+
+Run from the repository root, every size of the synthetic frame is configurable:
+
+    python benchmarks/bench_netframe.py --rows 1000000 --cardinality 100000 --repeat 3
+
+Wall time is the best of --repeat runs, peak memory is traced by tracemalloc on
+one extra run so tracing never slows down the timed ones.
+
+"""
+
+from typing import Callable, List
+import argparse
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from netrunner.netframe import NetFrame  # noqa: E402
+
+
+def make_frame(rows: int = 100000, node_columns: int = 3, cardinality: int = 10000, attributes: int = 2,
+               nan_ratio: float = 0.05, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic frame of string node columns and float attribute columns
+
+    :param rows: int
+    :param node_columns: int
+        node_0 ... node_n, linked as a chain
+    :param cardinality: int
+        distinct labels per node column
+    :param attributes: int
+        attr_0 ... attr_n
+    :param nan_ratio: float
+        share of missing values in every column
+    :param seed: int
+    :return: DataFrame
+    """
+
+    rng = np.random.default_rng(seed)
+    data = dict()
+
+    for i in range(node_columns):
+        labels = pd.Index([f'n{i}_{code}' for code in range(cardinality)], dtype=object)
+        data[f'node_{i}'] = labels[rng.integers(0, cardinality, rows)].to_numpy(copy=True)
+        data[f'node_{i}'][rng.random(rows) < nan_ratio] = None
+
+    for i in range(attributes):
+        data[f'attr_{i}'] = np.where(rng.random(rows) < nan_ratio, np.nan, rng.random(rows))
+
+    return pd.DataFrame(data)
+
+
+def make_map(node_columns: int = 3, attributes: int = 2) -> dict:
+    """
+    Network map over a synthetic frame, attributes go on the first node column and the first link
+
+    :param node_columns: int
+    :param attributes: int
+    :return: dict
+    """
+
+    nodes = [f'node_{i}' for i in range(node_columns)]
+    links = list(zip(nodes[:-1], nodes[1:]))
+    attribute_cols = [f'attr_{i}' for i in range(attributes)]
+
+    return {'nodes': nodes, 'links': links,
+            'node_attributes': {nodes[0]: attribute_cols} if attribute_cols else None,
+            'edge_attributes': {links[0]: attribute_cols} if attribute_cols and links else None}
+
+
+def _built(frame: pd.DataFrame, network_map: dict) -> NetFrame:
+    return NetFrame(frame, **network_map)
+
+
+def _with_nodes(frame: pd.DataFrame, network_map: dict) -> NetFrame:
+    netframe = NetFrame(frame)
+    netframe.add_nodes(network_map['nodes'])
+    netframe.add_edges(network_map['links'])
+    return netframe
+
+
+def cases(frame: pd.DataFrame, network_map: dict) -> dict:
+    """
+    Benchmark cases as name -> (setup, run), only run is measured
+
+    :param frame: DataFrame
+    :param network_map: dict
+    :return: dict
+    """
+
+    half = len(frame) // 2
+
+    def appended():
+        netframe = _built(frame.iloc[:half], network_map)
+        netframe.frame = frame
+        return netframe
+
+    def joined():
+        return _built(frame.iloc[:half], network_map), _built(frame.iloc[half:], network_map)
+
+    def json_stream(netframe):
+        with open(os.devnull, 'w') as devnull:
+            netframe.to_json_stream(devnull)
+
+    return {
+        'build': (lambda: None, lambda _: _built(frame, network_map)),
+        'add_nodes': (lambda: NetFrame(frame), lambda netframe: netframe.add_nodes(network_map['nodes'])),
+        'add_edges': (lambda: NetFrame(frame), lambda netframe: netframe.add_edges(network_map['links'])),
+        'set_node_attributes': (lambda: _with_nodes(frame, network_map),
+                                lambda netframe: netframe.set_node_attributes(network_map['node_attributes'] or {})),
+        'set_edge_attributes': (lambda: _with_nodes(frame, network_map),
+                                lambda netframe: netframe.set_edge_attributes(network_map['edge_attributes'] or {})),
+        'populate_network': (lambda: _built(frame, network_map), lambda netframe: netframe.populate_network()),
+        'join_graph': (joined, lambda pair: pair[0].join_graph(pair[1])),
+        'apply_dataframe': (lambda: _built(frame, network_map), lambda netframe: netframe.apply_dataframe()),
+        'apply_dataframe_incremental': (appended, lambda netframe: netframe.apply_dataframe(incremental=True)),
+        'to_json': (lambda: _built(frame, network_map), lambda netframe: json.dump(netframe.to_json(), io.StringIO())),
+        'to_json_stream': (lambda: _built(frame, network_map), json_stream),
+    }
+
+
+def measure(setup: Callable, run: Callable, repeat: int = 3) -> dict:
+    """
+    Best wall time over repeat runs and the traced peak memory of one more
+
+    :param setup: Callable
+        builds the state run works on, not measured
+    :param run: Callable
+    :param repeat: int
+    :return: dict with seconds and peak_mb
+    """
+
+    times = list()
+
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+
+    state = setup()
+    tracemalloc.start()
+    run(state)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'seconds': min(times), 'peak_mb': peak / 2 ** 20}
+
+
+def run_benchmarks(rows: int = 100000, node_columns: int = 3, cardinality: int = 10000, attributes: int = 2,
+                   nan_ratio: float = 0.05, repeat: int = 3, only: List[str] = None, seed: int = 0) -> list:
+    """
+    Measure every case on one synthetic frame
+
+    :return: list of result dicts
+    """
+
+    frame = make_frame(rows, node_columns, cardinality, attributes, nan_ratio, seed)
+    network_map = make_map(node_columns, attributes)
+    results = list()
+
+    for name, (setup, run) in cases(frame, network_map).items():
+
+        if only and name not in only:
+            continue
+
+        results.append({'case': name, 'rows': rows, **measure(setup, run, repeat)})
+
+    return results
+
+
+def main(argv: List[str] = None) -> None:
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--node-columns', type=int, default=3)
+    parser.add_argument('--cardinality', type=int, default=10000)
+    parser.add_argument('--attributes', type=int, default=2)
+    parser.add_argument('--nan-ratio', type=float, default=0.05)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='*', help='case names to run, defaults to all')
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.rows, args.node_columns, args.cardinality, args.attributes, args.nan_ratio,
+                             args.repeat, args.only, args.seed)
+
+    print(f'{"case":<30}{"rows":>12}{"seconds":>12}{"peak MB":>12}')
+
+    for result in results:
+        print(f'{result["case"]:<30}{result["rows"]:>12}{result["seconds"]:>12.4f}{result["peak_mb"]:>12.1f}')
+
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ Access Netrunner from top level init
 """
 
 from netrunner.netframe import NetFrame, DataFrame
+from netrunner.batch import run_many
 from netrunner.utils import evaluate_draw
 from typing import List, Tuple
 
@@ -23,6 +24,8 @@ def run(df: DataFrame,
     :param links:
         list of tuples acting as source / target mappings
     :param params:
+        other NetFrame parameters, n_jobs and executor spread extraction over a thread or process pool,
+        cache reuses builds of the same columns and map from a BuildCache
     :return: Netframe
     """
 
@@ -0,0 +1,155 @@
+"""
+Arrow and Parquet input for NetFrame.from_arrow / from_parquet
+
+Only the columns a network map reads are loaded, rows that cannot produce a node
+or an edge are filtered out while reading, and node columns arrive dictionary
+encoded so extraction factorizes integer codes instead of strings.
+
+"""
+
+from itertools import chain
+from pandas.core.frame import DataFrame
+from typing import Iterable, Iterator, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+except ImportError:
+    pa = None
+
+
+def require_arrow() -> None:
+
+    if pa is None:
+        raise ImportError('Arrow input needs pyarrow, install it with pip install netrunner[arrow]')
+
+
+def null_filter(nodes: list = None, links: list = None):
+    """
+    Rows holding a node, or both ends of a link, every other row contributes nothing to the maps
+
+    :param nodes: list
+    :param links: list
+    :return: pyarrow.dataset.Expression, None without nodes or links
+    """
+
+    require_arrow()
+    conditions = [ds.field(col).is_valid() for col in nodes or []]
+    conditions += [ds.field(source).is_valid() & ds.field(target).is_valid() for source, target in links or []]
+
+    if not conditions:
+        return None
+
+    condition = conditions[0]
+
+    for other in conditions[1:]:
+        condition = condition | other
+
+    return condition
+
+
+def dictionary_encode(batch, columns: List[str]):
+    """
+    Dictionary encode string key columns, values are hashed once in Arrow and pandas only sees codes
+
+    :param batch: pyarrow.RecordBatch
+    :param columns: list
+    :return: pyarrow.RecordBatch
+    """
+
+    arrays = list()
+
+    for name, array in zip(batch.schema.names, batch.columns):
+        if name in columns and (pa.types.is_string(array.type) or pa.types.is_large_string(array.type)
+                                or pa.types.is_binary(array.type)):
+            array = pc.dictionary_encode(array)
+
+        arrays.append(array)
+
+    return pa.RecordBatch.from_arrays(arrays, names=batch.schema.names)
+
+
+def arrow_batches(source, columns: List[str], condition=None, batch_size: int = 1000000) -> Iterator:
+    """
+    Record batches of the given columns, filtered while reading
+
+    :param source: pyarrow Table, RecordBatch, RecordBatchReader, Dataset or an iterable of RecordBatches
+    :param columns: list
+    :param condition: pyarrow.dataset.Expression
+    :param batch_size: int
+        rows per batch
+    :return: Iterator of RecordBatches
+    """
+
+    require_arrow()
+
+    if isinstance(source, pa.RecordBatch):
+        source = pa.Table.from_batches([source])
+
+    if isinstance(source, pa.Table):
+        source = ds.dataset(source)
+
+    if isinstance(source, ds.Dataset):
+        return source.to_batches(columns=columns, filter=condition, batch_size=batch_size)
+
+    # readers and generators are scanned as they arrive, the schema comes from the first batch
+    if not isinstance(source, pa.RecordBatchReader):
+        batches = iter(source)
+        first = next(batches, None)
+
+        if first is None:
+            return iter([])
+
+        source = pa.RecordBatchReader.from_batches(first.schema, chain([first], batches))
+
+    return ds.Scanner.from_batches(source, columns=columns, filter=condition, batch_size=batch_size).to_batches()
+
+
+def parquet_dataset(path, dictionary_columns: List[str] = None, **dataset_params):
+    """
+    Parquet file or directory as a dataset, dictionary_columns are read as dictionaries without decoding
+
+    :param path: file, directory or list of files
+    :param dictionary_columns: list
+    :param dataset_params: extra pyarrow.dataset.dataset parameters such as partitioning or filesystem
+    :return: pyarrow.dataset.Dataset
+    """
+
+    require_arrow()
+    parquet = ds.ParquetFileFormat(read_options=ds.ParquetReadOptions(dictionary_columns=dictionary_columns or []))
+
+    return ds.dataset(path, format=parquet, **dataset_params)
+
+
+def batch_frames(batches: Iterable, keys: List[str]) -> Iterator[DataFrame]:
+    """
+    DataFrame per record batch, key columns become categoricals over their dictionaries
+
+    :param batches: Iterable of RecordBatches
+    :param keys: list
+        node and link columns
+    :return: Iterator[DataFrame]
+    """
+
+    for batch in batches:
+        if batch.num_rows:
+            yield dictionary_encode(batch, keys).to_pandas()
+
+
+def batches_frame(batches: List) -> DataFrame:
+    """
+    One DataFrame of record batches with the column types pyarrow converts to by default, dictionary
+    columns are decoded first so they come out as their values rather than categoricals
+
+    :param batches: list of RecordBatches
+    :return: DataFrame
+    """
+
+    table = pa.Table.from_batches(batches)
+
+    for i, field in enumerate(table.schema):
+        if pa.types.is_dictionary(field.type):
+            table = table.set_column(i, field.name, pc.cast(table.column(i), field.type.value_type))
+
+    return table.to_pandas()
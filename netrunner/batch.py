@@ -0,0 +1,120 @@
+"""
+Build several NetFrames from shared frames in one planned pass
+
+Node and link columns read by more than one map are factorized once into a
+categorical view of their frame sharing one dictionary, every map over that
+frame then extracts from integer codes. Maps are built concurrently and can be joined into one NetFrame
+without rebuilding any of them.
+
+"""
+
+from concurrent.futures import Executor
+from netrunner.netframe import NetFrame
+from netrunner.utils import map_columns, parallel_map, shared_categories
+from pandas.core.frame import DataFrame
+from typing import Dict, List, Tuple, Union
+
+
+def shared_columns(entries: List[Tuple[DataFrame, dict]]) -> Dict[int, List[str]]:
+    """
+    Node and link columns read by more than one map, per frame
+
+    :param entries: list of (DataFrame, map)
+    :return: dict of frame id to columns
+    """
+
+    uses = dict()
+
+    for frame, network_map in entries:
+        for col in map_columns(network_map.get('nodes'), network_map.get('links')):
+            uses[(id(frame), col)] = uses.get((id(frame), col), 0) + 1
+
+    shared = dict()
+
+    for (frame_id, col), count in uses.items():
+        if count > 1:
+            shared.setdefault(frame_id, list()).append(col)
+
+    return shared
+
+
+def encoded_views(entries: List[Tuple[DataFrame, dict]]) -> Dict[int, DataFrame]:
+    """
+    Frame per id with its shared columns factorized once into shared categoricals, other frames are used as is
+
+    :param entries: list of (DataFrame, map)
+    :return: dict of frame id to DataFrame
+    """
+
+    views = {id(frame): frame for frame, _ in entries}
+
+    for frame_id, cols in shared_columns(entries).items():
+        views[frame_id] = shared_categories(views[frame_id], cols)
+
+    return views
+
+
+def build_map(frame: DataFrame, view: DataFrame, network_map: dict, params: dict) -> NetFrame:
+    """
+    Build one NetFrame from a view of frame, frame is what the NetFrame keeps
+
+    :param frame: DataFrame
+    :param view: DataFrame
+        frame with shared columns encoded
+    :param network_map: dict
+        nodes, links, node_attributes, edge_attributes and optional NetFrame parameters
+    :param params: dict
+        NetFrame parameters shared by every map
+    :return: NetFrame
+    """
+
+    netframe = NetFrame(view, **{**params, **network_map})
+
+    # extraction read the view, incremental updates and rebuilds read the original frame
+    netframe.frame = frame
+    netframe._mark_built()
+
+    return netframe
+
+
+def run_many(entries: List[Tuple[DataFrame, dict]], merge: bool = False, conflict: str = 'replace',
+             n_jobs: int = -1, executor: Union[str, Executor] = 'thread',
+             **params) -> Union[List[NetFrame], NetFrame]:
+    """
+    Build a NetFrame per (DataFrame, map) entry, columns shared between maps over the same frame
+    are factorized once and maps are built concurrently
+
+    :param entries: list of (DataFrame, map)
+        maps hold nodes, links, node_attributes and edge_attributes, other keys are NetFrame parameters
+    :param merge: bool
+        join every NetFrame into the first one, in entry order
+    :param conflict: str
+        attribute values set by more than one map when merging, see NetFrame.join_graph
+    :param n_jobs: int
+        maps built at once, -1 uses every core
+    :param executor: str or Executor
+        'thread', 'process' or an existing concurrent.futures Executor
+    :param params: NetFrame parameters shared by every map
+    :return: list of NetFrames in entry order, or one NetFrame when merge is set
+    """
+
+    entries = [(frame, dict(network_map)) for frame, network_map in entries]
+    views = encoded_views(entries)
+    netframes = parallel_map(build_map, [(frame, views[id(frame)], network_map, params)
+                                         for frame, network_map in entries], n_jobs, executor)
+
+    if not merge or not netframes:
+        return netframes
+
+    merged = netframes[0]
+
+    for netframe in netframes[1:]:
+        merged.join_graph(netframe, conflict)
+
+    # a rebuild can only replay every map when they all read the same frame
+    if any(frame is not entries[0][0] for frame, _ in entries):
+        merged.frame = None
+
+    merged._mark_built()
+
+    return merged
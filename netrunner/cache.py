@@ -0,0 +1,180 @@
+"""
+Content addressed, on-disk cache of built NetFrames
+
+Entries are keyed by a hash of the mapped DataFrame columns and the network
+map, stored with NetFrame.save and evicted least recently used first once
+the cache grows past its size limit.
+
+"""
+
+from netrunner.store import FORMAT_VERSION, hash_values
+from netrunner.utils import map_columns
+from pandas.core.frame import DataFrame
+from typing import List, Union
+import hashlib
+import json
+import numpy as np
+import os
+import pandas as pd
+import shutil
+
+
+class BuildCache:
+    """
+    Local cache of built stores, shared by every process pointing at the same directory
+
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 2 ** 30, allow_pickle: bool = True) -> None:
+        self.path = path or os.path.join(os.path.expanduser('~'), '.cache', 'netrunner')
+        self.max_bytes = max_bytes
+
+        # entries holding pickled attributes are only read when the directory is trusted, False rebuilds them
+        self.allow_pickle = allow_pickle
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def key(dataframe: DataFrame, nodes: list = None, links: list = None, ignore_chars: str = None,
+            node_attributes: dict = None, edge_attributes: dict = None, aggregate: Union[str, dict] = 'last',
+            weight: str = None, multigraph: bool = False) -> str:
+        """
+        Fingerprint of the columns a map reads and the map itself, row order included
+
+        :param dataframe: DataFrame
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param aggregate: str or dict
+        :param weight: str
+            edge attribute carrying row counts
+        :param multigraph: bool
+        :return: str
+        """
+
+        columns = map_columns(nodes, links, node_attributes, edge_attributes)
+        definition = {
+            'format': FORMAT_VERSION,
+            'nodes': list(nodes or []),
+            'links': [list(link) for link in links or []],
+            'node_attributes': [[col, list(attributes)] for col, attributes in (node_attributes or {}).items()],
+            'edge_attributes': [[list(link), list(attributes)] for link, attributes in (edge_attributes or {}).items()],
+            'ignore_chars': ignore_chars,
+            'aggregate': aggregate,
+            'weight': weight,
+            'multigraph': multigraph,
+            'dtypes': [str(dataframe[col].dtype) for col in columns],
+        }
+
+        digest = hashlib.sha256(json.dumps(definition, default=str).encode())
+
+        for col in columns:
+            series = dataframe[col]
+            values = series.cat.categories if isinstance(series.dtype, pd.CategoricalDtype) else series
+
+            # pandas hashes objects through str, which tells neither 1 from '1' nor hashes lists
+            if values.dtype == object:
+                hashes = hash_values(np.asarray(series, dtype=object))
+            else:
+                hashes = pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+            digest.update(hashes.tobytes())
+
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def _entries(self) -> List[str]:
+        return [os.path.join(self.path, name) for name in os.listdir(self.path) if '.tmp' not in name]
+
+    @staticmethod
+    def _size(entry: str) -> int:
+        return sum(os.path.getsize(os.path.join(entry, name)) for name in os.listdir(entry))
+
+    def get(self, key: str) -> str:
+        """
+        Directory of a cached build, None on a miss
+
+        :param key: str
+        :return: str
+        """
+
+        entry = self._entry(key)
+
+        if os.path.exists(os.path.join(entry, 'netframe.json')):
+            self.hits += 1
+
+            # recency for eviction is the entry mtime
+            os.utime(entry)
+
+            return entry
+
+        self.misses += 1
+
+        return None
+
+    def put(self, key: str, netframe) -> str:
+        """
+        Save a built NetFrame under key and evict old entries past max_bytes
+
+        :param key: str
+        :param netframe: NetFrame
+        :return: str
+        """
+
+        entry = self._entry(key)
+        staging = f'{entry}.tmp{os.getpid()}'
+
+        # write aside and rename so readers never see half an entry
+        netframe.save(staging)
+
+        try:
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+        return entry
+
+    def evict(self) -> None:
+        """
+        Drop least recently used entries until the cache fits in max_bytes
+
+        """
+
+        entries = sorted(self._entries(), key=os.path.getmtime)
+        sizes = [self._size(entry) for entry in entries]
+        total = sum(sizes)
+
+        for entry, size in zip(entries, sizes):
+
+            if total <= self.max_bytes:
+                break
+
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    @property
+    def stats(self) -> dict:
+        """
+        Hit / miss counts of this instance and the current size on disk
+
+        :return: dict
+        """
+
+        entries = self._entries()
+
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': len(entries), 'bytes': sum(self._size(entry) for entry in entries)}
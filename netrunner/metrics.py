@@ -0,0 +1,147 @@
+"""
+Graph metrics computed by compute_metrics, in process or in worker processes
+
+Workers never receive the graph itself, they map a saved GraphStore and build
+the same kind of graph as NetFrame.net from it once per process.
+
+"""
+
+from functools import lru_cache
+from netrunner.store import GraphStore, python_values
+from networkx import Graph, MultiGraph
+from networkx.algorithms import community as communities
+from typing import Callable, Union
+import networkx
+import numpy as np
+
+
+def degree(graph: Graph, weight: str = None, **options) -> dict:
+    return dict(graph.degree(weight=weight))
+
+
+def betweenness(graph: Graph, weight: str = None, k: int = None, seed: int = None, **options) -> dict:
+    """
+    Betweenness centrality, estimated from k sampled sources when k is smaller than the graph
+
+    """
+
+    k = k if k and k < len(graph) else None
+
+    return networkx.betweenness_centrality(graph, k=k, weight=weight, seed=seed)
+
+
+def pagerank(graph: Graph, weight: str = None, **options) -> dict:
+    return networkx.pagerank(graph, weight=weight)
+
+
+def closeness(graph: Graph, weight: str = None, **options) -> dict:
+    return networkx.closeness_centrality(graph, distance=weight)
+
+
+def eigenvector(graph: Graph, weight: str = None, **options) -> dict:
+    return networkx.eigenvector_centrality(graph, weight=weight)
+
+
+def clustering(graph: Graph, weight: str = None, **options) -> dict:
+    return networkx.clustering(graph, weight=weight)
+
+
+def community(graph: Graph, weight: str = None, seed: int = None, **options) -> list:
+    return communities.louvain_communities(graph, weight=weight, seed=seed)
+
+
+# metrics available by name, any picklable callable taking a graph works as well
+METRICS = {
+    'degree': degree,
+    'betweenness': betweenness,
+    'pagerank': pagerank,
+    'closeness': closeness,
+    'eigenvector': eigenvector,
+    'clustering': clustering,
+    'community': community,
+}
+
+
+def metric_name(metric: Union[str, Callable]) -> str:
+    return metric if isinstance(metric, str) else metric.__name__
+
+
+def run_metric(metric: Union[str, Callable], graph: Graph, options: dict):
+    """
+    Compute one metric, named metrics get the options and callables only the graph
+
+    :param metric: str or Callable
+    :param graph: Graph
+    :param options: dict
+        weight, k and seed
+    :return: metric values
+    """
+
+    if callable(metric):
+        return metric(graph)
+
+    if metric not in METRICS:
+        raise ValueError(f'Unknown metric {metric}, expected a callable or one of {", ".join(METRICS)}')
+
+    return METRICS[metric](graph, **options)
+
+
+def store_graph(store: GraphStore, weight: str = None) -> Graph:
+    """
+    Graph of a store as NetFrame.net holds it, a MultiGraph with one parallel edge per row for multigraph
+    stores, only the weight attribute is carried over
+
+    :param store: GraphStore
+    :param weight: str
+        edge attribute to keep, unset values are left off the edge
+    :return: Graph or MultiGraph
+    """
+
+    graph = MultiGraph() if store.multigraph else Graph()
+    graph.add_nodes_from(store.labels.tolist())
+    ids, rows = np.arange(store.n_edges), np.zeros(store.n_edges, dtype=np.int64)
+
+    # parallel edge i of a pair takes value i of a list holding one value per row, see NetFrame._iter_multi_edges
+    if store.multigraph:
+        repeats = np.maximum(store.edge_counts, 1)
+        ids = np.repeat(ids, repeats)
+        rows = np.arange(len(ids)) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+
+    sources, targets = store.labels[store.src[ids]].tolist(), store.labels[store.dst[ids]].tolist()
+
+    if weight is None:
+        graph.add_edges_from(zip(sources, targets))
+        return graph
+
+    values, mask = store.edge_attributes.get(weight, ids)
+    counts = store.edge_counts[ids].tolist()
+    graph.add_edges_from((source, target, {weight: value[row] if store.multigraph and isinstance(value, list)
+                                           and len(value) == count else value} if set_ else {})
+                         for source, target, value, set_, row, count in zip(sources, targets, python_values(values),
+                                                                            mask.tolist(), rows.tolist(), counts))
+
+    return graph
+
+
+@lru_cache(maxsize=2)
+def load_graph(path: str, weight: str = None) -> Graph:
+    """
+    Graph of a saved store, built once per worker process
+
+    """
+
+    return store_graph(GraphStore().load(path), weight)
+
+
+def compute_metric(path: str, metric: Union[str, Callable], options: dict):
+    """
+    Worker entry point, compute one metric on the store saved at path
+
+    :param path: str
+    :param metric: str or Callable
+    :param options: dict
+        weight, k, seed and other metric options
+    :return: metric values
+    """
+
+    return run_metric(metric, load_graph(path, options.get('weight')), options)
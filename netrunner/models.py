@@ -3,7 +3,11 @@ Custom models for NetFrames
 
 """
 from collections import namedtuple
-from typing import Iterable
+from collections.abc import Mapping
+from netrunner.store import GraphStore
+from typing import Iterable, Iterator
+import numpy as np
+import pandas as pd
 
 
 # Node object
@@ -15,117 +19,211 @@ Edge = namedtuple('Edge', ['name', 'attributes', 'source_col', 'target_col'])
 # Utility Models
 DrawResults = namedtuple('DrawResults', ['nodes', 'links'])
 
+# nodes as labels and edges as (source, target) pairs, going from one NetFrame to another
+GraphDiff = namedtuple('GraphDiff', ['added_nodes', 'removed_nodes', 'changed_nodes',
+                                     'added_edges', 'removed_edges', 'changed_edges'])
+
 
 # NetFrame Models
-class NodeMap:
+class NodeView(Mapping):
+    """
+    Read-only dict view of nodes in a GraphStore, live like the views of a dict
 
-    def __init__(self) -> None:
-        self.map = dict()
+    {node: {'attributes': {...}, 'source_col': [...]}}
 
-    @staticmethod
-    def update_node_map(node: Node, node_map: dict):
-        """
-        Logic for indexing new nodes into a node map
+    """
 
-        :param node:
-        :param node_map:
-        :return:
-        """
+    def __init__(self, store: GraphStore, col: str = None) -> None:
+        self.store = store
 
-        if node.name not in node_map.keys():
+        # source column the view is restricted to, None for every mapped node. Held instead of ids so
+        # compaction renumbering the store never leaves the view pointing at other nodes
+        self.col = col
 
-            # check if attributes are present
-            if node.attributes:
-                # add node if not present in current map
-                node_map.update({
-                    node.name: {
-                        'attributes': node.attributes,
-                        'source_col': [node.source_col]
-                    }
-                })
-
-            # if attributes are net present, we want an empty dict to hold place ready for data
-            else:
-                node_map.update({
-                    node.name: {
-                        'attributes': dict(),
-                        'source_col': [node.source_col]
-                    }
-                })
-
-        # if node present, check if the source matches current node
-        elif node.name in node_map.keys():
-
-            if node.source_col not in node_map[node.name]['source_col']:
-                node_map[node.name]['source_col'].append(node.source_col)
-
-            else:
-                print(f'Node {node.name} already created!')
+    def _ids(self) -> np.ndarray:
+
+        if self.col is None:
+            return np.flatnonzero(self.store.mapped())
+
+        return self.store.nodes_of(self.col) if self.col in self.store.counts else np.empty(0, dtype=np.int64)
+
+    def _id(self, node) -> int:
+
+        idx = self.store.node_id(node)
+
+        if self.col is None:
+            mapped = self.store.is_mapped(idx)
+        else:
+            mapped = self.col in self.store.counts and self.store.counts[self.col][idx] > 0
+
+        if not mapped:
+            raise KeyError(node)
+
+        return idx
+
+    def __getitem__(self, node) -> dict:
+
+        idx = self._id(node)
+
+        return {
+            'attributes': self.store.node_attributes.row(idx),
+            'source_col': self.store.source_cols(idx)
+        }
+
+    def __contains__(self, node) -> bool:
+
+        try:
+            self._id(node)
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self) -> Iterator:
+        return iter(self.store.labels[self._ids()].tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
+
+class EdgeView(Mapping):
+    """
+    Read-only dict view of edges in a GraphStore, live like the views of a dict
+
+    {(source, target): {'attributes': {...}, 'source_col': str, 'target_col': str}}
+
+    """
+
+    def __init__(self, store: GraphStore, link: tuple = None) -> None:
+        self.store = store
+
+        # link the view is restricted to, None for every edge
+        self.link = None if link is None else tuple(link)
+
+    def _ids(self) -> np.ndarray:
+
+        if self.link is None:
+            return self.store.live_edges()
+
+        return self.store.edges_of(self.link) if self.link in self.store.links else np.empty(0, dtype=np.int64)
+
+    def _id(self, edge) -> int:
+
+        try:
+            source, target = edge
+            idx = self.store.edge_ids([self.store.node_id(source)], [self.store.node_id(target)])[0]
+        except (KeyError, TypeError, ValueError):
+            raise KeyError(edge)
+
+        if idx == -1 or self.link is not None and self.link not in self.store.edge_links(idx):
+            raise KeyError(edge)
+
+        return int(idx)
+
+    def __getitem__(self, edge) -> dict:
+
+        idx = self._id(edge)
+        source_col, target_col = self.store.edge_link(idx) if self.link is None else self.link
+
+        return {
+            'attributes': self.store.edge_attributes.row(idx),
+            'source_col': source_col,
+            'target_col': target_col
+        }
+
+    def __contains__(self, edge) -> bool:
+
+        try:
+            self._id(edge)
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self) -> Iterator:
+        ids = self._ids()
+        return zip(self.store.labels[self.store.src[ids]].tolist(), self.store.labels[self.store.dst[ids]].tolist())
+
+    def __len__(self) -> int:
+        return len(self._ids())
+
+
+class NodeMap:
+    """
+    Node side of a GraphStore, map keeps the original dict layout as a view
+
+    """
+
+    def __init__(self, store: GraphStore = None) -> None:
+        self.store = store if store is not None else GraphStore()
+
+    @property
+    def map(self) -> NodeView:
+        return NodeView(self.store)
 
     def update(self, nodes: Iterable[Node]) -> None:
         """
-        Create NodeMap
+        Create NodeMap from Node records
 
         :return:
         """
 
+        nodes = list(nodes)
+
+        # group records by source column so each column is one bulk insert
+        by_col = dict()
+
         for node in nodes:
-            self.update_node_map(node, self.map)
+            by_col.setdefault(node.source_col, list()).append(node.name)
+
+        for col, names in by_col.items():
+            self.store.add_nodes(col, pd.unique(pd.Series(names, dtype=object)))
+
+        for node in nodes:
+
+            if node.attributes:
+                idx = self.store.node_id(node.name)
+
+                for attribute, value in node.attributes.items():
+                    self.store.node_attributes.set(attribute, [idx], [value])
 
     def flush(self) -> None:
         """
-        clear mapping
+        clear mapping, edges are cleared with their nodes
 
         """
 
-        self.map = dict()
+        self.store.flush()
 
 
 class EdgeMap:
+    """
+    Edge side of a GraphStore, map keeps the original dict layout as a view
 
-    def __init__(self) -> None:
-
-        # TODO: Allow for multiple edges with same source/target mapping
-        # - this can be done with lists under the source/target key
-        self.map = dict()
-
-    @staticmethod
-    def update_edge_map(edge, edge_map: dict) -> None:
-        """
-        Create NodeMap
-
-        :return:
-        """
+    """
 
-        if edge.name not in edge_map.keys():
-            # check if edge attributes are present
-            if edge.attributes:
+    def __init__(self, store: GraphStore = None) -> None:
+        self.store = store if store is not None else GraphStore()
 
-                edge_map.update({
-                    edge.name : {
-                        'attributes': edge.attributes,
-                        'source_col': edge.source_col,
-                        'target_col': edge.target_col
-                    }
-                })
-
-            else:
-                edge_map.update({
-                    edge.name : {
-                        'attributes': dict(),
-                        'source_col': edge.source_col,
-                        'target_col': edge.target_col
-                    }
-                })
+    @property
+    def map(self) -> EdgeView:
+        return EdgeView(self.store)
 
     def update(self, edges: Iterable[Edge]):
         """
+        Create EdgeMap from Edge records
 
         :return:
         """
 
         for edge in edges:
-            self.update_edge_map(edge, self.map)
+            src, dst = self.store.intern([edge.name[0], edge.name[1]])
+            idx = self.store.add_edges((edge.source_col, edge.target_col), [src], [dst])[0]
+
+            if edge.attributes:
+
+                for attribute, value in edge.attributes.items():
+                    self.store.edge_attributes.set(attribute, [idx], [value])
 
     def flush(self) -> None:
         """
@@ -133,4 +231,4 @@ class EdgeMap:
 
         """
 
-        self.map = dict()
+        self.store.flush_edges()
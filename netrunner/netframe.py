@@ -1,12 +1,29 @@
-from netrunner.utils import unpack_source_col
-from networkx import Graph
+from concurrent.futures import Executor
+from netrunner.utils import node_counts, link_pairs, aggregate_attributes, aggregation_for, uses_mean, map_columns, \
+    parallel_map, json_safe, shared_categories, factorize_column, node_link_edges
+from networkx import Graph, MultiGraph
 from networkx.readwrite import json_graph
 from networkx.classes.reportviews import DegreeView
-from netrunner.models import NodeMap, EdgeMap, Node, Edge
-from typing import List, Tuple, Iterable
+from netrunner.arrow import arrow_batches, batch_frames, batches_frame, null_filter, parquet_dataset
+from netrunner.cache import BuildCache
+from netrunner.metrics import compute_metric, metric_name, run_metric
+from netrunner.stats import BuildStats, instrument
+from netrunner.projection import incidence, project_pairs
+from netrunner.models import NodeMap, EdgeMap, Node, NodeView, EdgeView, GraphDiff
+from netrunner.store import AttributeTable, GraphStore, as_array
+from typing import Callable, List, Tuple, Iterable, Iterator, Union
+import json
+import numpy as np
+import os
+import tempfile
 import pandas as pd
 from pandas.core.frame import DataFrame
 
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
 
 class NetFrame:
     """
@@ -14,34 +31,404 @@ class NetFrame:
 
     """
 
-    def __init__(self, dataframe: DataFrame, nodes: List[str] = None,
+    def __init__(self, dataframe: DataFrame = None, nodes: List[str] = None,
                  links: List[tuple] = None, ignore_chars: str = None,
-                 node_attributes: dict = None, edge_attributes: dict = None):
+                 node_attributes: dict = None, edge_attributes: dict = None,
+                 aggregate: Union[str, dict] = 'last', n_jobs: int = 1, executor: Union[str, Executor] = 'thread',
+                 cache: BuildCache = None, profile: bool = False, hooks: List[Callable] = None,
+                 weight: str = None, multigraph: bool = False, categorize: bool = False):
 
         self.frame = dataframe
-        self.net = Graph()
-        self.node_map = NodeMap()
-        self.edge_map = EdgeMap()
+        self.stats = BuildStats(profile, hooks)
+        self._net = None
+        self._net_stale = True
+
+        # repeated pairs are counted on one edge, weight names an edge attribute that carries the count
+        # and multigraph expands every edge into one parallel edge per row in net
+        self.store = GraphStore(weight, multigraph)
+        self.node_map = NodeMap(self.store)
+        self.edge_map = EdgeMap(self.store)
         self.node_columns = list()
         self.edge_columns = list()
         self.node_attributes_map = node_attributes
         self.edge_attributes_map = edge_attributes
+        self.aggregate = aggregate
+        self.ignore_chars = ignore_chars
+
+        # workers for per column / per link extraction, results are merged in map order
+        self.n_jobs = n_jobs
+        self.executor = executor
+
+        # recode node and link columns against one categorical dictionary before extraction, labels
+        # are hashed once and extraction, grouping and joins work on integer codes
+        self.categorize = categorize
+
+        # optional on-disk cache of builds keyed by the mapped columns and the map
+        self.cache = cache
+
+        # frame and index as of the last build, used to find appended / removed rows
+        self._built_frame = None
+        self._built_index = None
+
+        # parse optional input params, the network itself is only built when first used
+        if dataframe is not None:
+            self._cached_build(cache, dataframe, nodes, links, ignore_chars, node_attributes, edge_attributes)
+            self._mark_built()
+
+    def _cached_build(self, cache: BuildCache, dataframe: DataFrame, nodes: List[str] = None,
+                      links: List[tuple] = None, ignore_chars: str = None, node_attributes: dict = None,
+                      edge_attributes: dict = None) -> None:
+        """
+        Build from the frame, or restore the same build from cache when one is given
+
+        :param cache: BuildCache
+        :param dataframe: DataFrame
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        """
 
-        # parse optional input params and create network if both present
-        if nodes:
-            self.add_nodes(cols=nodes, ignore_chars=ignore_chars)
+        if cache is None or not (nodes or links):
+            self._build(dataframe, nodes, links, ignore_chars, node_attributes, edge_attributes)
+            return
 
-        if links:
-            self.add_edges(cols=links, ignore_chars=ignore_chars)
+        try:
+            key = cache.key(dataframe, nodes, links, ignore_chars, node_attributes, edge_attributes, self.aggregate,
+                            self.store.weight, self.multigraph)
+        except TypeError:
+
+            # columns that cannot be fingerprinted are built every time
+            self._build(dataframe, nodes, links, ignore_chars, node_attributes, edge_attributes)
+            return
+
+        entry = cache.get(key)
+
+        if entry is not None:
+            try:
+                self._restore(entry, settings=False, allow_pickle=cache.allow_pickle)
+                return
+            except ValueError:
+
+                # pickled entries the cache is not trusted with are rebuilt instead
+                self.store.flush()
+
+        self._build(dataframe, nodes, links, ignore_chars, node_attributes, edge_attributes)
+        cache.put(key, self)
+
+    @property
+    def multigraph(self) -> bool:
+        return self.store.multigraph
+
+    @multigraph.setter
+    def multigraph(self, multigraph: bool) -> None:
+
+        # pair totals and per orientation weights differ, stored weights follow the setting
+        if multigraph != self.store.multigraph:
+            self.store.multigraph = multigraph
+            self.store.write_weight(self.store.live_edges())
+
+    @property
+    def net(self) -> Graph:
+        """
+        NetworkX Graph of the maps, materialized on first access and again after nodes or edges change
+
+        :return: Graph
+        """
+
+        if self._net is None or self._net_stale:
+            self._net = MultiGraph() if self.multigraph else Graph()
+            self.populate_network()
+
+        return self._net
+
+    @net.setter
+    def net(self, graph: Union[Graph, MultiGraph]) -> None:
+        self._net = graph
+        self._net_stale = False
+
+    def _network_built(self) -> bool:
+        """
+        True when a materialized network is in sync with the maps
+
+        :return: bool
+        """
+
+        return self._net is not None and not self._net_stale
+
+    def _build(self, dataframe: DataFrame, nodes: List[str] = None, links: List[tuple] = None,
+               ignore_chars: str = None, node_attributes: dict = None, edge_attributes: dict = None,
+               combine: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Extract nodes, edges and attributes from a frame into the store
+
+        :param dataframe: DataFrame
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param combine: bool
+            fold attributes into values already set instead of replacing them
+        :return: (node ids, edge ids) touched by the frame
+        """
+
+        if self.categorize:
+            dataframe = shared_categories(dataframe, map_columns(nodes, links))
+
+        node_ids = self.add_nodes(cols=list(nodes), ignore_chars=ignore_chars, dataframe=dataframe) \
+            if nodes else np.empty(0, dtype=np.int64)
+
+        edge_ids = self.add_edges(cols=list(links), ignore_chars=ignore_chars, dataframe=dataframe) \
+            if links else np.empty(0, dtype=np.int64)
 
         if node_attributes:
-            self.set_node_attributes(node_attributes)
+            self.set_node_attributes(node_attributes, dataframe=dataframe, combine=combine)
 
         if edge_attributes:
-            self.set_edge_attributes(edge_attributes)
+            self.set_edge_attributes(edge_attributes, dataframe=dataframe, combine=combine)
 
-        if nodes and links:
-            self.populate_network()
+        # edge endpoints outside the node columns are touched as well
+        node_ids = np.union1d(node_ids, np.concatenate([self.store.src[edge_ids], self.store.dst[edge_ids]]))
+
+        return node_ids, edge_ids
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[DataFrame], nodes: List[str] = None,
+                    links: List[tuple] = None, ignore_chars: str = None,
+                    node_attributes: dict = None, edge_attributes: dict = None,
+                    aggregate: str = 'last', keep_frame: bool = False, **params) -> 'NetFrame':
+        """
+        Build a NetFrame by folding DataFrame chunks into the store one at a time
+
+        :param chunks: Iterable[DataFrame]
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param aggregate: str
+            attribute policy, applied across chunks as well as within them
+        :param keep_frame: bool
+            concatenate the chunks into frame, off by default so memory stays bounded
+        :param params: other NetFrame parameters such as n_jobs
+        :return: NetFrame
+        """
+
+        netframe = cls(node_attributes=node_attributes, edge_attributes=edge_attributes,
+                       ignore_chars=ignore_chars, aggregate=aggregate, **params)
+        frames = list()
+
+        for chunk in chunks:
+            netframe._build(chunk, nodes, links, ignore_chars, node_attributes, edge_attributes, combine=True)
+
+            if keep_frame:
+                frames.append(chunk)
+
+        if keep_frame and frames:
+            netframe.frame = pd.concat(frames, ignore_index=True)
+
+        return netframe
+
+    @classmethod
+    def from_csv(cls, path: str, chunksize: int = 100000, nodes: List[str] = None,
+                 links: List[tuple] = None, ignore_chars: str = None,
+                 node_attributes: dict = None, edge_attributes: dict = None,
+                 aggregate: str = 'last', keep_frame: bool = False, params: dict = None,
+                 **read_params) -> 'NetFrame':
+        """
+        Stream a CSV into a NetFrame, only the columns used by the map are read
+
+        :param path: str
+        :param chunksize: int
+            rows per chunk
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param aggregate: str
+        :param keep_frame: bool
+        :param params: dict
+            other NetFrame parameters such as n_jobs
+        :param read_params: extra pandas.read_csv parameters
+        :return: NetFrame
+        """
+
+        read_params.setdefault('usecols', map_columns(nodes, links, node_attributes, edge_attributes))
+        chunks = pd.read_csv(path, chunksize=chunksize, **read_params)
+
+        return cls.from_chunks(chunks, nodes=nodes, links=links, ignore_chars=ignore_chars,
+                               node_attributes=node_attributes, edge_attributes=edge_attributes,
+                               aggregate=aggregate, keep_frame=keep_frame, **(params or {}))
+
+    @classmethod
+    def from_arrow(cls, source, nodes: List[str] = None, links: List[tuple] = None, ignore_chars: str = None,
+                   node_attributes: dict = None, edge_attributes: dict = None, aggregate: str = 'last',
+                   keep_frame: bool = False, batch_size: int = 1000000, params: dict = None) -> 'NetFrame':
+        """
+        Build a NetFrame from Arrow data, only the columns used by the map are read and rows without a
+        node or a complete link are filtered out before they reach pandas
+
+        :param source: pyarrow Table, RecordBatch, RecordBatchReader, Dataset or an iterable of RecordBatches
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param aggregate: str
+        :param keep_frame: bool
+            keep the projected and filtered rows as frame
+        :param batch_size: int
+            rows per batch
+        :param params: dict
+            other NetFrame parameters such as n_jobs
+        :return: NetFrame
+        """
+
+        columns = map_columns(nodes, links, node_attributes, edge_attributes)
+        batches = arrow_batches(source, columns, null_filter(nodes, links), batch_size)
+
+        return cls._from_batches(batches, nodes, links, ignore_chars, node_attributes, edge_attributes, aggregate,
+                                 keep_frame, params)
+
+    @classmethod
+    def from_parquet(cls, path, nodes: List[str] = None, links: List[tuple] = None, ignore_chars: str = None,
+                     node_attributes: dict = None, edge_attributes: dict = None, aggregate: str = 'last',
+                     keep_frame: bool = False, batch_size: int = 1000000, params: dict = None,
+                     **dataset_params) -> 'NetFrame':
+        """
+        Stream Parquet into a NetFrame, only the columns used by the map are read, null filters are pushed
+        into the scan and node columns are read dictionary encoded
+
+        :param path: file, directory or list of files
+        :param nodes: list
+        :param links: list
+        :param ignore_chars: str
+        :param node_attributes: dict
+        :param edge_attributes: dict
+        :param aggregate: str
+        :param keep_frame: bool
+        :param batch_size: int
+        :param params: dict
+            other NetFrame parameters such as n_jobs
+        :param dataset_params: extra pyarrow.dataset.dataset parameters such as partitioning
+        :return: NetFrame
+        """
+
+        dataset = parquet_dataset(path, map_columns(nodes, links), **dataset_params)
+
+        return cls.from_arrow(dataset, nodes=nodes, links=links, ignore_chars=ignore_chars,
+                              node_attributes=node_attributes, edge_attributes=edge_attributes, aggregate=aggregate,
+                              keep_frame=keep_frame, batch_size=batch_size, params=params)
+
+    @classmethod
+    def _from_batches(cls, batches: Iterable, nodes: List[str] = None, links: List[tuple] = None,
+                      ignore_chars: str = None, node_attributes: dict = None, edge_attributes: dict = None,
+                      aggregate: str = 'last', keep_frame: bool = False, params: dict = None) -> 'NetFrame':
+        """
+        Fold record batches into a NetFrame through from_chunks
+
+        :return: NetFrame
+        """
+
+        kept = list()
+
+        def frames():
+            for batch in batches:
+                if keep_frame:
+                    kept.append(batch)
+
+                yield from batch_frames([batch], map_columns(nodes, links))
+
+        netframe = cls.from_chunks(frames(), nodes=nodes, links=links, ignore_chars=ignore_chars,
+                                   node_attributes=node_attributes, edge_attributes=edge_attributes,
+                                   aggregate=aggregate, **(params or {}))
+
+        # the frame is converted without dictionary encoding, and dictionary columns read from parquet are
+        # decoded, so it has the usual column dtypes
+        if keep_frame and kept:
+            netframe.frame = batches_frame(kept)
+
+        return netframe
+
+    def save(self, path: str) -> None:
+        """
+        Write the maps to a directory as .npy arrays plus json meta data, frame is not saved
+
+        :param path: str
+            directory, created if missing
+        """
+
+        self.store.save(path)
+
+        # links are tuples, kept as [key, value] pairs since json objects only take string keys
+        node_attributes, edge_attributes = self.node_attributes_map or {}, self.edge_attributes_map or {}
+        meta = {
+            'node_columns': self.node_columns,
+            'edge_columns': [list(link) for link in self.edge_columns],
+            'node_attributes': [[col, attributes] for col, attributes in node_attributes.items()],
+            'edge_attributes': [[list(link), attributes] for link, attributes in edge_attributes.items()],
+            'aggregate': self.aggregate,
+            'ignore_chars': self.ignore_chars,
+            'multigraph': self.multigraph,
+        }
+
+        with open(os.path.join(path, 'netframe.json'), 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True, allow_pickle: bool = True, **params) -> 'NetFrame':
+        """
+        Read a NetFrame written by save, typed and string arrays are memory mapped copy-on-write so
+        processes loading the same path share the page cache
+
+        :param path: str
+            directory
+        :param mmap: bool
+        :param allow_pickle: bool
+            read attributes that are neither typed nor strings, such as lists, which are pickled. Only for
+            paths you trust, False raises a ValueError on them
+        :param params: other NetFrame parameters such as n_jobs
+        :return: NetFrame without a frame
+        """
+
+        netframe = cls(**params)
+        netframe._restore(path, mmap, allow_pickle=allow_pickle)
+
+        return netframe
+
+    def _restore(self, path: str, mmap: bool = True, settings: bool = True, allow_pickle: bool = True) -> None:
+        """
+        Replace the maps and map settings with ones written by save
+
+        :param path: str
+        :param mmap: bool
+        :param settings: bool
+            also take aggregate, ignore_chars, weight, multigraph and the attribute maps from path, a cache
+            hit keeps the ones given to the constructor
+        :param allow_pickle: bool
+        """
+
+        with open(os.path.join(path, 'netframe.json')) as meta_file:
+            meta = json.load(meta_file)
+
+        weight, multigraph = self.store.weight, self.store.multigraph
+        self.store.load(path, mmap, allow_pickle)
+        self.node_columns = meta['node_columns']
+        self.edge_columns = [tuple(link) for link in meta['edge_columns']]
+        self._net_stale = True
+
+        if not settings:
+            self.store.weight, self.store.multigraph = weight, multigraph
+            return
+
+        self.node_attributes_map = {col: attributes for col, attributes in meta['node_attributes']} or None
+        self.edge_attributes_map = {tuple(link): attributes for link, attributes in meta['edge_attributes']} or None
+        self.ignore_chars = meta['ignore_chars']
+        self.aggregate = meta['aggregate']
+        self.multigraph = meta.get('multigraph', False)
 
     # Node Operations
     @staticmethod
@@ -59,70 +446,107 @@ class NetFrame:
 
         return nodes
 
-    def _create_nodes(self, cols: list, ignore_chars: str) -> list:
+    @staticmethod
+    def _get_node_counts(column: pd.Series, ignore_chars: str) -> tuple:
+        """
+        Columnar node extraction, distinct values of a column with their row counts
+
+        :param column: Series
+        :param ignore_chars: str
+        :return: (uniques, counts)
+        """
+
+        return node_counts(column, ignore_chars)
+
+    def _create_nodes(self, cols: list, ignore_chars: str, vectorized: bool = True,
+                      dataframe: DataFrame = None) -> list:
         """
         Iterate and create all nodes given column names
 
         :param cols: list
         :param ignore_chars: str
-        :return: list
+        :param vectorized: bool
+            use columnar extraction, False falls back to row by row parsing
+        :param dataframe: DataFrame
+            frame to extract from, defaults to self.frame
+        :return: list of (col, uniques, counts)
         """
 
+        dataframe = self.frame if dataframe is None else dataframe
         all_nodes = list()
 
-        for col in cols:
-            nodes = self._get_nodes(self.frame, col, ignore_chars)
+        # columns are extracted concurrently when n_jobs allows, results keep column order
+        if vectorized:
+            results = parallel_map(self._get_node_counts, [(dataframe[col], ignore_chars) for col in cols],
+                                   self.n_jobs, self.executor)
+        else:
+            results = [([node.name for node in self._get_nodes(dataframe, col, ignore_chars)], None) for col in cols]
+
+        for col, (uniques, counts) in zip(cols, results):
 
-            # update node cols and create list of nodes for network
-            all_nodes.extend(nodes)
+            # update node cols and collect distinct nodes per column for the store
+            all_nodes.append((col, uniques, counts))
 
             if col not in self.node_columns:
                 self.node_columns.append(col)
 
         return all_nodes
 
-    def add_nodes(self, cols: list, ignore_chars: str = None) -> None:
+    @instrument('add_nodes')
+    def add_nodes(self, cols: list, ignore_chars: str = None, vectorized: bool = True,
+                  dataframe: DataFrame = None) -> np.ndarray:
         """
         update nodes
 
         :param cols: list
         :param ignore_chars: str
-
+        :param vectorized: bool
+            use columnar extraction, False keeps the original row by row parsing
+        :param dataframe: DataFrame
+            frame to extract from, defaults to self.frame
+        :return: np.ndarray of node ids extracted
         """
 
-        nodes = self._create_nodes(cols, ignore_chars)
+        node_ids = [np.empty(0, dtype=np.int64)]
+
+        for col, uniques, counts in self._create_nodes(cols, ignore_chars, vectorized, dataframe):
 
-        if len(nodes) > 0:
+            if len(uniques) > 0:
 
-            # set nodes in map
-            self.node_map.update(nodes)
+                # set nodes in store
+                node_ids.append(self.store.add_nodes(col, uniques, counts))
 
-    def _get_node_attributes(self, col: str, attributes: list) -> dict:
+        # the network is rebuilt on next access
+        self._net_stale = True
+
+        return np.unique(np.concatenate(node_ids))
+
+    def _get_node_attributes(self, col: str, attributes: list, aggregate: str = 'last',
+                             dataframe: DataFrame = None) -> dict:
         """
         Create attribute mapping for a given node
 
         :param col:
         :param attributes:
-        :return:
+        :param aggregate: str
+            how repeated rows for a node are collapsed, one of last, first, list, sum or mean
+        :param dataframe: DataFrame
+            frame to read from, defaults to self.frame
+        :return: dict of col to a DataFrame of attributes indexed by node
         """
 
-        attribute_map = {col: dict()}
-
-        # map each attribute to node value
-        # {col_value: {col_name: value, col_name: value, ...}}
-        for idx, row in self.frame.iterrows():
+        dataframe = self.frame if dataframe is None else dataframe
 
-            attribute_map[col].update({
-                row[col]: {attribute: row[attribute] for attribute in attributes}
-            })
+        return {col: aggregate_attributes(dataframe, [col], attributes, aggregate)}
 
-        return attribute_map
-
-    def _create_node_attributes(self, node_attributes: dict) -> dict:
+    def _create_node_attributes(self, node_attributes: dict, aggregate: str = 'last',
+                                dataframe: DataFrame = None) -> dict:
         """
         Add specified attributes attributes to nodes
 
         :param node_attributes:
+        :param aggregate: str
+        :param dataframe: DataFrame
         :return: dict
         """
 
@@ -130,28 +554,102 @@ class NetFrame:
 
         for col, attributes in node_attributes.items():
 
-            attribute_map.update(self._get_node_attributes(col, attributes))
+            attribute_map.update(self._get_node_attributes(col, attributes, aggregate, dataframe))
 
         return attribute_map
 
-    def set_node_attributes(self, node_attributes: dict) -> None:
+    @staticmethod
+    def _write_attributes(table: AttributeTable, ids: np.ndarray, attribute_frame: DataFrame,
+                          aggregate: str, combine: bool, counts: DataFrame = None) -> None:
+        """
+        Write an aggregated attribute frame into a store table
+
+        :param table: AttributeTable
+        :param ids: np.ndarray
+            store id per frame row, -1 rows are skipped
+        :param attribute_frame: DataFrame
+        :param aggregate: str or dict
+            policy, or dict of attribute to policy
+        :param combine: bool
+            fold into values already set instead of replacing them
+        :param counts: DataFrame
+            non-null rows behind each mean
+        """
+
+        keep = ids >= 0
+
+        for attribute in attribute_frame.columns:
+            how = aggregation_for(aggregate, attribute)
+            values = attribute_frame[attribute].to_numpy()[keep]
+            weights = counts[attribute].to_numpy()[keep] if counts is not None and how == 'mean' else None
+
+            if combine:
+                table.combine(attribute, ids[keep], values, how, weights)
+            else:
+                table.set(attribute, ids[keep], values, weights)
+
+    @instrument('set_node_attributes')
+    def set_node_attributes(self, node_attributes: dict, aggregate: str = None,
+                            dataframe: DataFrame = None, combine: bool = False) -> None:
         """
         Set node attributes in NodeMap
 
         :param node_attributes:
+        :param aggregate: str or dict
+            how repeated rows for a node are collapsed, defaults to the NetFrame policy
+        :param dataframe: DataFrame
+            frame to read from, defaults to self.frame
+        :param combine: bool
+            fold into values already set using the aggregate policy instead of replacing them
         """
 
-        node_attribute_map = self._create_node_attributes(node_attributes)
+        aggregate = aggregate or self.aggregate
+        self.node_attributes_map = {**(self.node_attributes_map or {}), **node_attributes}
+        node_attribute_map = self._create_node_attributes(node_attributes, aggregate, dataframe)
+        mapped = self.store.mapped()
 
-        for col in node_attribute_map.keys():
+        for col, attribute_frame in node_attribute_map.items():
 
             if col in self.node_columns:
 
-                for node in node_attribute_map[col]:
+                # only nodes already in the map receive attributes
+                ids = self.store.node_ids(attribute_frame.index)
+                ids[ids >= 0] = np.where(mapped[ids[ids >= 0]], ids[ids >= 0], -1)
+
+                # means keep their row counts so later folds stay exact
+                counts = self._get_node_attributes(col, node_attributes[col], 'count', dataframe)[col] \
+                    if uses_mean(aggregate, node_attributes[col]) else None
 
-                    if node in self.node_map.map.keys():
+                self._write_attributes(self.store.node_attributes, ids, attribute_frame, aggregate, combine, counts)
 
-                        self.node_map.map[node]['attributes'].update(node_attribute_map[col][node])
+                # attribute changes are pushed into a built network instead of invalidating it
+                if self._network_built():
+                    self._refresh_network(node_ids=np.unique(ids[ids >= 0]))
+
+    @staticmethod
+    def _metric_values(values) -> tuple:
+        """
+        Split a metric into node labels and values
+
+        :param values: dict, Series, DegreeView or a community partition (list of sets)
+        :return: (labels, values)
+        """
+
+        if isinstance(values, pd.Series):
+            return values.index, values.to_numpy()
+
+        if isinstance(values, DegreeView):
+            values = dict(values)
+
+        if isinstance(values, dict):
+            return list(values.keys()), as_array(list(values.values()))
+
+        # communities come back in frozen sets in networkX, each node gets its community number
+        communities = [community for community in values if isinstance(community, (set, frozenset))]
+        sizes = [len(community) for community in communities]
+        labels = [node for community in communities for node in community]
+
+        return labels, np.repeat(np.arange(len(communities)), sizes)
 
     def update_node_map(self, values: Iterable, type_: str) -> None:
         """
@@ -161,163 +659,237 @@ class NetFrame:
         :param type_: str
         """
 
-        if isinstance(values, DegreeView):
+        self.update_node_maps({type_: values})
 
-            for value in values:
+    def update_node_maps(self, metrics: dict) -> None:
+        """
+        Write many node metrics into the node attributes in one pass, unknown nodes are skipped
 
-                self.node_map.map[value[0]]['attributes'].update({
-                    type_: value[1]
-                })
+        :param metrics: dict
+            attribute name to a dict, Series, DegreeView or community partition of values
+        """
 
-        if isinstance(values, dict):
+        touched, labels, ids = [np.empty(0, dtype=np.int64)], None, None
 
-            for key, value in values.items():
-                self.node_map.map[key]['attributes'].update({
-                    type_: value
-                })
+        for name, values in metrics.items():
+            nodes, data = self._metric_values(values)
 
-        if isinstance(values, list):
+            # metrics of one graph share their node order, labels are only resolved when it changes
+            if labels is None or not (nodes is labels or list(nodes) == list(labels)):
+                labels, ids = nodes, self.store.node_ids(nodes)
 
-            # communities come back in frozen sets in networkX
-            for idx, value in enumerate(values):
+            keep = ids >= 0
+            self.store.node_attributes.set(name, ids[keep], data[keep])
+            touched.append(ids[keep])
 
-                if isinstance(value, frozenset):
+        if self._network_built():
+            self._refresh_network(node_ids=np.unique(np.concatenate(touched)))
 
-                    for entity in value:
+    def compute_metrics(self, metrics: List[Union[str, Callable]], n_jobs: int = None,
+                        executor: Union[str, Executor] = 'process', k: int = None, seed: int = None,
+                        weight: str = None, write: bool = True) -> dict:
+        """
+        Compute graph metrics concurrently and write them back as node attributes
+
+        :param metrics: list
+            metric names from netrunner.metrics.METRICS (degree, betweenness, pagerank, closeness,
+            eigenvector, clustering, community) or picklable callables taking a graph
+        :param n_jobs: int
+            workers, defaults to the NetFrame n_jobs, 1 computes on net in process
+        :param executor: str or Executor
+            workers map a saved copy of the store instead of receiving a pickled graph
+        :param k: int
+            sources sampled by betweenness, None computes it exactly
+        :param seed: int
+            random seed for sampled betweenness and community detection
+        :param weight: str
+            edge attribute used as weight, None treats every edge as 1
+        :param write: bool
+            write the results into the node attributes with update_node_maps
+        :return: dict of metric name to results
+        """
 
-                        self.node_map.map[entity]['attributes'].update({
-                            type_: idx
-                        })
+        n_jobs = self.n_jobs if n_jobs is None else n_jobs
+        options = {'k': k, 'seed': seed, 'weight': weight}
 
-    # Edge Operations
-    @staticmethod
-    def _get_edges(dataframe: DataFrame, target_col: str, source_col: str, ignore_str: str = None) -> list:
+        if n_jobs == 1 or len(metrics) < 2:
+            results = [run_metric(metric, self.net, options) for metric in metrics]
+
+        else:
+            with tempfile.TemporaryDirectory() as path:
+                self.store.save(path)
+                results = parallel_map(compute_metric, [(path, metric, options) for metric in metrics],
+                                       n_jobs, executor)
+
+        results = {metric_name(metric): values for metric, values in zip(metrics, results)}
+
+        if write:
+            self.update_node_maps(results)
+
+        return results
+
+    def nodes_to_frame(self, attributes: List[str] = None) -> DataFrame:
         """
-        Get relationships
+        Node attributes as a DataFrame indexed by node label, unset values are missing
 
-        :param dataframe: DataFrame
-        :param target_col: str
-        :param source_col: str
-        :param ignore_str: str
-        :return: list
+        :param attributes: list
+            attribute columns to keep, defaults to all of them
+        :return: DataFrame
         """
 
-        if ignore_str:
+        frame = self.store.node_attributes.to_frame(index=self.store.labels.rename('node'))
+
+        # deleted nodes keep their slot until the store is compacted
+        if self.store.node_deleted is not None:
+            frame = frame.iloc[self.store.live_nodes()]
 
-            source_data = dataframe[dataframe[source_col] != ignore_str][source_col]
-            target_data = dataframe[dataframe[target_col] != ignore_str][target_col]
+        return frame if attributes is None else frame[attributes]
 
-            return [
-                Edge(
-                    name=(source, target),
-                    attributes=None,
-                    source_col=source_col,
-                    target_col=target_col
-                )
-                for source, target in zip(source_data, target_data)
-            ]
+    # Edge Operations
+    @staticmethod
+    def _get_edges(source: pd.Series, target: pd.Series, ignore_str: str = None) -> tuple:
+        """
+        Get relationships as distinct (source, target) pairs with row counts
+
+        :param source: Series
+        :param target: Series
+        :param ignore_str: str
+        :return: (source uniques, target uniques, source codes, target codes, counts)
+        """
 
-        return [
-            Edge(
-                name=(source, target),
-                attributes=None,
-                source_col=source_col,
-                target_col=target_col
-            )
-            for source, target in zip(dataframe[source_col], dataframe[target_col])
-            if str(source) != 'nan' and str(target) != 'nan'
-        ]
+        return link_pairs(source, target, ignore_str)
 
-    def _create_edges(self, cols: List[Tuple], ignore_chars: str = None) -> list:
+    def _create_edges(self, cols: List[Tuple], ignore_chars: str = None, dataframe: DataFrame = None) -> list:
         """
         format edges
 
         :param cols:
         :param ignore_chars:
-        :return: list
+        :param dataframe: DataFrame
+            frame to extract from, defaults to self.frame
+        :return: list of (link, pairs)
         """
 
+        dataframe = self.frame if dataframe is None else dataframe
         all_edges = list()
 
-        for col in cols:
-            edges = self._get_edges(self.frame, col[0], col[1], ignore_chars)
+        # links are extracted concurrently when n_jobs allows, results keep link order
+        results = parallel_map(self._get_edges, [(dataframe[col[0]], dataframe[col[1]], ignore_chars) for col in cols],
+                               self.n_jobs, self.executor)
+
+        for col, edges in zip(cols, results):
 
             # update edges map and edges for network
-            all_edges.extend(edges)
+            all_edges.append((col, edges))
 
             if col not in self.edge_columns:
                 self.edge_columns.append(col)
 
         return all_edges
 
-    def add_edges(self, cols: List[Tuple], ignore_chars: str = None) -> None:
+    @instrument('add_edges')
+    def add_edges(self, cols: List[Tuple], ignore_chars: str = None, dataframe: DataFrame = None) -> np.ndarray:
         """
         Store edges for visualization
 
         :param cols:
         :param ignore_chars:
+        :param dataframe: DataFrame
+            frame to extract from, defaults to self.frame
+        :return: np.ndarray of edge ids extracted
         """
 
-        edges = self._create_edges(cols, ignore_chars)
+        edge_ids = [np.empty(0, dtype=np.int64)]
 
-        if len(edges) > 0:
-            self.edge_map.update(edges)
+        for link, (source_uniques, target_uniques, source_codes, target_codes, counts) in \
+                self._create_edges(cols, ignore_chars, dataframe):
 
-    def _get_edge_attributes(self, link, attributes):
-        """
-        Collect and unpack link and corresponding attributes
+            if len(counts) > 0:
 
-        :param link:
-        :param attributes:
-        :return:
-        """
+                # endpoints outside the node columns still get an id, as networkx would add them
+                source_ids = self.store.intern(source_uniques)
+                target_ids = self.store.intern(target_uniques)
+                edge_ids.append(self.store.add_edges(link, source_ids[source_codes], target_ids[target_codes], counts))
+
+        self._net_stale = True
 
-        attribute_map = {link: dict()}
+        return np.unique(np.concatenate(edge_ids))
 
-        # map each attribute to edge value
-        for idx, row in self.frame.iterrows():
+    def _get_edge_attributes(self, link: tuple, attributes: list, aggregate: str = 'last',
+                             dataframe: DataFrame = None) -> dict:
+        """
+        Collect and unpack link and corresponding attributes
 
-            attribute_map[link].update({
+        :param link: tuple
+            (source_col, target_col)
+        :param attributes: list
+        :param aggregate: str
+            how repeated rows for an edge are collapsed, one of last, first, list, sum or mean
+        :param dataframe: DataFrame
+            frame to read from, defaults to self.frame
+        :return: dict
+        """
 
-                # reverse tuple since it gets ordered???
-                (row[link[1]], row[link[0]]): {attribute: row[attribute] for attribute in attributes}
-            })
+        dataframe = self.frame if dataframe is None else dataframe
 
-        return attribute_map
+        # indexed (source, target) in link order, the same orientation as the EdgeMap
+        return {link: aggregate_attributes(dataframe, [link[0], link[1]], attributes, aggregate)}
 
-    def _create_edge_attributes(self, edge_attributes: dict) -> dict:
+    def _create_edge_attributes(self, edge_attributes: dict, aggregate: str = 'last',
+                                dataframe: DataFrame = None) -> dict:
         """
         Add specified attributes attributes to nodes
 
         :param edge_attributes:
+        :param aggregate: str
+        :param dataframe: DataFrame
         :return: dict
         """
 
         attribute_map = dict()
 
         for link, attributes in edge_attributes.items():
-            attribute_map.update(self._get_edge_attributes(link, attributes))
+            attribute_map.update(self._get_edge_attributes(link, attributes, aggregate, dataframe))
 
         return attribute_map
 
-    def set_edge_attributes(self, edge_attributes: dict) -> None:
+    @instrument('set_edge_attributes')
+    def set_edge_attributes(self, edge_attributes: dict, aggregate: str = None,
+                            dataframe: DataFrame = None, combine: bool = False) -> None:
         """
         Set node attributes in NodeMap
 
         :param edge_attributes:
+        :param aggregate: str or dict
+            how repeated rows for an edge are collapsed, defaults to the NetFrame policy
+        :param dataframe: DataFrame
+            frame to read from, defaults to self.frame
+        :param combine: bool
+            fold into values already set using the aggregate policy instead of replacing them
         """
 
-        edge_attribute_map = self._create_edge_attributes(edge_attributes)
+        aggregate = aggregate or self.aggregate
+        self.edge_attributes_map = {**(self.edge_attributes_map or {}), **edge_attributes}
+        edge_attribute_map = self._create_edge_attributes(edge_attributes, aggregate, dataframe)
 
-        for col in edge_attribute_map.keys():
+        for link, attribute_frame in edge_attribute_map.items():
 
-            if col in self.edge_columns:
+            if link in self.edge_columns:
 
-                for edge in edge_attribute_map[col]:
+                # resolve (source, target) labels to edge ids, only existing edges receive attributes
+                source = self.store.node_ids(attribute_frame.index.get_level_values(0))
+                target = self.store.node_ids(attribute_frame.index.get_level_values(1))
+                ids = np.full(len(attribute_frame), -1, dtype=np.int64)
+                known = (source >= 0) & (target >= 0)
+                ids[known] = self.store.edge_ids(source[known], target[known])
 
-                    if edge in self.edge_map.map.keys():
+                counts = self._get_edge_attributes(link, edge_attributes[link], 'count', dataframe)[link] \
+                    if uses_mean(aggregate, edge_attributes[link]) else None
 
-                        self.edge_map.map[edge]['attributes'].update(edge_attribute_map[col][edge])
+                self._write_attributes(self.store.edge_attributes, ids, attribute_frame, aggregate, combine, counts)
+
+                if self._network_built():
+                    self._refresh_network(edge_ids=np.unique(ids[ids >= 0]))
 
     def delete_node(self, node: str) -> None:
         """
@@ -327,9 +899,113 @@ class NetFrame:
             node label
         """
 
-        pass
+        self.store.node_id(node)
+        self.delete_nodes([node])
+
+    def delete_nodes(self, nodes: Iterable) -> None:
+        """
+        Delete nodes and their edges from the maps and network, unknown labels are skipped.
+        Only the edges of the deleted nodes are touched, frame is left as is
+
+        :param nodes: Iterable of node labels
+        """
+
+        ids = self.store.node_ids(list(nodes))
+        ids = np.unique(ids[ids >= 0])
+        labels = self.store.labels[ids].tolist()
+        self.store.delete(ids)
+
+        # networkx drops the incident edges with the node
+        if self._network_built():
+            self._net.remove_nodes_from(labels)
+
+    def filter_nodes(self, condition) -> 'NetFrame':
+        """
+        Sub NetFrame of the nodes matching condition and the edges between them, frame is not read
+
+        :param condition: Callable or mask
+            callable taking nodes_to_frame() and returning a boolean mask, a boolean array aligned to
+            nodes_to_frame() or a boolean Series indexed by node label
+        :return: NetFrame without a frame
+        """
+
+        nodes = self.nodes_to_frame()
+        mask = condition(nodes) if callable(condition) else condition
+
+        if isinstance(mask, pd.Series):
+            mask = mask.reindex(nodes.index, fill_value=False)
+
+        mask = np.asarray(mask, dtype=bool)
+
+        if len(mask) != len(nodes):
+            raise ValueError(f'Mask of length {len(mask)} does not match {len(nodes)} nodes')
+
+        return self._sub_netframe(self.store.subgraph(self.store.live_nodes()[mask]))
+
+    def _sub_netframe(self, store: GraphStore) -> 'NetFrame':
+        """
+        NetFrame over a store cut from this one, settings and maps are carried over, frame is not
+
+        :param store: GraphStore
+        :return: NetFrame
+        """
+
+        netframe = NetFrame(node_attributes=self.node_attributes_map, edge_attributes=self.edge_attributes_map,
+                            ignore_chars=self.ignore_chars, aggregate=self.aggregate, n_jobs=self.n_jobs,
+                            executor=self.executor, cache=self.cache, profile=self.stats.enabled,
+                            hooks=self.stats.hooks, weight=store.weight, multigraph=self.multigraph,
+                            categorize=self.categorize)
+        netframe.store = store
+        netframe.node_map, netframe.edge_map = NodeMap(store), EdgeMap(store)
+        netframe.node_columns = list(self.node_columns)
+        netframe.edge_columns = list(self.edge_columns)
+
+        return netframe
+
+    def nodes_of(self, col: str) -> NodeView:
+        """
+        Read-only view of the nodes extracted from a source column, in time proportional to them
+
+        :param col: str
+        :return: NodeView, follows later changes to the maps
+        """
+
+        # unknown columns fail here rather than on first use of the view
+        self.store.nodes_of(col)
+
+        return NodeView(self.store, col)
+
+    def edges_of(self, link: tuple) -> EdgeView:
+        """
+        Read-only view of the edges extracted from a link, in time proportional to them
+
+        :param link: (source_col, target_col)
+        :return: EdgeView, follows later changes to the maps
+        """
+
+        self.store.edges_of(link)
+
+        return EdgeView(self.store, link)
+
+    def subgraph_of(self, cols: List[str] = None, links: List[tuple] = None) -> 'NetFrame':
+        """
+        Sub NetFrame of the nodes from cols and the edges from links, frame is not read
+
+        :param cols: list
+            source columns, without links every edge between their nodes is kept
+        :param links: list
+            links whose edges are kept, their endpoints are added to the nodes
+        :return: NetFrame without a frame
+        """
+
+        empty = np.empty(0, dtype=np.int64)
+        node_ids = np.concatenate([empty] + [self.store.nodes_of(col) for col in cols or []])
+        edge_ids = np.concatenate([empty] + [self.store.edges_of(link) for link in links]) if links else None
+
+        return self._sub_netframe(self.store.subgraph(node_ids, edge_ids))
 
     # Network Operations
+    @instrument('populate_network')
     def populate_network(self) -> None:
         """
         Create NetworkX Graph from Node and Edge Maps
@@ -337,18 +1013,196 @@ class NetFrame:
         :return:
         """
 
-        nodes = [(node, self.node_map.map[node]['attributes']) for node in self.node_map.map.keys()]
-        edges = [(edge[0], edge[1]) for edge in self.edge_map.map.keys()]
-        self.net.add_nodes_from(nodes)
-        self.net.add_edges_from(edges)
+        if self._net is None:
+            self._net = MultiGraph() if self.multigraph else Graph()
+
+        self._net.add_nodes_from(self.store.iter_nodes())
+        self._net.add_edges_from(self._iter_multi_edges() if self.multigraph else self.store.iter_edges())
+        self._net_stale = False
+
+    def _iter_multi_edges(self, ids: np.ndarray = None) -> Iterator[Tuple]:
+        """
+        (source, target, attributes) once per row behind each edge, list aggregated attributes
+        holding one value per row are split across the parallel edges
+
+        :param ids: optional edge ids, defaults to every edge
+        :return: Iterator
+        """
+
+        ids = self.store.live_edges() if ids is None else ids
+        split = {attribute for attributes in (self.edge_attributes_map or {}).values() for attribute in attributes
+                 if aggregation_for(self.aggregate, attribute) == 'list'}
+
+        counts = self.store.edge_counts[ids].tolist()
+
+        for (source, target, attributes), count in zip(self.store.iter_edges(ids), counts):
+            for row in range(max(count, 1)):
+                yield source, target, {name: value[row] if name in split and isinstance(value, list)
+                                       and len(value) == count else value for name, value in attributes.items()}
+
+    def _drop_network_edges(self, sources: list, targets: list) -> None:
+        """
+        Remove edges between label pairs from the network, every parallel edge of a MultiGraph included
+
+        :param sources: list
+        :param targets: list
+        """
+
+        if not self.multigraph:
+            self._net.remove_edges_from(zip(sources, targets))
+            return
+
+        self._net.remove_edges_from([(source, target, key) for source, target in zip(sources, targets)
+                                     if self._net.has_edge(source, target) for key in list(self._net[source][target])])
+
+    def to_sparse(self, weight: str = None, format: str = 'csr', symmetric: bool = True) -> tuple:
+        """
+        SciPy adjacency matrix built straight from the edge arrays, NetworkX is never touched
+
+        :param weight: str
+            None for 1 per edge, 'count' for rows per edge or an edge attribute (unset values count as 1)
+        :param format: str
+            csr, csc or coo
+        :param symmetric: bool
+            mirror edges as the undirected Graph does, False keeps (source, target) orientation
+        :return: (matrix, labels) where row and column i belong to labels[i]
+        """
+
+        if sparse is None:
+            raise ImportError('to_sparse needs scipy, install it with pip install scipy')
+
+        # row i has to be labels[i], deleted slots are dropped first
+        self.store.compact()
+        rows, cols, data = self.store.adjacency(weight, symmetric)
+        size = self.store.n_nodes
+        matrix = sparse.coo_array((data, (rows, cols)), shape=(size, size))
+
+        return matrix.asformat(format), self.store.labels
+
+    def project(self, onto_col: str, via_col: str, weight: str = 'count', max_group_size: int = None,
+                top_k: int = None, chunksize: int = 10000) -> 'NetFrame':
+        """
+        One-mode projection of the onto_col / via_col bipartite network read straight from the frame, or
+        from the edges of an (onto_col, via_col) link when no frame is kept. Entities are linked when they
+        share a via_col value, computed with sparse matrix products
+
+        :param onto_col: str
+            column whose values become the nodes
+        :param via_col: str
+            column whose values are the shared groups
+        :param weight: str
+            edge weight attribute, count of shared groups, newman (each shared group adds 1 / (members - 1))
+            or jaccard. Edge row counts always hold the shared groups
+        :param max_group_size: int
+            groups with more members are skipped, each would add a dense clique of weak links
+        :param top_k: int
+            keep only the k heaviest links of every node, a link kept by either end stays
+        :param chunksize: int
+            nodes projected per block, bounds memory together with top_k
+        :return: NetFrame without a frame, nodes keep their attributes from this NetFrame
+        """
+
+        if sparse is None:
+            raise ImportError('project needs scipy, install it with pip install scipy')
+
+        onto_codes, via_codes, labels, n_groups, rows = self._memberships(onto_col, via_col)
+        matrix = incidence(onto_codes, via_codes, len(labels), n_groups, max_group_size)
+        source, target, shared, values = project_pairs(matrix, weight, top_k, chunksize)
+
+        store = GraphStore()
+        store.add_nodes(onto_col, labels, rows)
+        edge_ids = store.add_edges((onto_col, onto_col), source, target, shared)
+        store.edge_attributes.set('weight', edge_ids, values)
+
+        # nodes keep the attributes they have here
+        ids = self.store.node_ids(labels)
+        known = np.flatnonzero(ids >= 0)
+        store.node_attributes.update(self.store.node_attributes.take(ids[known]), known)
+
+        netframe = self._sub_netframe(store)
+        netframe.node_columns = [onto_col]
+        netframe.edge_columns = [(onto_col, onto_col)]
+        netframe.node_attributes_map = {onto_col: self.node_attributes_map[onto_col]} \
+            if onto_col in (self.node_attributes_map or {}) else None
+        netframe.edge_attributes_map = None
+
+        return netframe
+
+    def _memberships(self, onto_col: str, via_col: str) -> Tuple[np.ndarray, np.ndarray, pd.Index, int, np.ndarray]:
+        """
+        Entity and group codes of every onto_col / via_col pair, from the frame or else from the store edges
+        of the link between the two columns
+
+        :param onto_col: str
+        :param via_col: str
+        :return: (entity codes, group codes, entity labels, number of groups, rows per entity)
+        """
+
+        if self.frame is not None:
+            onto_codes, labels = factorize_column(self.frame[onto_col], self.ignore_chars)
+            via_codes, groups = factorize_column(self.frame[via_col], self.ignore_chars)
+
+            return onto_codes, via_codes, labels, len(groups), np.bincount(onto_codes[onto_codes >= 0],
+                                                                            minlength=len(labels))
+
+        links = [link for link in ((onto_col, via_col), (via_col, onto_col)) if link in self.store.links]
+
+        if not links:
+            raise ValueError(f'project needs the frame or a ({onto_col}, {via_col}) link, this NetFrame keeps neither')
+
+        # edges are the rows holding both columns, in either orientation
+        link_edges = [self.store.edges_of(link) for link in links]
+        edge_ids = np.concatenate(link_edges)
+        link_rows = np.concatenate([self.store.link_counts[link][ids] for link, ids in zip(links, link_edges)])
+        forward = np.concatenate([np.full(len(ids), link[0] == onto_col) for link, ids in zip(links, link_edges)])
+        src, dst = self.store.src[edge_ids], self.store.dst[edge_ids]
+        entities, groups = np.where(forward, src, dst), np.where(forward, dst, src)
+
+        # entities only seen through the link count the rows behind their edges
+        if onto_col in self.store.counts:
+            nodes = np.union1d(self.store.nodes_of(onto_col), entities)
+            rows = self.store.counts[onto_col][nodes]
+        else:
+            nodes = np.unique(entities)
+            rows = np.bincount(np.searchsorted(nodes, entities), weights=link_rows,
+                               minlength=len(nodes)).astype(np.int64)
+
+        via_codes, group_ids = pd.factorize(groups)
+
+        return np.searchsorted(nodes, entities), via_codes, self.store.labels[nodes], len(group_ids), rows
+
+    def diff(self, other: 'NetFrame', counts: bool = False) -> GraphDiff:
+        """
+        Nodes and edges added, removed or changed going from this NetFrame to other, nodes are matched
+        by label, edges by (source, target) and attributes are compared by hash
+
+        :param other: NetFrame
+            usually a later build of the same map
+        :param counts: bool
+            also count a change in the rows behind a node or edge, or in the link of an edge, as a change
+        :return: GraphDiff of node labels and (source, target) pairs
+        """
+
+        changes = self.store.diff(other.store, counts)
+
+        def edges(store, ids):
+            return list(zip(store.labels[store.src[ids]].tolist(), store.labels[store.dst[ids]].tolist()))
+
+        return GraphDiff(added_nodes=other.store.labels[changes['added_nodes']].tolist(),
+                         removed_nodes=self.store.labels[changes['removed_nodes']].tolist(),
+                         changed_nodes=other.store.labels[changes['changed_nodes']].tolist(),
+                         added_edges=edges(other.store, changes['added_edges']),
+                         removed_edges=edges(self.store, changes['removed_edges']),
+                         changed_edges=edges(other.store, changes['changed_edges']))
 
     def flush_network(self) -> None:
         """
-        Flush network empty
+        Flush network, it is rebuilt from the maps on next access
 
         """
 
-        self.net = Graph()
+        self._net = None
+        self._net_stale = True
 
     def to_json(self) -> dict:
         """
@@ -359,52 +1213,139 @@ class NetFrame:
 
         return json_graph.node_link_data(self.net)
 
-    def join_graph(self, netframe) -> None:
+    def iter_json(self, ndjson: bool = False, chunksize: int = 10000, edges: str = None) -> Iterator[str]:
+        """
+        Node-link JSON straight from the maps, yielded as text a chunk of records at a time
+
+        :param ndjson: bool
+            one record per line instead of a single document, nodes as {"id", "attributes"} and
+            edges as {"source", "target", "attributes"}
+        :param chunksize: int
+            nodes or edges converted per yielded piece, memory does not grow with the graph
+        :param edges: str
+            key of the edge list, defaults to the one to_json uses with the installed networkx
+        :return: Iterator[str]
         """
-        Join two NetFrames together into current NetFrame
 
-        :param netframe: NetFrame to join on
+        key = edges or node_link_edges()
+
+        # edges stored in both orientations are one edge of the undirected Graph, later attributes win,
+        # a MultiGraph keeps every stored edge once per row instead
+        if self.multigraph:
+            edge_ids, reversed_edges = self.store.live_edges(), dict()
+        else:
+            edge_ids, reversed_edges = self.store.undirected_edges()
+
+        def node_records():
+            for start in range(0, self.store.n_nodes, chunksize):
+                chunk = np.arange(start, min(start + chunksize, self.store.n_nodes))
+
+                for label, attributes in self.store.iter_nodes(chunk):
+                    yield {'id': label, 'attributes': attributes} if ndjson else {**attributes, 'id': label}
+
+        def edge_records():
+            for start in range(0, len(edge_ids), chunksize):
+                chunk = edge_ids[start:start + chunksize]
+
+                if self.multigraph:
+                    for source, target, attributes in self._iter_multi_edges(chunk):
+                        yield {'source': source, 'target': target, 'attributes': attributes} if ndjson else \
+                            {**attributes, 'source': source, 'target': target}
+                    continue
+
+                for idx, (source, target, attributes) in zip(chunk.tolist(), self.store.iter_edges(chunk)):
+                    for other in reversed_edges.get(idx, []):
+                        attributes.update(self.store.edge_attributes.row(other))
+
+                    yield {'source': source, 'target': target, 'attributes': attributes} if ndjson else \
+                        {**attributes, 'source': source, 'target': target}
+
+        encode = json.JSONEncoder(allow_nan=False).encode
+
+        def dumps(chunk):
+            return '\n'.join(map(encode, chunk)) + '\n' if ndjson else encode(chunk)[1:-1]
+
+        def pieces(records):
+            chunk = list()
+
+            for record in records:
+                chunk.append(record)
+
+                if len(chunk) == chunksize:
+                    yield chunk
+                    chunk = list()
+
+            if chunk:
+                yield chunk
 
+        def encoded(records):
+            for position, chunk in enumerate(pieces(records)):
+
+                # plain chunks go through the C encoder as is, only chunks with NaN or numpy values are cleaned
+                try:
+                    text = dumps(chunk)
+                except (ValueError, TypeError):
+                    text = dumps(json_safe(chunk))
+
+                yield text if position == 0 or ndjson else ', ' + text
+
+        if ndjson:
+            yield from encoded(node_records())
+            yield from encoded(edge_records())
+            return
+
+        yield '{"directed": false, "multigraph": %s, "graph": {}, "nodes": [' % json.dumps(self.multigraph)
+        yield from encoded(node_records())
+        yield '], %s: [' % json.dumps(key)
+        yield from encoded(edge_records())
+        yield ']}'
+
+    def to_json_stream(self, fp, ndjson: bool = False, chunksize: int = 10000, edges: str = None) -> None:
         """
+        Write node-link JSON or NDJSON to a file incrementally, NaN attributes are written as null
 
-        # list of nodes to pass to graph
-        nodes = list()
+        :param fp: writable text file or path
+        :param ndjson: bool
+        :param chunksize: int
+        :param edges: str
+            key of the edge list, see iter_json
+        """
 
-        for node in netframe.node_map.map.keys():
-            nodes.extend(unpack_source_col(node, netframe.node_map.map))
+        if isinstance(fp, (str, os.PathLike)):
+            with open(fp, 'w') as file:
+                return self.to_json_stream(file, ndjson, chunksize, edges)
 
-        for node in self.node_map.map.keys():
-            nodes.extend(unpack_source_col(node, self.node_map.map))
+        for piece in self.iter_json(ndjson, chunksize, edges):
+            fp.write(piece)
 
-        # list of edges to pass to new graph
-        edges = list()
+    @instrument('join_graph')
+    def join_graph(self, netframe, conflict: str = 'replace') -> None:
+        """
+        Join two NetFrames together into current NetFrame
 
-        for edge in netframe.edge_map.map.keys():
-            edges.append(Edge(name=(edge[0], edge[1]),
-                              attributes=netframe.edge_map.map[(edge[0], edge[1])]['attributes'],
-                              source_col=netframe.edge_map.map[(edge[0], edge[1])]['source_col'],
-                              target_col=netframe.edge_map.map[(edge[0], edge[1])]['target_col']))
+        :param netframe: NetFrame to join on
+        :param conflict: str
+            attribute values set on both sides, one of keep, replace (the joined NetFrame wins),
+            error, list, sum or mean
 
-        for edge in self.edge_map.map.keys():
-            edges.append(Edge(name=(edge[0], edge[1]),
-                              attributes=self.edge_map.map[(edge[0], edge[1])]['attributes'],
-                              source_col=self.edge_map.map[(edge[0], edge[1])]['source_col'],
-                              target_col=self.edge_map.map[(edge[0], edge[1])]['target_col']))
+        """
 
-        # flush and update nodes and edges
-        self.node_map.flush()
-        self.node_map.update(nodes)
-        self.edge_map.flush()
-        self.edge_map.update(edges)
+        # fold the other store in, only new or overlapping keys are touched
+        node_ids, edge_ids = self.store.merge(netframe.store, conflict)
 
         # join meta data mappings
-        self.node_columns.extend(netframe.node_columns)
-        self.edge_columns.extend(netframe.edge_columns)
-
-        # repopulate network
-        self.populate_network()
+        self.node_columns.extend([col for col in netframe.node_columns if col not in self.node_columns])
+        self.edge_columns.extend([col for col in netframe.edge_columns if col not in self.edge_columns])
+        self.node_attributes_map = {**(self.node_attributes_map or {}), **(netframe.node_attributes_map or {})}
+        self.edge_attributes_map = {**(self.edge_attributes_map or {}), **(netframe.edge_attributes_map or {})}
+
+        # update a built network with the joined nodes and edges only, otherwise leave it for next access
+        if self._network_built():
+            self._refresh_network(node_ids, edge_ids)
+        else:
+            self._net_stale = True
 
-    def join_all(self, netframe, left_on: str, right_on: str,  how: str = 'left') -> None:
+    def join_all(self, netframe, left_on: str, right_on: str,  how: str = 'left', conflict: str = 'replace') -> None:
         """
         Join both graph and dataframe together on single column, left join outward from NetFrame
 
@@ -412,38 +1353,269 @@ class NetFrame:
         :param left_on: str
         :param right_on: str
         :param how: str
+        :param conflict: str
+            attribute conflict policy passed to join_graph
         """
 
         # TODO: revisit this
 
         self.frame = pd.merge(left=self.frame, right=netframe.frame, left_on=left_on, right_on=right_on, how=how)
-        self.join_graph(netframe)
+        self.join_graph(netframe, conflict)
+        self._mark_built()
+
+    def _mark_built(self) -> None:
+        """
+        Remember the frame the maps now reflect
+
+        """
+
+        self._built_frame = self.frame
+        self._built_index = None if self.frame is None else self.frame.index
 
-    def apply_dataframe(self) -> None:
+    def _remove_frame_rows(self, removed: DataFrame) -> None:
+        """
+        Take the contribution of removed rows back out of the maps and network, self.frame must already exclude them
+
+        :param removed: DataFrame
+        """
+
+        node_ids, edge_ids = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+        built = self._network_built()
+
+        # nodes and edges lose the rows they were extracted from
+        for col, uniques, counts in self._create_nodes(list(self.node_columns), self.ignore_chars, dataframe=removed):
+            ids = self.store.node_ids(uniques)
+            self.store.add_nodes(col, uniques[ids >= 0], -counts[ids >= 0])
+            node_ids.append(ids[ids >= 0])
+
+        for link, (source_uniques, target_uniques, source_codes, target_codes, counts) in \
+                self._create_edges(list(self.edge_columns), self.ignore_chars, dataframe=removed):
+            source = self.store.node_ids(source_uniques)[source_codes]
+            target = self.store.node_ids(target_uniques)[target_codes]
+            ids = self.store.edge_ids(source, target)
+            self.store.count_edges(link, ids[ids >= 0], -counts[ids >= 0])
+            edge_ids.append(ids[ids >= 0])
+            node_ids.extend([source, target])
+
+        node_ids, edge_ids = np.unique(np.concatenate(node_ids)), np.unique(np.concatenate(edge_ids))
+
+        # attributes of touched nodes and edges are rebuilt from the rows that remain
+        labels = self.store.labels[node_ids]
+
+        # every attribute is unset before any is refilled, columns sharing an attribute name refill it in
+        # build order as a full build would
+        for attributes in (self.node_attributes_map or {}).values():
+            for attribute in attributes:
+                self.store.node_attributes.unset(attribute, node_ids)
+
+        for attributes in (self.edge_attributes_map or {}).values():
+            for attribute in attributes:
+                self.store.edge_attributes.unset(attribute, edge_ids)
+
+        for col, attributes in (self.node_attributes_map or {}).items():
+            self.set_node_attributes({col: attributes}, dataframe=self.frame[self.frame[col].isin(labels)])
+
+        for link, attributes in (self.edge_attributes_map or {}).items():
+            rows = self.frame[self.frame[link[0]].isin(self.store.labels[self.store.src[edge_ids]])]
+            self.set_edge_attributes({link: attributes}, dataframe=rows)
+
+        # edges without rows, then nodes with neither rows nor live edges, are dropped
+        dead_edges = edge_ids[self.store.edge_counts[edge_ids] <= 0]
+        live = np.zeros(self.store.n_edges, dtype=bool)
+        live[self.store.live_edges()] = True
+        live[dead_edges] = False
+        endpoint = np.zeros(self.store.n_nodes, dtype=bool)
+        endpoint[self.store.src[live]] = True
+        endpoint[self.store.dst[live]] = True
+        dead_nodes = node_ids[~self.store.mapped()[node_ids] & ~endpoint[node_ids]]
+
+        dead_sources = self.store.labels[self.store.src[dead_edges]]
+        dead_targets = self.store.labels[self.store.dst[dead_edges]]
+        dead_labels = self.store.labels[dead_nodes]
+
+        # surviving edges lost rows, their weight or parallel edges change
+        counted = edge_ids[live[edge_ids]] if self.store.weight is not None or self.multigraph \
+            else np.empty(0, dtype=np.int64)
+        counted_sources = self.store.labels[self.store.src[counted]]
+        counted_targets = self.store.labels[self.store.dst[counted]]
+        remap = self.store.remove(node_ids=dead_nodes, edge_ids=dead_edges)
+
+        if not built:
+            self._net_stale = True
+            return
+
+        self._drop_network_edges(dead_sources.tolist(), dead_targets.tolist())
+        self._net.remove_nodes_from(dead_labels.tolist())
+
+        # the graph is undirected, a surviving reversed edge has to be put back
+        source, target = self.store.node_ids(dead_targets.append(counted_sources)), \
+            self.store.node_ids(dead_sources.append(counted_targets))
+        known = (source >= 0) & (target >= 0)
+        refreshed = np.concatenate([self.store.edge_ids(source[known], target[known]),
+                                    self.store.edge_ids(target[known], source[known])])
+
+        self._refresh_network(remap[node_ids][remap[node_ids] >= 0], np.unique(refreshed[refreshed >= 0]),
+                              replace=True)
+
+    def _refresh_network(self, node_ids: np.ndarray = None, edge_ids: np.ndarray = None,
+                         replace: bool = False) -> None:
+        """
+        Push store values for a subset of nodes and edges into a materialized network
+
+        :param node_ids: np.ndarray
+        :param edge_ids: np.ndarray
+        :param replace: bool
+            drop map attributes from the network before updating, for values that were unset
+        """
+
+        if node_ids is not None and len(node_ids):
+
+            if replace:
+                for node in self.store.labels[node_ids].tolist():
+                    if node in self._net:
+                        for attributes in (self.node_attributes_map or {}).values():
+                            for attribute in attributes:
+                                self._net.nodes[node].pop(attribute, None)
+
+            self._net.add_nodes_from(self.store.iter_nodes(node_ids))
+
+        if edge_ids is not None and len(edge_ids) and self.multigraph:
+
+            # parallel edges are rebuilt per pair, both orientations included
+            sources, targets = self.store.src[edge_ids], self.store.dst[edge_ids]
+            reversed_ids = self.store.edge_ids(targets, sources)
+            edge_ids = np.union1d(edge_ids, reversed_ids[reversed_ids >= 0])
+            self._drop_network_edges(self.store.labels[sources].tolist(), self.store.labels[targets].tolist())
+            self._net.add_edges_from(self._iter_multi_edges(edge_ids))
+
+        elif edge_ids is not None and len(edge_ids):
+            self._net.add_edges_from(self.store.iter_edges(edge_ids))
+
+        self._net_stale = False
+
+    def append_rows(self, dataframe: DataFrame) -> None:
+        """
+        Append rows to frame and fold only those rows into the maps and network
+
+        :param dataframe: DataFrame
+        """
+
+        # default integer indexes keep counting instead of repeating labels
+        renumber = isinstance(dataframe.index, pd.RangeIndex) and (
+            self.frame is None or isinstance(self.frame.index, pd.RangeIndex))
+        self.frame = dataframe if self.frame is None else pd.concat([self.frame, dataframe], ignore_index=renumber)
+        built = self._network_built()
+
+        node_ids, edge_ids = self._build(dataframe, self.node_columns, self.edge_columns, self.ignore_chars,
+                                         self.node_attributes_map, self.edge_attributes_map, combine=True)
+
+        if built:
+            self._refresh_network(node_ids, edge_ids)
+        self._mark_built()
+
+    def remove_rows(self, index) -> None:
+        """
+        Drop rows from frame by index label and take them back out of the maps and network
+
+        :param index: index labels to drop
+        """
+
+        removed = self.frame.loc[index]
+        self.frame = self.frame.drop(index)
+        self._remove_frame_rows(removed)
+        self._mark_built()
+
+    def _require_frame(self, operation: str) -> None:
+        """
+        Fail on operations that rebuild from frame when the NetFrame keeps none, as from_chunks, load,
+        snapshots, sub-NetFrames and projections do
+
+        :param operation: str
+        """
+
+        if self.frame is None:
+            raise ValueError(f'{operation} rebuilds from frame and this NetFrame keeps none, set frame first')
+
+    def apply_dataframe(self, incremental: bool = False) -> None:
         """
         Apply frame changes to net
 
+        :param incremental: bool
+            only apply rows appended to or dropped from frame since the last build, found by index label.
+            Rows edited in place are not detected, falls back to a full rebuild when the delta cannot be read
         """
 
+        # checked before anything is flushed, a NetFrame without a frame keeps its maps
+        self._require_frame('apply_dataframe')
+
+        if incremental and self._incremental_apply():
+            return
+
         # flush maps and network
-        self.node_map.flush()
-        self.edge_map.flush()
+        self.store.flush()
         self.flush_network()
 
-        # apply new changes from frame to net
-        self.add_nodes(self.node_columns)
-        self.add_edges(self.edge_columns)
-        self.populate_network()
+        # apply new changes from frame to the maps, attributes included, net follows on next access
+        self._build(self.frame, self.node_columns, self.edge_columns, self.ignore_chars,
+                    self.node_attributes_map, self.edge_attributes_map)
+        self._mark_built()
+
+    def _incremental_apply(self) -> bool:
+        """
+        Apply appended and dropped rows, returns False when a full rebuild is needed
+
+        :return: bool
+        """
+
+        built, index = self._built_index, self.frame.index
+
+        if built is None or not built.is_unique or not index.is_unique:
+            return False
+
+        added = index[~index.isin(built)]
+        removed = built[~built.isin(index)]
+
+        # dropped rows are read back from the frame they were built from
+        if len(removed) and not removed.isin(self._built_frame.index).all():
+            return False
+
+        if len(removed):
+            self._remove_frame_rows(self._built_frame.loc[removed])
+
+        if len(added):
+            built = self._network_built()
+            node_ids, edge_ids = self._build(self.frame.loc[added], self.node_columns, self.edge_columns,
+                                             self.ignore_chars, self.node_attributes_map, self.edge_attributes_map,
+                                             combine=True)
+
+            if built:
+                self._refresh_network(node_ids, edge_ids)
+
+        self._mark_built()
+
+        return True
 
     def apply_map(self):
         """
-        Apply map object stored within in NetFrame
+        Apply map object stored within in NetFrame, the new network is built lazily as well
 
         :return:
         """
 
+        self._require_frame('apply_map')
+
         return NetFrame(self.frame,
                         nodes=self.node_columns,
                         links=self.edge_columns,
                         node_attributes=self.node_attributes_map,
-                        edge_attributes=self.edge_attributes_map)
+                        edge_attributes=self.edge_attributes_map,
+                        ignore_chars=self.ignore_chars,
+                        aggregate=self.aggregate,
+                        n_jobs=self.n_jobs,
+                        executor=self.executor,
+                        cache=self.cache,
+                        profile=self.stats.enabled,
+                        hooks=self.stats.hooks,
+                        weight=self.store.weight,
+                        multigraph=self.multigraph,
+                        categorize=self.categorize)
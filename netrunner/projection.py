@@ -0,0 +1,138 @@
+"""
+One-mode projections of a bipartite column-to-column network, used by NetFrame.project
+
+Memberships are held in a sparse incidence matrix B (entities x groups) and the
+projection is B @ B.T, computed a block of rows at a time so top-k pruning bounds
+memory by the block rather than by the full projection.
+
+"""
+
+from typing import Tuple
+import numpy as np
+
+try:
+    from scipy import sparse
+except ImportError:
+    sparse = None
+
+# edge weights a projection can carry
+PROJECTION_WEIGHTS = ('count', 'newman', 'jaccard')
+
+
+def incidence(entity_codes: np.ndarray, group_codes: np.ndarray, n_entities: int, n_groups: int,
+              max_group_size: int = None):
+    """
+    Binary entity x group matrix, repeated memberships count once
+
+    :param entity_codes: np.ndarray
+    :param group_codes: np.ndarray
+        aligned to entity_codes, rows with a -1 on either side are skipped
+    :param n_entities: int
+    :param n_groups: int
+    :param max_group_size: int
+        groups with more members are dropped, they add a dense block of weak links
+    :return: scipy.sparse.csr_array
+    """
+
+    keep = (entity_codes >= 0) & (group_codes >= 0)
+    matrix = sparse.csr_array((np.ones(keep.sum()), (entity_codes[keep], group_codes[keep])),
+                              shape=(n_entities, n_groups))
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+
+    if max_group_size is None:
+        return matrix
+
+    sizes = np.asarray(matrix.sum(axis=0)).ravel()
+
+    return matrix[:, np.flatnonzero(sizes <= max_group_size)].tocsr()
+
+
+def top_k_rows(rows: np.ndarray, data: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Mask of the k largest entries of every row, ties keep input order
+
+    :param rows: np.ndarray
+        row of every entry counted from 0 within the block
+    :param data: np.ndarray
+    :param top_k: int
+    :return: np.ndarray of bool
+    """
+
+    # stable sorts, by value and then by row, small row numbers take numpy's radix sort
+    order = np.argsort(-data, kind='stable')
+    keys = rows[order]
+    order = order[np.argsort(keys.astype(np.uint16) if len(keys) and keys.max() < 2 ** 16 else keys, kind='stable')]
+
+    sizes = np.bincount(rows)
+    starts = np.repeat(np.cumsum(sizes) - sizes, sizes)
+    keep = np.zeros(len(rows), dtype=bool)
+    keep[order] = np.arange(len(order)) - starts < top_k
+
+    return keep
+
+
+def project_pairs(matrix, weight: str = 'count', top_k: int = None,
+                  chunksize: int = 10000) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Pairs of entities sharing a group
+
+    :param matrix: binary entity x group matrix from incidence
+    :param weight: str
+        count of shared groups, newman (each shared group adds 1 / (members - 1)) or jaccard
+        (shared groups over the groups of either entity)
+    :param top_k: int
+        keep a pair only when it is among the k heaviest of either entity
+    :param chunksize: int
+        entities projected per block
+    :return: (source codes, target codes, shared groups, weights) with source < target
+    """
+
+    if weight not in PROJECTION_WEIGHTS:
+        raise ValueError(f'Unknown projection weight {weight}, expected one of {", ".join(PROJECTION_WEIGHTS)}')
+
+    sizes = np.asarray(matrix.sum(axis=0)).ravel()
+    degrees = np.asarray(matrix.sum(axis=1)).ravel()
+    scaled = matrix @ sparse.diags_array(1 / np.maximum(sizes - 1, 1)) if weight == 'newman' else None
+    transposed = matrix.T.tocsr()
+    pieces = list()
+
+    def product(left):
+        result = (left @ transposed).tocsr()
+        result.sort_indices()
+
+        return result.tocoo()
+
+    for start in range(0, matrix.shape[0], chunksize):
+        shared = product(matrix[start:start + chunksize])
+        rows, cols, counts = shared.row + start, shared.col, shared.data
+        off = rows != cols
+
+        if weight == 'newman':
+
+            # same sparsity as shared, entries line up once indices are sorted
+            values = product(scaled[start:start + chunksize]).data
+        elif weight == 'jaccard':
+            values = counts / (degrees[rows] + degrees[cols] - counts)
+        else:
+            values = counts
+
+        rows, cols, counts, values = rows[off], cols[off], counts[off], values[off]
+
+        # a pair is kept by top_k from either side, otherwise each pair is read once from its lower row
+        keep = top_k_rows(rows - start, values, top_k) if top_k else rows < cols
+        pieces.append((np.minimum(rows, cols)[keep], np.maximum(rows, cols)[keep], counts[keep], values[keep]))
+
+    if not pieces:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, np.empty(0)
+
+    source, target, counts, values = (np.concatenate(piece) for piece in zip(*pieces))
+
+    # pairs picked from both sides show up twice
+    _, first = np.unique(source.astype(np.int64) * matrix.shape[0] + target, return_index=True)
+
+    counts = counts[first].astype(np.int64)
+
+    return source[first].astype(np.int64), target[first].astype(np.int64), counts, \
+        counts if weight == 'count' else values[first]
@@ -0,0 +1,179 @@
+"""
+Versioned NetFrame snapshots kept in one directory
+
+Every full_every-th version is written in full with NetFrame.save, the versions
+in between only hold what changed since the version before: a saved sub-store
+of added or changed nodes and edges plus the labels of removed ones. Loading a
+version replays the deltas on top of the nearest full copy.
+
+"""
+
+from netrunner.models import GraphDiff
+from netrunner.netframe import NetFrame
+from netrunner.store import load_array, save_array
+from typing import List
+import json
+import numpy as np
+import os
+import shutil
+
+
+class Snapshots:
+    """
+    Series of versions of the same map, numbered from 0 in commit order
+
+    """
+
+    def __init__(self, path: str, full_every: int = 10) -> None:
+        self.path = path
+        self.full_every = full_every
+
+        os.makedirs(self.path, exist_ok=True)
+
+    def _read_index(self) -> List[dict]:
+
+        index_path = os.path.join(self.path, 'index.json')
+
+        if not os.path.exists(index_path):
+            return list()
+
+        with open(index_path) as index_file:
+            return json.load(index_file)['versions']
+
+    def _write_index(self, versions: List[dict]) -> None:
+
+        # written aside and renamed so readers never see half an index
+        staging = os.path.join(self.path, 'index.json.tmp')
+
+        with open(staging, 'w') as index_file:
+            json.dump({'versions': versions}, index_file)
+
+        os.replace(staging, os.path.join(self.path, 'index.json'))
+
+    def _version_path(self, version: int) -> str:
+        return os.path.join(self.path, f'{version:06d}')
+
+    @property
+    def versions(self) -> List[int]:
+        return [entry['version'] for entry in self._read_index()]
+
+    def commit(self, netframe: NetFrame) -> int:
+        """
+        Store netframe as the next version, as a delta against the latest one unless a full copy is due
+        or the delta would not be smaller
+
+        :param netframe: NetFrame
+        :return: int version number
+        """
+
+        versions = self._read_index()
+        version = len(versions)
+        path = self._version_path(version)
+        shutil.rmtree(path, ignore_errors=True)
+
+        # a compacted copy is written, compacting netframe itself would renumber the ids it hands out
+        netframe = netframe._sub_netframe(netframe.store.subgraph(netframe.store.live_nodes(),
+                                                                  netframe.store.live_edges()))
+        store = netframe.store
+        full = version % self.full_every == 0
+
+        if not full:
+            previous = self.load(version - 1).store
+            changes = previous.diff(store, counts=True)
+            node_ids = np.union1d(changes['added_nodes'], changes['changed_nodes'])
+            edge_ids = np.union1d(changes['added_edges'], changes['changed_edges'])
+            full = 2 * (len(node_ids) + len(edge_ids)) > store.n_nodes + store.n_edges
+
+        if full:
+            netframe.save(path)
+        else:
+            netframe._sub_netframe(store.subgraph(node_ids, edge_ids)).save(path)
+            removed_edges = changes['removed_edges']
+            meta = {
+                'nodes': save_array(path, 'removed_nodes', previous.labels[changes['removed_nodes']].to_numpy()),
+                'sources': save_array(path, 'removed_sources', previous.labels[previous.src[removed_edges]].to_numpy()),
+                'targets': save_array(path, 'removed_targets', previous.labels[previous.dst[removed_edges]].to_numpy()),
+            }
+
+            with open(os.path.join(path, 'removed.json'), 'w') as meta_file:
+                json.dump(meta, meta_file)
+
+        versions.append({'version': version, 'full': full})
+        self._write_index(versions)
+
+        return version
+
+    def load(self, version: int = None, **params) -> NetFrame:
+        """
+        Rebuild a version from the nearest full copy and the deltas after it
+
+        :param version: int
+            defaults to the latest version
+        :param params: other NetFrame parameters such as n_jobs
+        :return: NetFrame without a frame
+        """
+
+        versions = self._read_index()
+
+        if not versions:
+            raise KeyError(f'No versions in {self.path}')
+
+        version = len(versions) - 1 if version is None else version
+
+        if not 0 <= version < len(versions):
+            raise KeyError(version)
+
+        base = max(entry['version'] for entry in versions[:version + 1] if entry['full'])
+        netframe = NetFrame.load(self._version_path(base), mmap=False, **params)
+
+        for step in range(base + 1, version + 1):
+            self._apply(netframe, self._version_path(step))
+
+        return netframe
+
+    @staticmethod
+    def _apply(netframe: NetFrame, path: str) -> None:
+        """
+        Replay one delta onto netframe
+
+        :param netframe: NetFrame
+        :param path: str
+            delta directory
+        """
+
+        with open(os.path.join(path, 'removed.json')) as meta_file:
+            meta = json.load(meta_file)
+
+        store = netframe.store
+        nodes = store.node_ids(load_array(path, 'removed_nodes', False, meta['nodes']))
+        sources = store.node_ids(load_array(path, 'removed_sources', False, meta['sources']))
+        targets = store.node_ids(load_array(path, 'removed_targets', False, meta['targets']))
+        known = (sources >= 0) & (targets >= 0)
+        edges = store.edge_ids(sources[known], targets[known])
+        store.remove(node_ids=nodes[nodes >= 0], edge_ids=edges[edges >= 0])
+
+        # the map settings of the newer version win as well
+        delta = NetFrame.load(path, mmap=False)
+        store.upsert(delta.store)
+        netframe.node_columns = delta.node_columns
+        netframe.edge_columns = delta.edge_columns
+        netframe.node_attributes_map = delta.node_attributes_map
+        netframe.edge_attributes_map = delta.edge_attributes_map
+        netframe.aggregate = delta.aggregate
+        netframe.ignore_chars = delta.ignore_chars
+        netframe.multigraph = delta.multigraph
+        netframe.flush_network()
+
+    def diff(self, old: int, new: int = None, counts: bool = False) -> GraphDiff:
+        """
+        Changes between two versions
+
+        :param old: int
+        :param new: int
+            defaults to the latest version
+        :param counts: bool
+            see NetFrame.diff
+        :return: GraphDiff
+        """
+
+        return self.load(old).diff(self.load(new), counts)
@@ -0,0 +1,121 @@
+"""
+Per-phase build instrumentation for NetFrame
+
+Disabled stats cost one attribute check per instrumented call, enabled stats
+record a timing, row / node / edge counts and the store size after each phase
+and hand every record to the registered hooks.
+
+"""
+
+from functools import wraps
+from typing import Callable, List
+import inspect
+import time
+import pandas as pd
+
+
+class BuildStats:
+    """
+    Records of instrumented NetFrame phases, in call order
+
+    """
+
+    def __init__(self, enabled: bool = False, hooks: List[Callable] = None) -> None:
+        self.hooks = list(hooks or [])
+        self.enabled = enabled or bool(self.hooks)
+        self.records = list()
+
+    def add_hook(self, hook: Callable) -> None:
+        """
+        Call hook(record) after every phase, enables recording
+
+        :param hook: Callable
+        """
+
+        self.hooks.append(hook)
+        self.enabled = True
+
+    def record(self, phase: str, seconds: float, rows: int = None, store=None, bytes_before: int = 0) -> dict:
+        """
+        Store one phase record and pass it to the hooks
+
+        :param phase: str
+        :param seconds: float
+        :param rows: int
+            frame rows the phase read, None when it reads no frame
+        :param store: GraphStore
+            store the counts and size are read from
+        :param bytes_before: int
+            store size before the phase
+        :return: dict
+        """
+
+        size = store.nbytes if store is not None else 0
+        record = {'phase': phase, 'seconds': seconds, 'rows': rows,
+                  'nodes': store.n_nodes if store is not None else None,
+                  'edges': store.n_edges if store is not None else None,
+                  'bytes': size, 'bytes_delta': size - bytes_before}
+
+        self.records.append(record)
+
+        for hook in self.hooks:
+            hook(record)
+
+        return record
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Calls, total seconds and rows per phase
+
+        :return: DataFrame indexed by phase
+        """
+
+        frame = self.to_frame()
+
+        if frame.empty:
+            return pd.DataFrame(columns=['calls', 'seconds', 'rows'])
+
+        return frame.groupby('phase', sort=False).agg(calls=('seconds', 'size'), seconds=('seconds', 'sum'),
+                                                      rows=('rows', 'sum'))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records, columns=['phase', 'seconds', 'rows', 'nodes', 'edges', 'bytes',
+                                                   'bytes_delta'])
+
+    def reset(self) -> None:
+        self.records = list()
+
+
+def instrument(phase: str) -> Callable:
+    """
+    Record a NetFrame method as a phase in self.stats, rows come from its dataframe argument
+
+    :param phase: str
+    :return: Callable decorator
+    """
+
+    def decorate(method: Callable) -> Callable:
+
+        signature = inspect.signature(method)
+
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+
+            stats = self.stats
+
+            if not stats.enabled:
+                return method(self, *args, **kwargs)
+
+            dataframe = signature.bind(self, *args, **kwargs).arguments.get('dataframe')
+            dataframe = self.frame if dataframe is None and 'dataframe' in signature.parameters else dataframe
+            bytes_before = self.store.nbytes
+            start = time.perf_counter()
+            result = method(self, *args, **kwargs)
+            stats.record(phase, time.perf_counter() - start, None if dataframe is None else len(dataframe),
+                         self.store, bytes_before)
+
+            return result
+
+        return wrapper
+
+    return decorate
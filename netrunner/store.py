@@ -0,0 +1,1665 @@
+"""
+Compact, array backed storage behind NodeMap and EdgeMap
+
+Node labels are factorized to contiguous integer ids, edges are kept as
+integer arrays and attributes are stored column-wise against those ids.
+
+"""
+
+from typing import Iterator, List, Tuple
+import json
+import numpy as np
+import os
+import pandas as pd
+
+# numpy kinds kept in typed arrays, everything else is stored as objects
+TYPED_KINDS = 'biufcmM'
+
+# how attribute values set on both sides of a merge are resolved
+CONFLICTS = ('keep', 'replace', 'error', 'list', 'sum', 'mean')
+
+# bumped whenever the on-disk layout of GraphStore.save changes
+FORMAT_VERSION = 2
+
+
+def as_array(values) -> np.ndarray:
+    """
+    Coerce attribute values to a flat numpy array without splitting nested values
+
+    :param values: Iterable
+    :return: np.ndarray
+    """
+
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy()
+
+    if isinstance(values, np.ndarray) and values.ndim == 1:
+        return values
+
+    values = list(values)
+    array = np.asarray(values) if values else np.empty(0, dtype=object)
+
+    if array.ndim == 1 and array.dtype.kind in TYPED_KINDS:
+        return array
+
+    # lists, dicts and strings go into object arrays one value per slot
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def as_list(value) -> list:
+    """
+    Wrap a single attribute value in a list, lists pass through
+
+    :param value: attribute value
+    :return: list
+    """
+
+    if isinstance(value, list):
+        return value
+
+    if isinstance(value, (tuple, np.ndarray)):
+        return list(value)
+
+    if isinstance(value, (np.datetime64, np.timedelta64)):
+        return python_values(np.asarray([value]))
+
+    return [value.item() if isinstance(value, np.generic) else value]
+
+
+def python_values(array: np.ndarray) -> list:
+    """
+    Array values as python objects, datetimes and timedeltas come back as pandas Timestamps and Timedeltas
+    rather than integer nanoseconds
+
+    :param array: np.ndarray
+    :return: list
+    """
+
+    if array.dtype.kind in 'mM':
+        return pd.Series(array, copy=False).tolist()
+
+    return array.tolist()
+
+
+def string_array(values: np.ndarray) -> np.ndarray:
+    """
+    Fixed width unicode copy of an object array of strings, which numpy can map unlike pickled objects
+
+    :param values: np.ndarray
+    :return: np.ndarray, None when the values are not all strings or do not fit a fixed width
+    """
+
+    if pd.api.types.infer_dtype(values, skipna=False) not in ('string', 'empty'):
+        return None
+
+    if not len(values):
+        return np.empty(0, dtype='U1')
+
+    lengths = pd.Series(values, copy=False).str.len().to_numpy()
+
+    # every value is padded to the longest one, a few very long values cost more than pickling
+    if lengths.max() * len(values) > 4 * lengths.sum() + 4096:
+        return None
+
+    array = values.astype(str)
+
+    # numpy strips trailing NUL characters
+    if (np.char.str_len(array) != lengths).any():
+        return None
+
+    return array
+
+
+def save_array(path: str, name: str, array: np.ndarray, mask: np.ndarray = None) -> str:
+    """
+    Write one array as .npy, strings as fixed width unicode and only other objects are pickled
+
+    :param path: str
+        directory
+    :param name: str
+        file name without extension
+    :param array: np.ndarray
+    :param mask: np.ndarray
+        slots that hold a value, the others are written as empty strings
+    :return: str storage for load_array, one of array, str or pickle
+    """
+
+    array = np.asarray(array)
+    storage = 'array'
+
+    if array.dtype == object:
+        mask = np.ones(len(array), dtype=bool) if mask is None else mask
+
+        # missing values of a string column are written as a null mask next to it, they come back as NaN
+        nulls = mask & pd.isna(array)
+        strings = string_array(array[mask & ~nulls]) \
+            if all(isinstance(value, float) for value in array[nulls]) else None
+        storage = 'pickle' if strings is None else 'str'
+
+        if strings is not None:
+            array = np.zeros(len(mask), dtype=strings.dtype)
+            array[mask & ~nulls] = strings
+
+            if nulls.any():
+                np.save(os.path.join(path, f'{name}_null.npy'), nulls)
+
+    np.save(os.path.join(path, f'{name}.npy'), array, allow_pickle=storage == 'pickle')
+
+    return storage
+
+
+def load_array(path: str, name: str, mmap: bool = True, storage='array', allow_pickle: bool = True) -> np.ndarray:
+    """
+    Read one array written by save_array
+
+    :param path: str
+        directory
+    :param name: str
+        file name without extension
+    :param mmap: bool
+        map typed arrays copy-on-write instead of reading them, pages are shared until written to
+    :param storage: str
+        returned by save_array, True and False from format 1 stores stand for pickle and array
+    :param allow_pickle: bool
+        read pickled object arrays, only for paths you trust
+    :return: np.ndarray, strings come back as an object array
+    """
+
+    file = os.path.join(path, f'{name}.npy')
+    storage = {True: 'pickle', False: 'array'}.get(storage, storage)
+
+    if storage == 'pickle':
+        if not allow_pickle:
+            raise ValueError(f'{file} holds pickled objects, load it with allow_pickle=True if you trust it')
+
+        return np.load(file, allow_pickle=True)
+
+    # empty arrays cannot be mapped
+    try:
+        array = np.asarray(np.load(file, mmap_mode='c' if mmap else None))
+    except ValueError:
+        array = np.load(file)
+
+    if storage != 'str':
+        return array
+
+    array = array.astype(object)
+    nulls = os.path.join(path, f'{name}_null.npy')
+
+    if os.path.exists(nulls):
+        array[np.load(nulls)] = np.nan
+
+    return array
+
+
+def hash_values(values: np.ndarray) -> np.ndarray:
+    """
+    uint64 hash per value, integers hash like the equal floats and objects by their repr
+
+    :param values: np.ndarray
+    :return: np.ndarray
+    """
+
+    if values.dtype.kind in 'iub':
+        values = values.astype(np.float64)
+
+    elif values.dtype == object and pd.api.types.infer_dtype(values, skipna=False) not in ('string', 'empty'):
+
+        # lists and mixed values have no vectorized hash, their repr tells 1 from '1'
+        values = np.fromiter((repr(value) for value in values), dtype=object, count=len(values))
+
+    return pd.util.hash_array(values, categorize=False)
+
+
+def combine_hashes(hashes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """
+    Fold one uint64 hash into another, order matters
+
+    """
+
+    with np.errstate(over='ignore'):
+        return hashes * np.uint64(1000003) ^ other
+
+
+def edge_keys(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """
+    Pack (src, dst) id pairs into a single int64 key
+
+    :param src: np.ndarray
+    :param dst: np.ndarray
+    :return: np.ndarray
+    """
+
+    return (np.asarray(src, dtype=np.int64) << 32) | np.asarray(dst, dtype=np.int64)
+
+
+class KeyIndex:
+    """
+    Hash lookup over an append-only sequence of keys
+
+    New keys go to a small tail index that is folded into the base once it
+    grows past a fraction of it, so appends never rehash every key.
+
+    """
+
+    def __init__(self, keys=None) -> None:
+        self.base = pd.Index([] if keys is None else keys, tupleize_cols=False)
+        self.tail = self.base[:0]
+
+    def __len__(self) -> int:
+        return len(self.base) + len(self.tail)
+
+    def get_indexer(self, values) -> np.ndarray:
+        """
+        Positions of values, -1 where missing
+
+        :param values: pd.Index or array of keys
+        :return: np.ndarray
+        """
+
+        ids = self.base.get_indexer(values).astype(np.int64) if len(self.base) else np.full(len(values), -1)
+
+        if len(self.tail):
+            missing = np.flatnonzero(ids == -1)
+            found = self.tail.get_indexer(values[missing])
+            ids[missing[found >= 0]] = found[found >= 0] + len(self.base)
+
+        return ids
+
+    def append(self, keys) -> None:
+        """
+        Add keys that are not in the index yet
+
+        :param keys: pd.Index of new, distinct keys
+        """
+
+        self.tail = self.tail.append(keys) if len(self.tail) else keys
+
+        if len(self.tail) > max(len(self.base) // 8, 1024):
+            self.base = self.base.append(self.tail) if len(self.base) else self.tail
+            self.tail = self.base[:0]
+
+
+class AttributeTable:
+    """
+    Column-wise attributes aligned to integer ids, a mask per column marks which values are set
+
+    """
+
+    def __init__(self, size: int = 0) -> None:
+        self.size = size
+        self.columns = dict()
+        self.masks = dict()
+
+        # rows behind each value of attributes aggregated with mean
+        self.weights = dict()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(column.nbytes + self.masks[name].nbytes for name, column in self.columns.items())
+
+    def resize(self, size: int) -> None:
+        """
+        Grow every column to size, new slots are unset
+
+        :param size: int
+        """
+
+        if size > self.size:
+
+            for name, column in self.columns.items():
+                extra = size - self.size
+                self.columns[name] = np.concatenate([column, np.zeros(extra, dtype=column.dtype)
+                                                     if column.dtype != object else np.full(extra, None)])
+                self.masks[name] = np.concatenate([self.masks[name], np.zeros(extra, dtype=bool)])
+
+            for name, weight in self.weights.items():
+                self.weights[name] = np.concatenate([weight, np.zeros(size - self.size, dtype=np.int64)])
+
+        self.size = size
+
+    def _column_for(self, name: str, values: np.ndarray) -> np.ndarray:
+        """
+        Fetch or create the column for name, widening its dtype to hold values
+
+        """
+
+        column = self.columns.get(name)
+
+        if column is None:
+            dtype = values.dtype if values.dtype.kind in TYPED_KINDS else object
+            column = np.zeros(self.size, dtype=dtype) if dtype != object else np.full(self.size, None)
+            self.masks[name] = np.zeros(self.size, dtype=bool)
+
+        elif column.dtype != values.dtype and column.dtype != object:
+
+            # same kind widens (int32 -> int64), mixing kinds falls back to objects
+            if column.dtype.kind == values.dtype.kind:
+                column = column.astype(np.result_type(column.dtype, values.dtype))
+            else:
+                column = column.astype(object)
+
+        self.columns[name] = column
+
+        return column
+
+    def set(self, name: str, ids, values, weights=None) -> None:
+        """
+        Bulk assign values for one attribute
+
+        :param name: str
+            attribute name
+        :param ids: array of integer ids
+        :param values: values aligned to ids
+        :param weights: rows behind each value, kept for later mean combines
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        values = as_array(values)
+
+        if len(ids) == 0:
+            return
+
+        column = self._column_for(name, values)
+        column[ids] = values
+        self.masks[name][ids] = True
+
+        if weights is not None and name not in self.weights:
+            self.weights[name] = np.ones(self.size, dtype=np.int64)
+
+        if name in self.weights:
+            self.weights[name][ids] = 1 if weights is None else weights
+
+    def combine(self, name: str, ids, values, how: str = 'last', weights=None) -> None:
+        """
+        Fold values into ids using an aggregation policy, ids without a value are simply set
+
+        :param name: str
+            attribute name
+        :param ids: array of integer ids
+        :param values: values aligned to ids, already aggregated per id
+        :param how: str
+            one of last, first, list, sum, mean, min, max or count
+        :param weights: rows behind each value, needed for mean
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        values = as_array(values)
+        weights = None if weights is None else np.asarray(weights, dtype=np.int64)
+
+        if how == 'last' or name not in self.columns:
+            return self.set(name, ids, values, weights if how == 'mean' else None)
+
+        present = self.masks[name][ids]
+
+        if how == 'first':
+            return self.set(name, ids[~present], values[~present])
+
+        old = self.columns[name][ids[present]]
+
+        if values.dtype == object or old.dtype == object or how == 'list':
+            merged = values.astype(object)
+        elif how == 'mean':
+
+            # a running mean of ints is rarely an int
+            merged = values.astype(np.result_type(values.dtype, old.dtype, np.float64))
+        else:
+            merged = values.astype(np.result_type(values.dtype, old.dtype))
+
+        if how == 'list':
+            merged[present] = np.fromiter((as_list(before) + as_list(after)
+                                           for before, after in zip(old, values[present])),
+                                          dtype=object, count=len(old))
+
+        elif how == 'sum':
+            merged[present] = old + values[present]
+
+        elif how == 'count':
+
+            # counts of both sides add up, a missing count is no rows
+            merged[present] = pd.Series(old).fillna(0).to_numpy() + pd.Series(values[present]).fillna(0).to_numpy()
+
+        elif how in ('min', 'max'):
+            pick = np.fmin if how == 'min' else np.fmax
+
+            if merged.dtype == object:
+                merged[present] = [after if pd.isna(before) else before if pd.isna(after) else
+                                   pick(before, after) for before, after in zip(old, values[present])]
+            else:
+                merged[present] = pick(old, values[present])
+
+        elif how == 'mean':
+            weights = np.ones(len(ids), dtype=np.int64) if weights is None else weights.copy()
+            old_weights = self.weights[name][ids[present]] if name in self.weights else np.ones(len(old))
+            new_weights = weights[present]
+            total = old_weights + new_weights
+
+            # all-null batches carry no weight and leave the running mean as is
+            with np.errstate(invalid='ignore', divide='ignore'):
+                merged[present] = (old * old_weights + np.where(new_weights > 0, values[present], 0) * new_weights) \
+                    / total
+
+            weights[present] = total
+
+        self.set(name, ids, merged, weights if how == 'mean' else None)
+
+    def unset(self, name: str, ids) -> None:
+        """
+        Clear values for one attribute
+
+        :param name: str
+        :param ids: array of integer ids
+        """
+
+        if name in self.masks:
+            self.masks[name][np.asarray(ids, dtype=np.int64)] = False
+
+    def get(self, name: str, ids) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Values and set mask of one attribute for ids
+
+        :param name: str
+        :param ids: array of integer ids
+        :return: (values, mask)
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        if name not in self.columns:
+            return np.full(len(ids), None), np.zeros(len(ids), dtype=bool)
+
+        return self.columns[name][ids], self.masks[name][ids]
+
+    def row(self, idx: int) -> dict:
+        """
+        Attributes of a single id as a dict
+
+        :param idx: int
+        :return: dict
+        """
+
+        return {name: python_values(column[idx:idx + 1])[0] if column.dtype != object else column[idx]
+                for name, column in self.columns.items() if self.masks[name][idx]}
+
+    def rows(self, ids=None) -> Iterator[dict]:
+        """
+        Attribute dicts for many ids, converting each column once
+
+        :param ids: array of integer ids, defaults to all
+        :return: Iterator[dict]
+        """
+
+        ids = np.arange(self.size) if ids is None else np.asarray(ids, dtype=np.int64)
+        names = list(self.columns.keys())
+        values = [python_values(self.columns[name][ids]) for name in names]
+        masks = [self.masks[name][ids].tolist() for name in names]
+
+        for position in range(len(ids)):
+            yield {name: value[position] for name, value, mask in zip(names, values, masks) if mask[position]}
+
+    def hashes(self, ids) -> np.ndarray:
+        """
+        uint64 hash of every row's set values, rows with the same attributes hash alike whatever the
+        column order or unused columns
+
+        :param ids: array of integer ids
+        :return: np.ndarray
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        hashes = np.zeros(len(ids), dtype=np.uint64)
+
+        for name in sorted(self.columns, key=str):
+            values, mask = self.get(name, ids)
+
+            if not mask.any():
+                continue
+
+            name_hash = hash_values(np.array([repr(name)], dtype=object))[0]
+            column = np.where(mask, combine_hashes(hash_values(values), name_hash), np.uint64(0))
+            hashes = np.where(mask, combine_hashes(hashes, column), hashes)
+
+        return hashes
+
+    def replace(self, other: 'AttributeTable', ids) -> None:
+        """
+        Make ids hold exactly the attributes of other, mean weights included
+
+        :param other: AttributeTable
+        :param ids: array of integer ids aligned to other
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+
+        for name in list(self.columns):
+            self.unset(name, ids)
+
+        for name, column in other.columns.items():
+            mask = other.masks[name]
+            self.set(name, ids[mask], column[mask], other.weights[name][mask] if name in other.weights else None)
+
+    def take(self, ids) -> 'AttributeTable':
+        """
+        New table holding only ids, renumbered in the given order
+
+        :param ids: array of integer ids
+        :return: AttributeTable
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        table = AttributeTable(len(ids))
+
+        for name, column in self.columns.items():
+            table.columns[name] = column[ids]
+            table.masks[name] = self.masks[name][ids]
+
+        for name, weight in self.weights.items():
+            table.weights[name] = weight[ids]
+
+        return table
+
+    def conflicts(self, other: 'AttributeTable', ids) -> List[str]:
+        """
+        Attributes set on both tables with different values, other row i compared to ids[i]
+
+        :param other: AttributeTable
+        :param ids: array of integer ids aligned to other
+        :return: list of attribute names
+        """
+
+        ids = np.asarray(ids, dtype=np.int64)
+        names = list()
+
+        for name, column in other.columns.items():
+
+            if name not in self.columns:
+                continue
+
+            both = other.masks[name] & self.masks[name][ids]
+            before, after = self.columns[name][ids[both]], column[both]
+            same = pd.isna(before) & pd.isna(after) if before.dtype != object else \
+                np.array([a is b or (pd.isna(a) is True and pd.isna(b) is True) for a, b in zip(before, after)],
+                         dtype=bool)
+
+            if not (same | (before == after)).all():
+                names.append(name)
+
+        return names
+
+    def update(self, other: 'AttributeTable', ids, conflict: str = 'replace') -> None:
+        """
+        Copy every set value of other onto ids, other row i lands on ids[i]
+
+        :param other: AttributeTable
+        :param ids: array of integer ids aligned to other
+        :param conflict: str
+            values set on both sides, one of keep, replace, error, list, sum or mean
+        """
+
+        if conflict not in CONFLICTS:
+            raise ValueError(f'Unknown conflict policy {conflict}, expected one of {", ".join(CONFLICTS)}')
+
+        if conflict == 'error':
+            conflicting = self.conflicts(other, ids)
+
+            if conflicting:
+                raise ValueError(f'Conflicting values for attributes {", ".join(conflicting)}')
+
+        ids = np.asarray(ids, dtype=np.int64)
+        how = {'keep': 'first', 'replace': 'last', 'error': 'last'}.get(conflict, conflict)
+
+        for name, column in other.columns.items():
+            mask = other.masks[name]
+            weights = other.weights[name][mask] if name in other.weights else None
+            self.combine(name, ids[mask], column[mask], how, weights)
+
+    def to_frame(self, index=None) -> pd.DataFrame:
+        """
+        Attributes as a DataFrame, unset values are missing
+
+        :param index: optional index for the rows
+        :return: DataFrame
+        """
+
+        data = dict()
+
+        for name, column in self.columns.items():
+            series = pd.Series(column, index=index, copy=False)
+            data[name] = series.where(self.masks[name]) if not self.masks[name].all() else series
+
+        return pd.DataFrame(data, index=index)
+
+    def save(self, path: str, prefix: str) -> dict:
+        """
+        Write columns, masks and mean weights as arrays named prefix_i
+
+        :param path: str
+            directory
+        :param prefix: str
+        :return: dict of meta data for load
+        """
+
+        names = list(self.columns.keys())
+        storage = list()
+
+        for i, name in enumerate(names):
+            storage.append(save_array(path, f'{prefix}_{i}', self.columns[name], self.masks[name]))
+            save_array(path, f'{prefix}_{i}_mask', self.masks[name])
+
+            if name in self.weights:
+                save_array(path, f'{prefix}_{i}_weight', self.weights[name])
+
+        return {'size': self.size, 'names': names, 'storage': storage,
+                'weights': [name in self.weights for name in names]}
+
+    @classmethod
+    def load(cls, path: str, prefix: str, meta: dict, mmap: bool = True,
+             allow_pickle: bool = True) -> 'AttributeTable':
+        """
+        Read a table written by save
+
+        :param path: str
+        :param prefix: str
+        :param meta: dict
+            returned by save
+        :param mmap: bool
+        :param allow_pickle: bool
+            read columns that had to be pickled
+        :return: AttributeTable
+        """
+
+        table = cls(meta['size'])
+        storage = meta.get('storage', meta.get('objects'))
+
+        for i, (name, stored, weights) in enumerate(zip(meta['names'], storage, meta['weights'])):
+            table.columns[name] = load_array(path, f'{prefix}_{i}', mmap, stored, allow_pickle)
+            table.masks[name] = load_array(path, f'{prefix}_{i}_mask', mmap)
+
+            # unset slots of string columns were written as empty strings
+            if stored == 'str':
+                table.columns[name][~table.masks[name]] = None
+
+            if weights:
+                table.weights[name] = load_array(path, f'{prefix}_{i}_weight', mmap)
+
+        return table
+
+    def clear(self) -> None:
+        self.size = 0
+        self.columns = dict()
+        self.masks = dict()
+        self.weights = dict()
+
+
+class GraphStore:
+    """
+    Integer id store shared by NodeMap and EdgeMap
+
+    labels - node label per id
+    counts - rows each node was extracted from, per source column
+    src / dst / link_ids - edge endpoints and the link that first created each edge
+    edge_counts - rows each edge was extracted from
+    link_counts - rows each edge was extracted from, per link
+    node_deleted / edge_deleted - tombstones left by delete until the next compaction, None when there are none
+    weight - optional edge attribute kept equal to edge_counts, survives flush
+    multigraph - weight counts each orientation of a pair on its own, otherwise both orientations carry
+        the rows of the pair as the one edge of an undirected Graph
+
+    """
+
+    def __init__(self, weight: str = None, multigraph: bool = False) -> None:
+        self.weight = weight
+        self.multigraph = multigraph
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Empty the store in place so views stay attached
+
+        """
+
+        self.labels = pd.Index([], dtype=object)
+        self._label_index = None
+        self.counts = dict()
+        self.node_attributes = AttributeTable()
+        self.links = list()
+        self.src = np.empty(0, dtype=np.int64)
+        self.dst = np.empty(0, dtype=np.int64)
+        self.link_ids = np.empty(0, dtype=np.int64)
+        self.edge_counts = np.empty(0, dtype=np.int64)
+        self.link_counts = dict()
+        self.edge_attributes = AttributeTable()
+        self._edge_index = None
+        self.node_deleted = None
+        self.edge_deleted = None
+        self._deleted = 0
+        self._incidence = None
+
+        # inverted indexes, source column to node ids and link to edge ids, built on first query
+        self._column_nodes = dict()
+        self._link_edges = dict()
+
+    def flush_edges(self) -> None:
+        """
+        Drop all edges, nodes are kept
+
+        """
+
+        self.links = list()
+        self.src = np.empty(0, dtype=np.int64)
+        self.dst = np.empty(0, dtype=np.int64)
+        self.link_ids = np.empty(0, dtype=np.int64)
+        self.edge_counts = np.empty(0, dtype=np.int64)
+        self.link_counts = dict()
+        self.edge_attributes = AttributeTable()
+        self._edge_index = None
+        self.edge_deleted = None
+        self._incidence = None
+        self._link_edges = dict()
+
+    def save(self, path: str) -> None:
+        """
+        Write the store to a directory of .npy arrays and a store.json, typed arrays can be mapped back
+
+        :param path: str
+            directory, created if missing
+        """
+
+        # tombstones are not written, ids are compacted first
+        self.compact()
+        os.makedirs(path, exist_ok=True)
+        cols = self.columns
+
+        meta = {
+            'version': FORMAT_VERSION,
+            'labels': {'dtype': str(self.labels.dtype), 'storage': save_array(path, 'labels', self.labels.to_numpy())},
+            'counts': cols,
+            'links': [list(link) for link in self.links],
+            'link_counts': [list(link) for link in self.link_counts],
+            'weight': self.weight,
+            'multigraph': self.multigraph,
+            'node_attributes': self.node_attributes.save(path, 'node_attribute'),
+            'edge_attributes': self.edge_attributes.save(path, 'edge_attribute'),
+        }
+
+        for i, col in enumerate(cols):
+            save_array(path, f'count_{i}', self.counts[col])
+
+        for name in ('src', 'dst', 'link_ids', 'edge_counts'):
+            save_array(path, name, getattr(self, name))
+
+        for i, link in enumerate(self.link_counts):
+            save_array(path, f'link_count_{i}', self.link_counts[link])
+
+        with open(os.path.join(path, 'store.json'), 'w') as meta_file:
+            json.dump(meta, meta_file)
+
+    def load(self, path: str, mmap: bool = True, allow_pickle: bool = True) -> 'GraphStore':
+        """
+        Replace the contents of the store in place with one written by save
+
+        :param path: str
+            directory
+        :param mmap: bool
+            map typed arrays copy-on-write so processes loading the same path share pages
+        :param allow_pickle: bool
+            read labels and attributes that are neither typed nor strings and had to be pickled, only
+            for paths you trust
+        :return: GraphStore
+        """
+
+        with open(os.path.join(path, 'store.json')) as meta_file:
+            meta = json.load(meta_file)
+
+        if meta.get('version') not in (1, FORMAT_VERSION):
+            raise ValueError(f'Unsupported store format {meta.get("version")}, expected {FORMAT_VERSION}')
+
+        self.flush()
+        labels = load_array(path, 'labels', mmap, meta['labels'].get('storage', meta['labels'].get('objects')),
+                            allow_pickle)
+        self.labels = pd.Index(labels, dtype=meta['labels']['dtype'], tupleize_cols=False)
+        self.counts = {col: load_array(path, f'count_{i}', mmap) for i, col in enumerate(meta['counts'])}
+        self.node_attributes = AttributeTable.load(path, 'node_attribute', meta['node_attributes'], mmap,
+                                                   allow_pickle)
+        self.links = [tuple(link) for link in meta['links']]
+        self.weight = meta.get('weight')
+        self.multigraph = meta.get('multigraph', False)
+
+        for name in ('src', 'dst', 'link_ids', 'edge_counts'):
+            setattr(self, name, load_array(path, name, mmap))
+
+        if 'link_counts' in meta:
+            self.link_counts = {tuple(link): load_array(path, f'link_count_{i}', mmap)
+                                for i, link in enumerate(meta['link_counts'])}
+        else:
+
+            # stores written before per-link counts credit every edge to the link that created it
+            self.link_counts = {link: np.where(self.link_ids == link_id, self.edge_counts, 0)
+                                for link_id, link in enumerate(self.links)}
+
+        self.edge_attributes = AttributeTable.load(path, 'edge_attribute', meta['edge_attributes'], mmap,
+                                                   allow_pickle)
+
+        return self
+
+    # sizes
+    @property
+    def n_nodes(self) -> int:
+        return len(self.labels)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.src)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.counts.keys())
+
+    @property
+    def nbytes(self) -> int:
+        return (self.labels.memory_usage(deep=False)
+                + sum(count.nbytes for count in self.counts.values())
+                + self.node_attributes.nbytes
+                + self.src.nbytes + self.dst.nbytes + self.link_ids.nbytes + self.edge_counts.nbytes
+                + sum(count.nbytes for count in self.link_counts.values())
+                + self.edge_attributes.nbytes)
+
+    # nodes
+    def _lookup(self) -> KeyIndex:
+
+        if self._label_index is None:
+            self._label_index = KeyIndex(self.labels)
+
+        return self._label_index
+
+    def set_labels(self, labels) -> None:
+        """
+        Replace the label of every id, lookups are rebuilt on demand
+
+        :param labels: labels aligned to ids
+        """
+
+        self.labels = pd.Index(labels, tupleize_cols=False)
+        self._label_index = None
+
+    def intern(self, values) -> np.ndarray:
+        """
+        Resolve labels to ids, registering labels not seen before
+
+        :param values: labels, must not contain nulls
+        :return: np.ndarray of ids
+        """
+
+        values = pd.Index(values, tupleize_cols=False)
+        ids = self._lookup().get_indexer(values) if len(self.labels) else np.full(len(values), -1)
+        new = ids == -1
+
+        if new.any():
+            new_labels = values[new].unique()
+            start = len(self.labels)
+            self._lookup().append(new_labels)
+
+            # appending across dtypes would upcast, 1 after 0.5 has to stay the int 1
+            if start and new_labels.dtype != self.labels.dtype:
+                self.labels = pd.Index(np.concatenate([self.labels.to_numpy(dtype=object),
+                                                       new_labels.to_numpy(dtype=object)]),
+                                       dtype=object, tupleize_cols=False)
+            else:
+                self.labels = self.labels.append(new_labels) if start else new_labels
+            ids[new] = start + new_labels.get_indexer(values[new])
+            self._resize_nodes()
+
+        # interning a deleted label brings it back
+        if self.node_deleted is not None:
+            self._deleted -= int(self.node_deleted[ids].sum())
+            self.node_deleted[ids] = False
+
+        return ids.astype(np.int64, copy=False)
+
+    def _resize_nodes(self) -> None:
+
+        size = len(self.labels)
+
+        for col, count in self.counts.items():
+            if len(count) < size:
+                self.counts[col] = np.concatenate([count, np.zeros(size - len(count), dtype=np.int64)])
+
+        self.node_attributes.resize(size)
+        self._incidence = None
+
+        if self.node_deleted is not None and len(self.node_deleted) < size:
+            self.node_deleted = np.concatenate([self.node_deleted, np.zeros(size - len(self.node_deleted), dtype=bool)])
+
+    def node_ids(self, values) -> np.ndarray:
+        """
+        Ids for labels, -1 where a label is unknown
+
+        :param values: labels
+        :return: np.ndarray
+        """
+
+        if not len(self.labels):
+            return np.full(len(values), -1, dtype=np.int64)
+
+        ids = self._lookup().get_indexer(pd.Index(values, tupleize_cols=False))
+
+        if self.node_deleted is not None:
+            ids[self.node_deleted[ids] & (ids >= 0)] = -1
+
+        return ids
+
+    def node_id(self, label) -> int:
+        """
+        Id of a single label
+
+        :param label: node label
+        :return: int
+        """
+
+        try:
+            idx = self._lookup().get_indexer(pd.Index([label], tupleize_cols=False))[0]
+        except TypeError:
+            raise KeyError(label)
+
+        if idx == -1 or (self.node_deleted is not None and self.node_deleted[idx]):
+            raise KeyError(label)
+
+        return int(idx)
+
+    def add_nodes(self, col: str, values, counts=None) -> np.ndarray:
+        """
+        Register distinct labels extracted from a source column
+
+        :param col: str
+            source column
+        :param values: distinct labels
+        :param counts: rows per label, defaults to one
+        :return: np.ndarray of ids
+        """
+
+        ids = self.intern(values)
+
+        if col not in self.counts:
+            self.counts[col] = np.zeros(self.n_nodes, dtype=np.int64)
+
+        np.add.at(self.counts[col], ids, 1 if counts is None else np.asarray(counts, dtype=np.int64))
+
+        # ids whose count drops to zero stay indexed and are filtered out on read
+        if col in self._column_nodes:
+            self._column_nodes[col] = np.union1d(self._column_nodes[col], ids)
+
+        return ids
+
+    def nodes_of(self, col: str) -> np.ndarray:
+        """
+        Sorted ids of live nodes extracted from a source column
+
+        :param col: str
+        :return: np.ndarray
+        """
+
+        if col not in self.counts:
+            raise KeyError(col)
+
+        if col not in self._column_nodes:
+            self._column_nodes[col] = np.flatnonzero(self.counts[col] > 0)
+
+        ids = self._column_nodes[col]
+
+        return ids[self.counts[col][ids] > 0]
+
+    def mapped(self) -> np.ndarray:
+        """
+        Mask of ids extracted from at least one node column
+
+        :return: np.ndarray
+        """
+
+        mask = np.zeros(self.n_nodes, dtype=bool)
+
+        for count in self.counts.values():
+            mask |= count > 0
+
+        return mask
+
+    def is_mapped(self, idx: int) -> bool:
+        return any(count[idx] > 0 for count in self.counts.values())
+
+    def source_cols(self, idx: int) -> List[str]:
+        return [col for col, count in self.counts.items() if count[idx] > 0]
+
+    # edges
+    def _index(self) -> KeyIndex:
+
+        if self._edge_index is None:
+            self._edge_index = KeyIndex(edge_keys(self.src, self.dst))
+
+        return self._edge_index
+
+    def link_id(self, link: tuple) -> int:
+        """
+        Id of a link, registering it if new
+
+        :param link: (source_col, target_col)
+        :return: int
+        """
+
+        link = tuple(link)
+
+        if link not in self.links:
+            self.links.append(link)
+
+        return self.links.index(link)
+
+    def edge_ids(self, src, dst) -> np.ndarray:
+        """
+        Edge ids for (src, dst) id pairs, -1 where the edge does not exist
+
+        :param src: np.ndarray
+        :param dst: np.ndarray
+        :return: np.ndarray
+        """
+
+        if not self.n_edges:
+            return np.full(len(src), -1, dtype=np.int64)
+
+        ids = self._index().get_indexer(edge_keys(src, dst))
+
+        if self.edge_deleted is not None:
+            ids[self.edge_deleted[ids] & (ids >= 0)] = -1
+
+        return ids
+
+    def add_edges(self, link: tuple, src, dst, counts=None) -> np.ndarray:
+        """
+        Register edges for a link, repeated pairs are counted on the existing edge and under the link
+
+        :param link: (source_col, target_col)
+        :param src: np.ndarray of source ids
+        :param dst: np.ndarray of target ids
+        :param counts: rows per pair, defaults to one
+        :return: np.ndarray of edge ids aligned to the input pairs
+        """
+
+        src = np.asarray(src, dtype=np.int64)
+        dst = np.asarray(dst, dtype=np.int64)
+        counts = np.ones(len(src), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+        link = tuple(link)
+        link_id = self.link_id(link)
+
+        # collapse repeated pairs within the batch first
+        codes, keys = pd.factorize(edge_keys(src, dst))
+        key_counts = np.bincount(codes, weights=counts, minlength=len(keys)).astype(np.int64)
+        key_ids = self._index().get_indexer(keys).astype(np.int64)
+        new = key_ids == -1
+
+        # existing edges keep the link that created them, the rows are also counted under this link
+        self.edge_counts[key_ids[~new]] += key_counts[~new]
+
+        if new.any():
+            start = self.n_edges
+            first = np.unique(codes, return_index=True)[1][new]
+            self.src = np.concatenate([self.src, src[first]])
+            self.dst = np.concatenate([self.dst, dst[first]])
+            self.link_ids = np.concatenate([self.link_ids, np.full(new.sum(), link_id, dtype=np.int64)])
+            self.edge_counts = np.concatenate([self.edge_counts, key_counts[new]])
+            key_ids[new] = np.arange(start, self.n_edges)
+            self.edge_attributes.resize(self.n_edges)
+            self._index().append(pd.Index(keys[new]))
+            self._incidence = None
+
+        self._resize_links(link)
+        np.add.at(self.link_counts[link], key_ids, key_counts)
+
+        # ids whose count drops to zero stay indexed and are filtered out on read
+        if link in self._link_edges:
+            self._link_edges[link] = np.union1d(self._link_edges[link], key_ids)
+
+        # adding a deleted edge brings it back
+        if self.edge_deleted is not None:
+            self.edge_deleted = np.concatenate([self.edge_deleted,
+                                                np.zeros(self.n_edges - len(self.edge_deleted), dtype=bool)])
+            self.edge_deleted[key_ids] = False
+
+        self.write_weight(key_ids)
+
+        return key_ids[codes]
+
+    def _resize_links(self, link: tuple = None) -> None:
+
+        if link is not None and link not in self.link_counts:
+            self.link_counts[link] = np.zeros(self.n_edges, dtype=np.int64)
+
+        for key, count in self.link_counts.items():
+            if len(count) < self.n_edges:
+                self.link_counts[key] = np.concatenate([count, np.zeros(self.n_edges - len(count), dtype=np.int64)])
+
+    def count_edges(self, link: tuple, ids, counts) -> None:
+        """
+        Add rows of a link to existing edges, negative counts take rows back out
+
+        :param link: (source_col, target_col)
+        :param ids: array of edge ids, may repeat
+        :param counts: rows per id
+        """
+
+        link = tuple(link)
+        ids = np.asarray(ids, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        self.link_id(link)
+        self._resize_links(link)
+        np.add.at(self.edge_counts, ids, counts)
+        np.add.at(self.link_counts[link], ids, counts)
+        self.write_weight(np.unique(ids))
+
+    def write_weight(self, ids) -> None:
+        """
+        Copy edge_counts into the weight attribute, summed with the reversed edge unless multigraph
+
+        :param ids: array of edge ids
+        """
+
+        if self.weight is None or not len(ids):
+            return
+
+        ids = np.asarray(ids, dtype=np.int64)
+        counts = self.edge_counts[ids]
+
+        # x -> y and y -> x are one undirected edge, both carry the total so either one read gives it
+        if not self.multigraph:
+            twins = self.edge_ids(self.dst[ids], self.src[ids])
+            paired = (twins >= 0) & (twins != ids)
+            counts = counts + np.where(paired, self.edge_counts[np.maximum(twins, 0)], 0)
+            self.edge_attributes.set(self.weight, twins[paired], counts[paired])
+
+        self.edge_attributes.set(self.weight, ids, counts)
+
+    def edge_link(self, idx: int) -> tuple:
+
+        # the creating link until it loses all its rows, then the first link still holding some
+        link = self.links[self.link_ids[idx]]
+        links = self.edge_links(idx)
+
+        return link if link in links or not links else links[0]
+
+    def edge_links(self, idx: int) -> List[tuple]:
+        return [link for link, count in self.link_counts.items() if count[idx] > 0]
+
+    def edges_of(self, link: tuple) -> np.ndarray:
+        """
+        Sorted ids of live edges extracted from a link
+
+        :param link: (source_col, target_col)
+        :return: np.ndarray
+        """
+
+        link = tuple(link)
+
+        if link not in self.links:
+            raise KeyError(link)
+
+        if link not in self.link_counts:
+            return np.empty(0, dtype=np.int64)
+
+        if link not in self._link_edges:
+            self._link_edges[link] = np.flatnonzero(self.link_counts[link] > 0)
+
+        ids = self._link_edges[link]
+        ids = ids[self.link_counts[link][ids] > 0]
+
+        return ids if self.edge_deleted is None else ids[~self.edge_deleted[ids]]
+
+    def live_nodes(self) -> np.ndarray:
+        """
+        Ids of nodes that are not deleted
+
+        :return: np.ndarray
+        """
+
+        return np.arange(self.n_nodes) if self.node_deleted is None else np.flatnonzero(~self.node_deleted)
+
+    def live_edges(self) -> np.ndarray:
+        """
+        Ids of edges that are not deleted
+
+        :return: np.ndarray
+        """
+
+        return np.arange(self.n_edges) if self.edge_deleted is None else np.flatnonzero(~self.edge_deleted)
+
+    def _incident(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Adjacency index, edges of node i are edges[offsets[i]:offsets[i + 1]]
+
+        """
+
+        if self._incidence is None:
+            ends = np.concatenate([self.src, self.dst])
+            edges = np.argsort(ends, kind='stable') % max(self.n_edges, 1)
+            offsets = np.concatenate([[0], np.cumsum(np.bincount(ends, minlength=self.n_nodes))])
+            self._incidence = edges, offsets
+
+        return self._incidence
+
+    def incident_edges(self, node_ids) -> np.ndarray:
+        """
+        Live edges touching any of the nodes, read from the adjacency index
+
+        :param node_ids: array of integer ids
+        :return: np.ndarray of distinct edge ids
+        """
+
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        edges, offsets = self._incident()
+        starts, lengths = offsets[node_ids], offsets[node_ids + 1] - offsets[node_ids]
+
+        # every [start, start + length) range flattened without a python loop
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        incident = np.unique(edges[positions])
+
+        return incident if self.edge_deleted is None else incident[~self.edge_deleted[incident]]
+
+    def delete(self, node_ids) -> np.ndarray:
+        """
+        Delete nodes and their edges in time proportional to the edges touched, ids stay valid until
+        the store is compacted, which happens once a quarter of the nodes are deleted
+
+        :param node_ids: array of integer ids
+        :return: np.ndarray of the edge ids deleted along with the nodes
+        """
+
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+
+        if self.node_deleted is None:
+            self.node_deleted = np.zeros(self.n_nodes, dtype=bool)
+
+        if self.edge_deleted is None:
+            self.edge_deleted = np.zeros(self.n_edges, dtype=bool)
+
+        node_ids = node_ids[~self.node_deleted[node_ids]]
+        edge_ids = self.incident_edges(node_ids)
+
+        # a deleted node keeps its label slot but loses rows, attributes and edges
+        self.node_deleted[node_ids] = True
+        self._deleted += len(node_ids)
+
+        for count in self.counts.values():
+            count[node_ids] = 0
+
+        for name in list(self.node_attributes.columns):
+            self.node_attributes.unset(name, node_ids)
+
+        self.edge_deleted[edge_ids] = True
+        self.edge_counts[edge_ids] = 0
+
+        for count in self.link_counts.values():
+            count[edge_ids] = 0
+
+        for name in list(self.edge_attributes.columns):
+            self.edge_attributes.unset(name, edge_ids)
+
+        if self._deleted > self.n_nodes // 4:
+            self.compact()
+
+        return edge_ids
+
+    def compact(self) -> np.ndarray:
+        """
+        Drop deleted nodes and edges for good, ids above them shift down
+
+        :return: np.ndarray mapping old node ids to new ones, -1 for removed nodes
+        """
+
+        return self.remove()
+
+    def remove(self, node_ids=None, edge_ids=None) -> np.ndarray:
+        """
+        Drop nodes and edges and compact the arrays, edges touching a removed node go too
+
+        :param node_ids: ids of nodes to drop
+        :param edge_ids: ids of edges to drop
+        :return: np.ndarray mapping old node ids to new ones, -1 for removed nodes
+        """
+
+        node_keep = np.ones(self.n_nodes, dtype=bool) if self.node_deleted is None else ~self.node_deleted
+        edge_keep = np.ones(self.n_edges, dtype=bool) if self.edge_deleted is None else ~self.edge_deleted
+
+        if node_ids is not None:
+            node_keep[np.asarray(node_ids, dtype=np.int64)] = False
+
+        if edge_ids is not None:
+            edge_keep[np.asarray(edge_ids, dtype=np.int64)] = False
+
+        edge_keep &= node_keep[self.src] & node_keep[self.dst]
+        remap = np.where(node_keep, np.cumsum(node_keep) - 1, -1)
+
+        if not node_keep.all():
+            kept = np.flatnonzero(node_keep)
+            self.set_labels(self.labels[kept])
+            self.counts = {col: count[kept] for col, count in self.counts.items()}
+            self.node_attributes = self.node_attributes.take(kept)
+
+        if not edge_keep.all() or not node_keep.all():
+            kept = np.flatnonzero(edge_keep)
+            self.src = remap[self.src[kept]]
+            self.dst = remap[self.dst[kept]]
+            self.link_ids = self.link_ids[kept]
+            self.edge_counts = self.edge_counts[kept]
+            self.link_counts = {link: count[kept] for link, count in self.link_counts.items()}
+            self.edge_attributes = self.edge_attributes.take(kept)
+            self._edge_index = None
+            self._incidence = None
+            self._link_edges = dict()
+
+        if not node_keep.all():
+            self._column_nodes = dict()
+
+        self.node_deleted = None
+        self.edge_deleted = None
+        self._deleted = 0
+
+        return remap
+
+    def subgraph(self, node_ids, edge_ids=None) -> 'GraphStore':
+        """
+        New store holding only the given nodes and edges, in time proportional to them
+
+        :param node_ids: array of integer ids
+        :param edge_ids: array of edge ids, their endpoints are added to the nodes. Defaults to the live
+            edges between the nodes, read from the adjacency index
+        :return: GraphStore, ids renumbered in sorted order
+        """
+
+        node_ids = np.unique(np.asarray(node_ids, dtype=np.int64))
+
+        if edge_ids is None:
+            edges = self.incident_edges(node_ids)
+            edges = edges[np.isin(self.src[edges], node_ids) & np.isin(self.dst[edges], node_ids)]
+        else:
+            edges = np.unique(np.asarray(edge_ids, dtype=np.int64))
+            node_ids = np.union1d(node_ids, np.concatenate([self.src[edges], self.dst[edges]]))
+
+        store = GraphStore(self.weight, self.multigraph)
+        store.set_labels(self.labels[node_ids])
+        store.counts = {col: count[node_ids] for col, count in self.counts.items()}
+        store.node_attributes = self.node_attributes.take(node_ids)
+        store.links = list(self.links)
+        store.src, store.dst = np.searchsorted(node_ids, self.src[edges]), np.searchsorted(node_ids, self.dst[edges])
+        store.link_ids = self.link_ids[edges]
+        store.edge_counts = self.edge_counts[edges]
+        store.link_counts = {link: count[edges] for link, count in self.link_counts.items()}
+        store.edge_attributes = self.edge_attributes.take(edges)
+
+        return store
+
+    # bulk views
+    def adjacency(self, weight: str = None, symmetric: bool = True) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Coordinate form of the adjacency matrix
+
+        :param weight: str
+            None for 1 per edge, 'count' for rows per edge or an edge attribute (unset values count as 1)
+        :param symmetric: bool
+            mirror every edge as an undirected graph does, a pair stored in both orientations is one edge
+        :return: (rows, cols, data)
+        """
+
+        live = self.live_edges()
+        src, dst = self.src[live], self.dst[live]
+        mask = np.ones(len(live), dtype=bool)
+
+        if weight is None:
+            data = np.ones(len(live))
+        elif weight == 'count':
+            data = self.edge_counts[live].astype(float)
+        else:
+            values, mask = self.edge_attributes.get(weight, live)
+            data = np.where(mask, values, 1).astype(float)
+
+        if not symmetric:
+            return src, dst, data
+
+        # one entry per unordered pair, counts add up and other weights keep the last edge setting them,
+        # as the attributes of both orientations merge into the one edge of a Graph
+        low, high = np.minimum(src, dst), np.maximum(src, dst)
+        codes, pairs = pd.factorize(edge_keys(low, high))
+
+        if weight == 'count':
+            data = np.bincount(codes, weights=data, minlength=len(pairs))
+        else:
+            last = np.zeros(len(pairs), dtype=np.int64)
+            last[codes] = np.arange(len(codes))
+            last[codes[mask]] = np.flatnonzero(mask)
+            data = data[last]
+
+        low, high = pairs >> 32, pairs & 0xFFFFFFFF
+        loop = low == high
+
+        return (np.concatenate([low, high[~loop]]), np.concatenate([high, low[~loop]]),
+                np.concatenate([data, data[~loop]]))
+
+    def undirected_edges(self) -> Tuple[np.ndarray, dict]:
+        """
+        Edges as an undirected Graph sees them, a pair stored in both orientations is one edge
+
+        :return: (ids of the first edge of every pair, dict of first id to the later ids of the same pair)
+        """
+
+        live = self.live_edges()
+        low, high = np.minimum(self.src[live], self.dst[live]), np.maximum(self.src[live], self.dst[live])
+        codes, pairs = pd.factorize(edge_keys(low, high))
+        first = np.unique(codes, return_index=True)[1]
+
+        if len(first) == len(live):
+            return live[first], dict()
+
+        later = np.setdiff1d(np.arange(len(live)), first)
+
+        return live[first], pd.Series(live[later]).groupby(live[first[codes[later]]]).agg(list).to_dict()
+
+    def iter_nodes(self, ids=None) -> Iterator[Tuple]:
+        """
+        (label, attributes) pairs
+
+        :param ids: optional ids, defaults to every node
+        :return: Iterator
+        """
+
+        ids = self.live_nodes() if ids is None else ids
+
+        return zip(self.labels[ids].tolist(), self.node_attributes.rows(ids))
+
+    def iter_edges(self, ids=None) -> Iterator[Tuple]:
+        """
+        (source, target, attributes) triples
+
+        :param ids: optional edge ids, defaults to every edge
+        :return: Iterator
+        """
+
+        ids = self.live_edges() if ids is None else ids
+
+        return zip(self.labels[self.src[ids]].tolist(), self.labels[self.dst[ids]].tolist(),
+                   self.edge_attributes.rows(ids))
+
+    def merge(self, other: 'GraphStore', conflict: str = 'replace') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Fold another store into this one, only new or overlapping keys are touched
+
+        :param other: GraphStore
+        :param conflict: str
+            attribute values set on both sides, one of keep, replace, error, list, sum or mean
+        :return: (node ids, edge ids) of other's nodes and edges within this store
+        """
+
+        # tombstones are dropped from a copy, other is left as it was
+        if other.node_deleted is not None or other.edge_deleted is not None:
+            other = other.subgraph(other.live_nodes(), other.live_edges())
+
+        if conflict == 'error':
+
+            # check before anything is written so a failed merge leaves the store untouched
+            node_ids = self.node_ids(other.labels)
+            known = node_ids >= 0
+            conflicting = self.node_attributes.conflicts(other.node_attributes.take(np.flatnonzero(known)),
+                                                         node_ids[known])
+
+            if other.n_edges:
+                source, target = node_ids[other.src], node_ids[other.dst]
+                edge_ids = np.full(other.n_edges, -1, dtype=np.int64)
+                both = (source >= 0) & (target >= 0)
+                edge_ids[both] = self.edge_ids(source[both], target[both])
+                known = edge_ids >= 0
+                conflicting += self.edge_attributes.conflicts(other.edge_attributes.take(np.flatnonzero(known)),
+                                                              edge_ids[known])
+
+            if conflicting:
+                raise ValueError(f'Conflicting values for attributes {", ".join(dict.fromkeys(conflicting))}')
+
+            conflict = 'replace'
+
+        node_ids = self.intern(other.labels) if other.n_nodes else np.empty(0, dtype=np.int64)
+
+        for col, count in other.counts.items():
+            present = count > 0
+            self.add_nodes(col, other.labels[present], count[present])
+
+        self.node_attributes.update(other.node_attributes, node_ids, conflict)
+
+        edge_ids = np.empty(other.n_edges, dtype=np.int64)
+
+        # every link brings its own rows, edges without any still land on the link that created them
+        for link_id, link in enumerate(other.links):
+            count = other.link_counts.get(link, np.zeros(other.n_edges, dtype=np.int64))
+            rows = np.flatnonzero((count > 0) | (other.link_ids == link_id))
+            edge_ids[rows] = self.add_edges(link, node_ids[other.src[rows]], node_ids[other.dst[rows]], count[rows])
+
+        self.edge_attributes.update(other.edge_attributes, edge_ids, conflict)
+
+        # merged edges add up their rows, the weight follows the summed counts rather than either side
+        self.write_weight(edge_ids)
+
+        return node_ids, edge_ids
+
+    def node_hashes(self, ids, counts: bool = False) -> np.ndarray:
+        """
+        uint64 hash per node of its attributes, and of its rows per source column with counts
+
+        :param ids: array of integer ids
+        :param counts: bool
+        :return: np.ndarray
+        """
+
+        hashes = self.node_attributes.hashes(ids)
+
+        if counts:
+            for col in sorted(self.counts, key=str):
+                count = self.counts[col][ids]
+                col_hash = combine_hashes(hash_values(count), hash_values(np.array([repr(col)], dtype=object))[0])
+                hashes = np.where(count > 0, combine_hashes(hashes, col_hash), hashes)
+
+        return hashes
+
+    def edge_hashes(self, ids, counts: bool = False) -> np.ndarray:
+        """
+        uint64 hash per edge of its attributes, and of its rows per link with counts
+
+        :param ids: array of edge ids
+        :param counts: bool
+        :return: np.ndarray
+        """
+
+        hashes = self.edge_attributes.hashes(ids)
+
+        if counts:
+            for link in sorted(self.link_counts, key=repr):
+                count = self.link_counts[link][ids]
+                link_hash = combine_hashes(hash_values(count), hash_values(np.array([repr(link)], dtype=object))[0])
+                hashes = np.where(count > 0, combine_hashes(hashes, link_hash), hashes)
+
+        return hashes
+
+    def diff(self, other: 'GraphStore', counts: bool = False) -> dict:
+        """
+        Nodes and edges added, removed or changed going from this store to other, matched by label
+        and compared by hash
+
+        :param other: GraphStore
+        :param counts: bool
+            a change in rows per source column or link changes a node or edge too, not only its attributes
+        :return: dict of removed_nodes / removed_edges (ids in this store) and added_nodes, changed_nodes,
+            added_edges, changed_edges (ids in other)
+        """
+
+        nodes, other_nodes = self.live_nodes(), other.live_nodes()
+        matched = self.node_ids(other.labels[other_nodes])
+        found = matched >= 0
+        kept = np.zeros(self.n_nodes, dtype=bool)
+        kept[matched[found]] = True
+        changed = self.node_hashes(matched[found], counts) != other.node_hashes(other_nodes[found], counts)
+
+        edges, other_edges = self.live_edges(), other.live_edges()
+        matched_ids = np.full(other.n_nodes, -1, dtype=np.int64)
+        matched_ids[other_nodes] = matched
+        source, target = matched_ids[other.src[other_edges]], matched_ids[other.dst[other_edges]]
+        edge_matched = np.full(len(other_edges), -1, dtype=np.int64)
+        both = (source >= 0) & (target >= 0)
+        edge_matched[both] = self.edge_ids(source[both], target[both])
+        edge_found = edge_matched >= 0
+        edge_kept = np.zeros(self.n_edges, dtype=bool)
+        edge_kept[edge_matched[edge_found]] = True
+        edge_changed = self.edge_hashes(edge_matched[edge_found], counts) != \
+            other.edge_hashes(other_edges[edge_found], counts)
+
+        return {
+            'removed_nodes': nodes[~kept[nodes]],
+            'added_nodes': other_nodes[~found],
+            'changed_nodes': other_nodes[found][changed],
+            'removed_edges': edges[~edge_kept[edges]],
+            'added_edges': other_edges[~edge_found],
+            'changed_edges': other_edges[edge_found][edge_changed],
+        }
+
+    def upsert(self, other: 'GraphStore') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Write other's nodes and edges over this store, rows and attributes are replaced rather than
+        folded as merge does, edges that exist are moved to other's link
+
+        :param other: GraphStore
+        :return: (node ids, edge ids) of other's nodes and edges within this store
+        """
+
+        if other.node_deleted is not None or other.edge_deleted is not None:
+            other = other.subgraph(other.live_nodes(), other.live_edges())
+
+        if other.n_edges:
+            source, target = self.node_ids(other.labels[other.src]), self.node_ids(other.labels[other.dst])
+            both = (source >= 0) & (target >= 0)
+            existing = self.edge_ids(source[both], target[both])
+            self.remove(edge_ids=existing[existing >= 0])
+
+        node_ids = self.intern(other.labels) if other.n_nodes else np.empty(0, dtype=np.int64)
+
+        for count in self.counts.values():
+            count[node_ids] = 0
+
+        for col, count in other.counts.items():
+            present = count > 0
+            self.add_nodes(col, other.labels[present], count[present])
+
+        self.node_attributes.replace(other.node_attributes, node_ids)
+        edge_ids = np.empty(other.n_edges, dtype=np.int64)
+
+        # every link brings its own rows, edges without any still land on the link that created them
+        for link_id, link in enumerate(other.links):
+            count = other.link_counts.get(link, np.zeros(other.n_edges, dtype=np.int64))
+            rows = np.flatnonzero((count > 0) | (other.link_ids == link_id))
+            edge_ids[rows] = self.add_edges(link, node_ids[other.src[rows]], node_ids[other.dst[rows]], count[rows])
+
+        self.edge_attributes.replace(other.edge_attributes, edge_ids)
+        self.write_weight(edge_ids)
+
+        return node_ids, edge_ids
@@ -3,9 +3,23 @@ Utility functions for Netrunner
 
 """
 
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
 from netrunner.models import DrawResults, Node
+from networkx import Graph
+from networkx.readwrite import json_graph
 from pandas.core.frame import DataFrame
-from typing import List, Tuple
+from pandas import Index, Series
+from pandas.api.types import is_numeric_dtype
+from typing import Callable, List, Tuple, Union
+import numpy as np
+import os
+import pandas as pd
+import warnings
+
+# attribute aggregation policies, sum, mean, min and max need numeric attributes
+AGGREGATIONS = ('last', 'first', 'list', 'sum', 'mean', 'min', 'max', 'count')
+NUMERIC_AGGREGATIONS = ('sum', 'mean', 'min', 'max')
 
 
 # small wrapper for draw argument -- will be helpful when UI is created
@@ -70,3 +84,314 @@ def unpack_source_col(node: Node, node_map) -> List[Node]:
         return [Node(name=node,
                      attributes=node_map[node]['attributes'],
                      source_col=col) for col in node_map[node]['source_col']]
+
+
+# columnar extraction helpers
+def factorize_column(series: Series, ignore_chars: str = None) -> Tuple[np.ndarray, Index]:
+    """
+    Integer codes and distinct values of a column, nulls and ignore_chars get code -1
+
+    :param series: Series
+        column to pull values from
+    :param ignore_chars: str
+        string form of values to drop
+    :return: (codes, uniques)
+    """
+
+    if isinstance(series.dtype, pd.CategoricalDtype):
+
+        # categorical columns, dictionary encoded Arrow input included, are already coded, only the
+        # categories in use are kept and they come back as plain labels
+        codes = series.cat.codes.to_numpy().astype(np.int64)
+        categories = series.cat.categories
+        observed = np.bincount(codes[codes >= 0], minlength=len(categories)) > 0
+
+        if not observed.all():
+            remap = np.full(len(categories) + 1, -1, dtype=np.int64)
+            remap[:-1][observed] = np.arange(observed.sum())
+            codes = remap[codes]
+            categories = categories[observed]
+
+        uniques = categories
+    else:
+        codes, uniques = pd.factorize(series)
+
+    # only the distinct values are compared against ignore_chars
+    if ignore_chars and len(uniques):
+        keep = np.array([str(value) != ignore_chars for value in uniques], dtype=bool)
+
+        if not keep.all():
+            # trailing slot keeps -1 codes at -1
+            remap = np.full(len(uniques) + 1, -1, dtype=np.int64)
+            remap[:-1][keep] = np.arange(keep.sum())
+            codes = remap[codes]
+            uniques = uniques[keep]
+
+    return codes, uniques
+
+
+def shared_categories(dataframe: DataFrame, cols: list) -> DataFrame:
+    """
+    Frame with cols recoded against one categorical dictionary, each distinct label is hashed once
+    per column and codes line up across columns
+
+    :param dataframe: DataFrame
+    :param cols: list
+        columns to encode, usually the node and link columns
+    :return: DataFrame, other columns are shared with the input
+    """
+
+    cols = [col for col in dict.fromkeys(cols) if col in dataframe.columns]
+
+    if not cols:
+        return dataframe
+
+    codes, values = list(), list()
+
+    for col in cols:
+        column = dataframe[col]
+
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes.append(column.cat.codes.to_numpy().astype(np.int64))
+            values.append(column.cat.categories)
+        else:
+            column_codes, uniques = pd.factorize(column)
+            codes.append(column_codes)
+            values.append(uniques)
+
+    # only the per column dictionaries are hashed against each other
+    labels = [pd.Index(value, tupleize_cols=False) for value in values]
+    positions, dictionary = pd.factorize(labels[0].append(labels[1:]))
+    dtype = pd.CategoricalDtype(dictionary)
+    encoded, start = dict(), 0
+
+    for col, column_codes, value in zip(cols, codes, values):
+        remap = np.append(positions[start:start + len(value)], -1)
+        encoded[col] = pd.Categorical.from_codes(remap[column_codes], dtype=dtype)
+        start += len(value)
+
+    return dataframe.assign(**encoded)
+
+
+def node_counts(series: Series, ignore_chars: str = None) -> Tuple[Index, np.ndarray]:
+    """
+    Distinct node values of a column with the number of rows each appears in
+
+    :param series: Series
+    :param ignore_chars: str
+    :return: (uniques, counts)
+    """
+
+    codes, uniques = factorize_column(series, ignore_chars)
+
+    return uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+
+def link_pairs(source: Series, target: Series, ignore_chars: str = None) -> tuple:
+    """
+    Distinct (source, target) pairs of two aligned columns with the number of rows per pair
+
+    :param source: Series
+    :param target: Series
+    :param ignore_chars: str
+    :return: (source uniques, target uniques, source codes, target codes, counts)
+    """
+
+    source_codes, source_uniques = factorize_column(source, ignore_chars)
+    target_codes, target_uniques = factorize_column(target, ignore_chars)
+
+    # rows need both ends, pairs are packed into one code per row
+    keep = (source_codes >= 0) & (target_codes >= 0)
+    width = max(len(target_uniques), 1)
+    pair_codes, pairs = pd.factorize(source_codes[keep].astype(np.int64) * width + target_codes[keep])
+    counts = np.bincount(pair_codes, minlength=len(pairs))
+
+    return source_uniques, target_uniques, pairs // width, pairs % width, counts
+
+
+def aggregation_for(how: Union[str, dict], attribute: str) -> str:
+    """
+    Policy of one attribute, how is a single policy or a dict of attribute to policy defaulting to last
+
+    :param how: str or dict
+    :param attribute: str
+    :return: str
+    """
+
+    return how if isinstance(how, str) else how.get(attribute, 'last')
+
+
+def uses_mean(how: Union[str, dict], attributes: list) -> bool:
+    """
+    Whether any attribute is averaged, means need their row counts kept alongside
+
+    :param how: str or dict
+    :param attributes: list
+    :return: bool
+    """
+
+    return any(aggregation_for(how, attribute) == 'mean' for attribute in attributes)
+
+
+def aggregate_attributes(dataframe: DataFrame, keys: list, attributes: list,
+                         how: Union[str, dict] = 'last') -> DataFrame:
+    """
+    Collapse attribute columns down to one row per key
+
+    :param dataframe: DataFrame
+    :param keys: list
+        columns identifying a node or edge
+    :param attributes: list
+        attribute columns to collapse
+    :param how: str or dict
+        one of last, first, list, sum, mean, min, max or count (non-null rows), or a dict of attribute
+        to policy where unlisted attributes use last
+    :return: DataFrame indexed by keys
+    """
+
+    attributes = list(dict.fromkeys(attributes))
+
+    if not isinstance(how, str) and not attributes:
+        how = 'last'
+
+    if not isinstance(how, str):
+
+        # one pass per distinct policy, columns come back in attribute order
+        policies = dict()
+
+        for attribute in attributes:
+            policies.setdefault(aggregation_for(how, attribute), list()).append(attribute)
+
+        frames = [aggregate_attributes(dataframe, keys, names, policy) for policy, names in policies.items()]
+
+        return frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)[attributes]
+
+    if how not in AGGREGATIONS:
+        raise ValueError(f'Unknown aggregation {how}, expected one of {", ".join(AGGREGATIONS)}')
+
+    frame = dataframe[list(dict.fromkeys(keys + attributes))]
+
+    # rows without a key can never land on a node or edge
+    frame = frame[frame[keys].notna().all(axis=1)]
+
+    if how in ('last', 'first'):
+        frame = frame.drop_duplicates(subset=keys, keep=how)
+        return frame.set_index(keys, drop=False)[attributes]
+
+    grouped = frame.groupby(keys, sort=False)[attributes]
+
+    if how == 'list':
+        return grouped.agg(list)
+
+    if how == 'count':
+        return grouped.count()
+
+    non_numeric = [attribute for attribute in attributes if not is_numeric_dtype(frame[attribute])]
+
+    if non_numeric:
+        raise ValueError(f'Aggregation {how} needs numeric attributes, got {", ".join(non_numeric)}')
+
+    return getattr(grouped, how)()
+
+
+def map_columns(nodes: list = None, links: list = None, node_attributes: dict = None,
+                edge_attributes: dict = None) -> list:
+    """
+    Every DataFrame column referenced by a network map, in first mention order
+
+    :param nodes: list
+    :param links: list
+    :param node_attributes: dict
+    :param edge_attributes: dict
+    :return: list
+    """
+
+    columns = list(nodes or [])
+
+    for link in links or []:
+        columns.extend(link)
+
+    for col, attributes in (node_attributes or {}).items():
+        columns.append(col)
+        columns.extend(attributes)
+
+    for link, attributes in (edge_attributes or {}).items():
+        columns.extend(link)
+        columns.extend(attributes)
+
+    return list(dict.fromkeys(columns))
+
+
+def parallel_map(function: Callable, arguments: list, n_jobs: int = 1,
+                 executor: Union[str, Executor] = 'thread') -> list:
+    """
+    Apply function to each tuple of arguments, results come back in input order
+
+    :param function: Callable
+        module level function, process pools need to pickle it
+    :param arguments: list of argument tuples
+    :param n_jobs: int
+        workers to use, 1 runs serially and -1 uses every core
+    :param executor: str or Executor
+        'thread', 'process' or an existing concurrent.futures Executor
+    :return: list
+    """
+
+    if isinstance(executor, Executor):
+        return list(executor.map(function, *zip(*arguments))) if arguments else list()
+
+    if n_jobs == 1 or len(arguments) < 2:
+        return [function(*argument) for argument in arguments]
+
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Unknown executor {executor}, expected thread, process or an Executor')
+
+    pool = ThreadPoolExecutor if executor == 'thread' else ProcessPoolExecutor
+    workers = min(len(arguments), n_jobs if n_jobs > 0 else (os.cpu_count() or 1))
+
+    with pool(max_workers=workers) as executor_:
+        return list(executor_.map(function, *zip(*arguments)))
+
+
+def json_safe(value):
+    """
+    Make an attribute value JSON encodable, NaN and infinity become null
+
+    :param value: attribute value
+    :return: value made of plain python types
+    """
+
+    if isinstance(value, float):
+        return value if np.isfinite(value) else None
+
+    if isinstance(value, (str, int, bool)) or value is None:
+        return value
+
+    if isinstance(value, np.generic):
+        return json_safe(value.item())
+
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(key): json_safe(item) for key, item in value.items()}
+
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        return [json_safe(item) for item in value]
+
+    if value is pd.NaT or value is pd.NA:
+        return None
+
+    # timestamps and anything else json does not know
+    return value.isoformat() if hasattr(value, 'isoformat') else str(value)
+
+
+@lru_cache(maxsize=1)
+def node_link_edges() -> str:
+    """
+    Key of the edge list in networkx node_link_data, edges from networkx 3.6 on and links before
+
+    :return: str
+    """
+
+    # networkx 3.4 and 3.5 warn that the default is about to change
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', FutureWarning)
+        return 'edges' if 'edges' in json_graph.node_link_data(Graph()) else 'links'
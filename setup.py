@@ -21,6 +21,7 @@ setuptools.setup(
     version='0.0.1',
     author='Chris Smith',
     install_requires=install_requires,
+    extras_require={'sparse': ['scipy'], 'arrow': ['pyarrow']},
     tests_require=['pytest'],
     author_email='chrissmith700@gmail.com',
     description='Combine Networkx and Pandas for fast network creation and analysis'
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+pa = pytest.importorskip('pyarrow')
+pq = pytest.importorskip('pyarrow.parquet')
+
+rng = np.random.default_rng(11)
+df = pd.DataFrame({
+    'person': rng.choice(np.array(['ann', 'bob', 'cat', 'dan', None], dtype=object), 300),
+    'group': rng.choice(np.array(['red', 'blue', 'unknown', None], dtype=object), 300),
+    'age': rng.integers(18, 80, 300),
+    'notes': rng.choice(['x', 'y'], 300),
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')], ignore_chars='unknown',
+                   node_attributes={'person': ['age']}, edge_attributes={('person', 'group'): ['age']})
+
+
+def assert_same(netframe, expected):
+    assert netframe.node_map.map == expected.node_map.map
+    assert netframe.edge_map.map == expected.edge_map.map
+    assert netframe.store.labels.dtype == expected.store.labels.dtype
+
+
+@pytest.mark.parametrize('aggregate', ['last', 'sum', 'list'])
+def test_from_arrow_matches_frame_build(aggregate):
+    expected = NetFrame(df, aggregate=aggregate, **network_map)
+    table = pa.Table.from_pandas(df)
+    assert_same(NetFrame.from_arrow(table, aggregate=aggregate, **network_map), expected)
+    assert_same(NetFrame.from_arrow(table.to_batches(max_chunksize=50), batch_size=70, aggregate=aggregate,
+                                    **network_map), expected)
+
+
+def test_from_parquet_reads_mapped_columns(tmp_path):
+    pq.write_table(pa.Table.from_pandas(df), tmp_path / 'data.parquet', row_group_size=64)
+    netframe = NetFrame.from_parquet(tmp_path / 'data.parquet', keep_frame=True, **network_map)
+    assert_same(netframe, NetFrame(df, **network_map))
+
+    # only mapped columns are read and rows without a node are dropped while scanning
+    assert list(netframe.frame.columns) == ['person', 'group', 'age']
+    assert len(netframe.frame) == (df['person'].notna() | df['group'].notna()).sum()
+
+    # node columns are scanned as dictionaries but the kept frame holds plain values
+    kept = df[df['person'].notna() | df['group'].notna()].reset_index(drop=True)[['person', 'group', 'age']]
+    assert not isinstance(netframe.frame['person'].dtype, pd.CategoricalDtype)
+    assert netframe.frame.astype(object).fillna('-').equals(kept.astype(object).fillna('-'))
+    netframe.append_rows(df.iloc[:5])
+    assert_same(netframe, NetFrame(pd.concat([df, df.iloc[:5]]), **network_map))
+
+
+def test_from_arrow_links_only():
+    frame = pd.DataFrame({'a': ['x', None, 'y'], 'b': ['y', 'z', None]})
+    netframe = NetFrame.from_arrow(pa.Table.from_pandas(frame), links=[('a', 'b')], keep_frame=True)
+    assert list(netframe.edge_map.map) == [('x', 'y')]
+    assert len(netframe.frame) == 1
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import netrunner
+from netrunner.batch import shared_columns
+from netrunner.netframe import NetFrame
+
+rng = np.random.default_rng(3)
+df = pd.DataFrame({
+    'person': rng.choice(np.array(['ann', 'bob', 'cat', None], dtype=object), 200),
+    'group': rng.choice(['red', 'blue', 'unknown'], 200),
+    'city': rng.choice(['rome', 'oslo'], 200),
+    'age': rng.integers(18, 80, 200),
+})
+other = pd.DataFrame({'person': ['ann', 'eve'], 'city': ['oslo', 'lima'], 'age': [1, 2]})
+maps = [dict(nodes=['person', 'group'], links=[('person', 'group')], node_attributes={'person': ['age']}),
+        dict(nodes=['person', 'city'], links=[('city', 'person')], edge_attributes={('city', 'person'): ['age']},
+             ignore_chars='unknown')]
+
+
+def test_shared_columns():
+    assert shared_columns([(df, maps[0]), (df, maps[1]), (other, maps[1])]) == {id(df): ['person']}
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_run_many_matches_separate_builds(executor):
+    netframes = netrunner.run_many([(df, maps[0]), (df, maps[1]), (other, maps[1])], n_jobs=2, executor=executor)
+    for netframe, (frame, network_map) in zip(netframes, [(df, maps[0]), (df, maps[1]), (other, maps[1])]):
+        expected = NetFrame(frame, **network_map)
+        assert netframe.node_map.map == expected.node_map.map
+        assert netframe.edge_map.map == expected.edge_map.map
+        pd.testing.assert_frame_equal(netframe.frame, frame)
+
+
+def test_run_many_merged():
+    merged = netrunner.run_many([(df, maps[0]), (df, maps[1])], merge=True)
+    expected = NetFrame(df, **maps[0])
+    expected.join_graph(NetFrame(df, **maps[1]))
+    assert merged.node_map.map == expected.node_map.map
+    assert merged.edge_map.map == expected.edge_map.map
+    assert merged.frame is df
+    assert set(merged.node_columns) == {'person', 'group', 'city'}
+
+    # one shared frame can be replayed through every map
+    merged.append_rows(df.iloc[:5].set_axis(range(200, 205)))
+    assert merged.edge_map.map.keys() == expected.edge_map.map.keys()
+
+    assert netrunner.run_many([(df, maps[0]), (other, maps[1])], merge=True).frame is None
@@ -0,0 +1,20 @@
+import importlib.util
+import os
+
+path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'bench_netframe.py')
+spec = importlib.util.spec_from_file_location('bench_netframe', path)
+bench = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench)
+
+
+def test_make_frame_shape():
+    frame = bench.make_frame(rows=500, node_columns=2, cardinality=20, attributes=3, nan_ratio=0.2)
+    assert list(frame.columns) == ['node_0', 'node_1', 'attr_0', 'attr_1', 'attr_2']
+    assert frame['node_0'].nunique() <= 20
+    assert 0 < frame['attr_0'].isna().mean() < 0.4
+
+
+def test_benchmarks_run():
+    results = bench.run_benchmarks(rows=200, cardinality=20, repeat=1)
+    assert {result['case'] for result in results} == set(bench.cases(bench.make_frame(10), bench.make_map()))
+    assert all(result['seconds'] >= 0 and result['peak_mb'] > 0 for result in results)
@@ -0,0 +1,69 @@
+import pandas as pd
+
+import netrunner
+from netrunner.cache import BuildCache
+from netrunner.netframe import NetFrame
+
+df = pd.DataFrame({
+    'person': ['ann', 'bob', 'ann', 'cat'],
+    'group': ['red', 'blue', 'red', 'gold'],
+    'age': [30, 41, 31, 25],
+    'unused': [1, 2, 3, 4],
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')], node_attributes={'person': ['age']})
+
+
+def test_cache_hit_restores_build(tmp_path):
+    cache = BuildCache(tmp_path)
+    built = netrunner.run(df, cache=cache, **network_map)
+    cached = netrunner.run(df, cache=cache, **network_map)
+    assert cache.stats['hits'] == 1 and cache.stats['misses'] == 1 and cache.stats['entries'] == 1
+    assert dict(cached.node_map.map) == dict(built.node_map.map)
+    assert dict(cached.edge_map.map) == dict(built.edge_map.map)
+    assert cached.node_columns == built.node_columns
+    assert cached.frame is df
+
+
+def test_cache_key(tmp_path):
+    key = BuildCache.key(df, **network_map)
+    assert BuildCache.key(df.assign(unused=0), **network_map) == key
+    assert BuildCache.key(df.assign(age=0), **network_map) != key
+    assert BuildCache.key(df.iloc[::-1], **network_map) != key
+    assert BuildCache.key(df, aggregate='mean', **network_map) != key
+
+    # object columns hash by value and type
+    mixed = df.assign(age=pd.Series([1, 41, 31, 'x'], dtype=object))
+    assert BuildCache.key(mixed.assign(age=pd.Series(['1', 41, 31, 'x'], dtype=object)), **network_map) != \
+        BuildCache.key(mixed, **network_map)
+    lists = df.assign(age=[[30], [41], [30, 1], []])
+    assert BuildCache.key(lists, **network_map) != BuildCache.key(lists.assign(age=[[30], [41], [30], [1]]),
+                                                                 **network_map)
+    assert NetFrame(lists, cache=BuildCache(tmp_path), **network_map).node_map.map['bob']['attributes'] == \
+        {'age': [41]}
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = BuildCache(tmp_path)
+    NetFrame(df, cache=cache, **network_map)
+    NetFrame(df.iloc[:2], cache=cache, **network_map)
+    size = cache.stats['bytes'] // 2
+
+    # touching the first entry makes the second one the oldest
+    NetFrame(df, cache=cache, **network_map)
+    cache.max_bytes = size + size // 2
+    cache.evict()
+    assert cache.stats['entries'] == 1 and cache.evictions == 1
+    NetFrame(df, cache=cache, **network_map)
+    assert cache.hits == 2
+
+
+def test_cache_keeps_graph_settings(tmp_path):
+    cache = BuildCache(tmp_path)
+    multi = NetFrame(df, cache=cache, multigraph=True, weight='weight', **network_map)
+    plain = NetFrame(df, cache=cache, **network_map)
+    assert cache.stats['entries'] == 2 and cache.hits == 0
+    assert multi.net.is_multigraph() and not plain.net.is_multigraph()
+    assert plain.store.weight is None and 'weight' not in plain.store.edge_attributes.columns
+
+    cached = NetFrame(df, cache=cache, multigraph=True, weight='weight', **network_map)
+    assert cache.hits == 1 and cached.multigraph and cached.store.weight == 'weight'
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+from netrunner.utils import shared_categories
+
+rng = np.random.default_rng(13)
+df = pd.DataFrame({
+    'person': rng.choice(np.array(['ann', 'bob', 'cat', None], dtype=object), 200),
+    'group': rng.choice(['red', 'blue', 'unknown', 'ann'], 200),
+    'age': rng.integers(18, 80, 200),
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')], ignore_chars='unknown',
+                   node_attributes={'person': ['age']}, edge_attributes={('person', 'group'): ['age']})
+
+
+def test_shared_categories():
+    encoded = shared_categories(df, ['person', 'group'])
+    assert encoded['person'].dtype == encoded['group'].dtype
+    assert set(encoded['person'].cat.categories) == {'ann', 'bob', 'cat', 'red', 'blue', 'unknown'}
+    assert encoded['person'].astype(object).fillna('-').tolist() == df['person'].fillna('-').tolist()
+    assert encoded['age'].equals(df['age'])
+
+
+@pytest.mark.parametrize('aggregate', ['last', 'mean', 'list'])
+def test_categorical_input_matches(aggregate):
+    expected = NetFrame(df, aggregate=aggregate, **network_map)
+
+    # unused categories never become nodes
+    frame = df.astype({'person': pd.CategoricalDtype(['ann', 'bob', 'cat', 'zed'])})
+    for netframe in (NetFrame(frame, aggregate=aggregate, **network_map),
+                     NetFrame(df, aggregate=aggregate, categorize=True, **network_map)):
+        assert netframe.node_map.map == expected.node_map.map
+        assert netframe.edge_map.map == expected.edge_map.map
+        assert netframe.store.labels.dtype == expected.store.labels.dtype
+
+
+def test_categorize_keeps_frame():
+    netframe = NetFrame(df.iloc[:100], categorize=True, **network_map)
+    assert netframe.frame['person'].dtype == df['person'].dtype
+    netframe.append_rows(df.iloc[100:])
+    assert netframe.edge_map.map == NetFrame(df, **network_map).edge_map.map
@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+rng = np.random.default_rng(7)
+df = pd.DataFrame({
+    'person': rng.choice(np.array(['ann', 'bob', 'cat', 'dan', None], dtype=object), 200),
+    'group': rng.choice(['red', 'blue', 'green'], 200),
+    'age': rng.integers(18, 80, 200),
+    'score': rng.choice([1.5, 2.5, np.nan], 200),
+})
+network_map = dict(nodes=['person', 'group'],
+                   links=[('person', 'group')],
+                   node_attributes={'person': ['age', 'score']},
+                   edge_attributes={('person', 'group'): ['age']})
+
+
+def chunks(frame, size=37):
+    return (frame.iloc[start:start + size] for start in range(0, len(frame), size))
+
+
+@pytest.mark.parametrize('aggregate', ['last', 'first', 'list', 'sum', 'mean', 'count'])
+def test_from_chunks_matches_full_build(aggregate):
+    full = NetFrame(df, aggregate=aggregate, **network_map)
+    streamed = NetFrame.from_chunks(chunks(df), aggregate=aggregate, **network_map)
+    assert streamed.frame is None
+    assert list(streamed.node_map.map) == list(full.node_map.map)
+    pd.testing.assert_frame_equal(streamed.store.node_attributes.to_frame(),
+                                  full.store.node_attributes.to_frame(), check_dtype=False)
+    pd.testing.assert_frame_equal(streamed.store.edge_attributes.to_frame(),
+                                  full.store.edge_attributes.to_frame(), check_dtype=False)
+    assert streamed.store.edge_counts.tolist() == full.store.edge_counts.tolist()
+
+
+def test_from_csv_reads_map_columns(tmp_path):
+    path = tmp_path / 'people.csv'
+    df.assign(unused='x').to_csv(path, index=False)
+    netframe = NetFrame.from_csv(path, chunksize=50, keep_frame=True, **network_map)
+    assert 'unused' not in netframe.frame.columns
+    assert len(netframe.frame) == len(df)
+    assert set(netframe.net.nodes) == {'ann', 'bob', 'cat', 'dan', 'red', 'blue', 'green'}
+
+
+def test_count_folds_on_append():
+    full = NetFrame(df, aggregate='count', **network_map)
+    appended = NetFrame(df.iloc[:120], aggregate='count', **network_map)
+    appended.append_rows(df.iloc[120:])
+    assert dict(appended.node_map.map) == dict(full.node_map.map)
+    assert dict(appended.edge_map.map) == dict(full.edge_map.map)
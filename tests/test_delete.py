@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+rng = np.random.default_rng(5)
+df = pd.DataFrame({
+    'person': rng.choice([f'p{i}' for i in range(40)], 300),
+    'group': rng.choice([f'g{i}' for i in range(10)], 300),
+    'age': rng.integers(18, 80, 300),
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')],
+                   node_attributes={'person': ['age']}, edge_attributes={('person', 'group'): ['age']})
+
+
+def edges(netframe):
+    return set(map(frozenset, netframe.edge_map.map))
+
+
+@pytest.mark.parametrize('materialize', [True, False])
+def test_delete_nodes(materialize):
+    netframe = NetFrame(df, **network_map)
+    expected = NetFrame(df, **network_map).net.copy()
+    expected.remove_nodes_from(['p1', 'g2'])
+    if materialize:
+        netframe.net
+
+    netframe.delete_node('p1')
+    netframe.delete_nodes(['g2', 'missing'])
+    assert netframe.store.node_deleted is not None
+    assert 'p1' not in netframe.node_map.map and 'g2' not in netframe.node_map.map
+    assert len(netframe.node_map.map) == expected.number_of_nodes()
+    assert edges(netframe) == set(map(frozenset, expected.edges))
+    assert sorted(netframe.net.nodes(data=True)) == sorted(expected.nodes(data=True))
+    assert set(map(frozenset, netframe.net.edges)) == set(map(frozenset, expected.edges))
+    assert 'p1' not in netframe.nodes_to_frame().index
+
+    with pytest.raises(KeyError):
+        netframe.delete_node('p1')
+
+
+def test_delete_compacts_and_revives():
+    netframe = NetFrame(df, **network_map)
+    netframe.delete_nodes([f'p{i}' for i in range(20)])
+    assert netframe.store.node_deleted is None
+    assert set(netframe.store.labels) == set(netframe.node_map.map)
+
+    netframe.append_rows(pd.DataFrame({'person': ['p1'], 'group': ['g1'], 'age': [33]}))
+    assert netframe.node_map.map['p1'] == {'attributes': {'age': 33}, 'source_col': ['person']}
+    assert (('p1', 'g1') in netframe.edge_map.map) and netframe.net.has_edge('p1', 'g1')
+
+    matrix, labels = netframe.to_sparse()
+    assert matrix.shape == (len(labels), len(labels))
+    assert matrix.nnz == 2 * len(netframe.edge_map.map)
+
+
+def test_filter_nodes():
+    netframe = NetFrame(df, **network_map)
+    older = netframe.filter_nodes(lambda nodes: nodes['age'] > 50)
+    ages = netframe.nodes_to_frame()['age']
+    assert set(older.node_map.map) == set(ages.index[ages > 50])
+    assert older.frame is None and older.node_columns == netframe.node_columns
+    assert all(edge <= set(older.node_map.map) for edge in edges(older))
+
+    people = netframe.filter_nodes(pd.Series(True, index=['p1', 'g1', 'g2']))
+    assert set(people.net.nodes) == {'p1', 'g1', 'g2'}
+    assert edges(people) == {edge for edge in edges(netframe) if edge <= {'p1', 'g1', 'g2'}}
+
+    with pytest.raises(ValueError):
+        netframe.filter_nodes([True])
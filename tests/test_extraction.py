@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+# small synthetic frame with repeats and missing values
+df = pd.DataFrame({
+    'person': ['ann', 'bob', 'ann', 'cat', np.nan, 'dan', 'bob'],
+    'group': ['red', 'blue', 'red', 'unknown', 'blue', np.nan, 'green'],
+    'age': [30, 41, 31, 25, 60, 52, 41],
+    'score': [1.0, 2.0, 3.0, np.nan, 5.0, 6.0, 7.0],
+})
+
+
+def test_unique_nodes_match_legacy():
+    vectorized = NetFrame(df)
+    vectorized.add_nodes(['person', 'group'])
+    legacy = NetFrame(df)
+    legacy.add_nodes(['person', 'group'], vectorized=False)
+    assert set(vectorized.node_map.map.keys()) == set(legacy.node_map.map.keys())
+    assert vectorized.node_columns == legacy.node_columns
+
+
+def test_unique_nodes_ignore_chars():
+    netframe = NetFrame(df)
+    netframe.add_nodes(['group'], ignore_chars='unknown')
+    assert set(netframe.node_map.map.keys()) == {'red', 'blue', 'green'}
+
+
+def test_node_attributes_last():
+    netframe = NetFrame(df, nodes=['person'], links=[('person', 'group')], node_attributes={'person': ['age']})
+    assert netframe.node_map.map['ann']['attributes'] == {'age': 31}
+    assert netframe.node_map.map['bob']['attributes'] == {'age': 41}
+
+
+def test_node_attributes_policies():
+    netframe = NetFrame(df)
+    netframe.add_nodes(['person'])
+    netframe.set_node_attributes({'person': ['age', 'score']}, aggregate='list')
+    assert netframe.node_map.map['ann']['attributes'] == {'age': [30, 31], 'score': [1.0, 3.0]}
+    netframe.set_node_attributes({'person': ['age']}, aggregate='sum')
+    assert netframe.node_map.map['ann']['attributes']['age'] == 61
+    netframe.set_node_attributes({'person': ['age']}, aggregate='first')
+    assert netframe.node_map.map['ann']['attributes']['age'] == 30
+
+
+def test_node_attributes_numeric_only():
+    netframe = NetFrame(df)
+    netframe.add_nodes(['person'])
+    with pytest.raises(ValueError):
+        netframe.set_node_attributes({'person': ['group']}, aggregate='mean')
+
+
+def test_edge_orientation():
+    netframe = NetFrame(df, nodes=['person', 'group'], links=[('person', 'group')])
+    assert ('ann', 'red') in netframe.edge_map.map
+    assert netframe.edge_map.map[('ann', 'red')]['source_col'] == 'person'
+    assert netframe.edge_map.map[('ann', 'red')]['target_col'] == 'group'
+
+
+def test_edge_attributes():
+    netframe = NetFrame(df, nodes=['person', 'group'], links=[('person', 'group')],
+                        edge_attributes={('person', 'group'): ['age']})
+    assert netframe.edge_map.map[('ann', 'red')]['attributes'] == {'age': 31}
+    assert netframe.net.edges['bob', 'green']['age'] == 41
+
+    netframe.set_edge_attributes({('person', 'group'): ['age']}, aggregate='mean')
+    assert netframe.edge_map.map[('ann', 'red')]['attributes'] == {'age': 30.5}
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_extraction_matches_serial(executor):
+    wide = pd.DataFrame({f'person_{i}': df['person'].shift(i) for i in range(4)}).assign(group=df['group'])
+    nodes = [f'person_{i}' for i in range(4)] + ['group']
+    links = [(f'person_{i}', 'group') for i in range(4)]
+    serial = NetFrame(wide, nodes=nodes, links=links)
+    parallel = NetFrame(wide, nodes=nodes, links=links, n_jobs=2, executor=executor)
+    assert parallel.store.labels.tolist() == serial.store.labels.tolist()
+    assert parallel.store.src.tolist() == serial.store.src.tolist()
+    assert parallel.store.dst.tolist() == serial.store.dst.tolist()
+    assert parallel.node_columns == serial.node_columns
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+rng = np.random.default_rng(11)
+df = pd.DataFrame({
+    'person': rng.choice(np.array(['ann', 'bob', 'cat', 'dan', 'eve', None], dtype=object), 120),
+    'group': rng.choice(['red', 'blue', 'green', 'gold'], 120),
+    'age': rng.integers(18, 80, 120),
+})
+network_map = dict(nodes=['person', 'group'],
+                   links=[('person', 'group')],
+                   node_attributes={'person': ['age']},
+                   edge_attributes={('person', 'group'): ['age']})
+
+
+def assert_same(netframe, expected):
+    assert dict(netframe.node_map.map) == dict(expected.node_map.map)
+    assert dict(netframe.edge_map.map) == dict(expected.edge_map.map)
+    assert sorted(netframe.net.nodes(data=True)) == sorted(expected.net.nodes(data=True))
+    assert sorted(map(sorted, netframe.net.edges)) == sorted(map(sorted, expected.net.edges))
+
+
+@pytest.mark.parametrize('aggregate', ['last', 'sum', 'mean'])
+def test_append_rows(aggregate):
+    netframe = NetFrame(df.iloc[:80], aggregate=aggregate, **network_map)
+    netframe.update_node_map({'ann': 1}, 'rank')
+    assert netframe.net.nodes['ann']['rank'] == 1
+    netframe.append_rows(df.iloc[80:].reset_index(drop=True))
+    expected = NetFrame(df, aggregate=aggregate, **network_map)
+    assert netframe.frame.index.equals(df.index)
+    assert netframe.node_map.map['ann']['attributes']['rank'] == 1
+    netframe.store.node_attributes.unset('rank', [netframe.store.node_id('ann')])
+    netframe.net.nodes['ann'].pop('rank')
+    assert_same(netframe, expected)
+
+
+@pytest.mark.parametrize('materialize', [True, False])
+def test_remove_rows(materialize):
+    netframe = NetFrame(df, **network_map)
+    if materialize:
+        assert 'eve' in netframe.net
+    dropped = df.index[df['person'] == 'eve'].append(df.index[:30])
+    netframe.remove_rows(dropped)
+    expected = NetFrame(df.drop(dropped), **network_map)
+    assert 'eve' not in netframe.net
+    assert_same(netframe, expected)
+
+
+def test_apply_dataframe_incremental():
+    netframe = NetFrame(df.iloc[:100], **network_map)
+    netframe.frame = pd.concat([netframe.frame.iloc[10:], df.iloc[100:]])
+    netframe.apply_dataframe(incremental=True)
+    expected = NetFrame(df.iloc[10:], **network_map)
+    assert_same(netframe, expected)
+
+
+def test_apply_dataframe_keeps_map_attributes():
+    netframe = NetFrame(df, **network_map)
+    netframe.apply_dataframe()
+    assert 'age' in netframe.node_map.map['ann']['attributes']
+
+
+@pytest.mark.parametrize('incremental', [False, True])
+def test_apply_without_frame(incremental):
+    netframe = NetFrame.from_chunks([df.iloc[:60], df.iloc[60:]], **network_map)
+    nodes = dict(netframe.node_map.map)
+    with pytest.raises(ValueError, match='frame'):
+        netframe.apply_dataframe(incremental=incremental)
+    with pytest.raises(ValueError, match='frame'):
+        netframe.apply_map()
+    assert dict(netframe.node_map.map) == nodes
+
+
+def test_network_is_lazy():
+    netframe = NetFrame(df, **network_map)
+    assert netframe._net is None
+    assert netframe.node_map.map['ann']['source_col'] == ['person']
+    assert netframe._net is None
+
+    graph = netframe.net
+    netframe.update_node_map({'ann': 1}, 'rank')
+    assert netframe.net is graph and graph.nodes['ann']['rank'] == 1
+
+    netframe.add_nodes(['group'])
+    assert netframe._net_stale
+    assert set(netframe.net.nodes) == set(netframe.node_map.map)
+
+
+@pytest.mark.parametrize('aggregate', ['last', 'sum', 'list'])
+def test_remove_rows_shared_attribute_names(aggregate):
+    frame = pd.DataFrame({'a': ['x', 'z', 'y'], 'b': ['y', 'x', 'w'], 'age': [1, 2, 3]})
+    shared_map = dict(nodes=['a', 'b'], links=[('a', 'b')], node_attributes={'a': ['age'], 'b': ['age']})
+    netframe = NetFrame(frame, aggregate=aggregate, **shared_map)
+    netframe.remove_rows([1])
+    assert netframe.node_map.map['x']['attributes'] != {}
+    assert_same(netframe, NetFrame(frame.drop(index=1), aggregate=aggregate, **shared_map))
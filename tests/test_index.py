@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+rng = np.random.default_rng(9)
+df = pd.DataFrame({
+    'attacker': rng.choice([f'k{i}' for i in range(12)], 200),
+    'defender': rng.choice([f'k{i}' for i in range(6, 20)], 200),
+    'region': rng.choice([f'r{i}' for i in range(5)], 200),
+})
+network_map = dict(nodes=['attacker', 'defender', 'region'],
+                   links=[('attacker', 'defender'), ('attacker', 'region')])
+
+
+def scan_nodes(netframe, col):
+    return {node for node, data in netframe.node_map.map.items() if col in data['source_col']}
+
+
+def scan_edges(netframe, link):
+    return {edge for edge, data in netframe.edge_map.map.items() if (data['source_col'], data['target_col']) == link}
+
+
+def assert_indexed(netframe):
+    for col in network_map['nodes']:
+        assert set(netframe.nodes_of(col)) == scan_nodes(netframe, col)
+    for link in network_map['links']:
+        assert set(netframe.edges_of(link)) == scan_edges(netframe, link)
+
+
+def test_indexes_follow_updates():
+    netframe = NetFrame(df.iloc[:150], **network_map)
+    assert_indexed(netframe)
+    assert len(netframe.nodes_of('region')) == 5
+
+    netframe.append_rows(pd.DataFrame({'attacker': ['new'], 'defender': ['k7'], 'region': ['r9']}))
+    assert 'new' in netframe.nodes_of('attacker') and 'r9' in netframe.nodes_of('region')
+    assert ('new', 'r9') in netframe.edges_of(('attacker', 'region'))
+    assert_indexed(netframe)
+
+    netframe.delete_nodes(['k7'])
+    assert 'k7' not in netframe.nodes_of('defender')
+    assert_indexed(netframe)
+
+    netframe.remove_rows(netframe.frame.index[:100])
+    assert_indexed(netframe)
+
+    with pytest.raises(KeyError):
+        netframe.nodes_of('nope')
+
+
+def test_views_are_restricted():
+    netframe = NetFrame(df, **network_map)
+    regions = netframe.nodes_of('region')
+    assert 'r1' in regions and 'k1' not in regions
+    assert regions['r1'] == netframe.node_map.map['r1']
+    with pytest.raises(KeyError):
+        regions['k1']
+
+    fights = netframe.edges_of(('attacker', 'defender'))
+    assert all(edge not in fights for edge in netframe.edges_of(('attacker', 'region')))
+
+
+def test_subgraph_of():
+    netframe = NetFrame(df, **network_map)
+    regions = netframe.subgraph_of(links=[('attacker', 'region')])
+    assert set(regions.edge_map.map) == scan_edges(netframe, ('attacker', 'region'))
+    assert set(regions.net.nodes) == {node for edge in regions.edge_map.map for node in edge}
+
+    attackers = netframe.subgraph_of(cols=['attacker'])
+    assert set(attackers.node_map.map) == scan_nodes(netframe, 'attacker')
+    assert set(map(frozenset, attackers.edge_map.map)) == {
+        frozenset(edge) for edge in netframe.edge_map.map if set(edge) <= scan_nodes(netframe, 'attacker')}
+
+
+def test_views_survive_compaction(tmp_path):
+    netframe = NetFrame(df, **network_map)
+    defenders = netframe.nodes_of('defender')
+    fights = netframe.edges_of(('attacker', 'defender'))
+
+    # deleting more than a quarter of the nodes renumbers the store
+    netframe.delete_nodes([f'k{i}' for i in range(8)])
+    assert netframe.store.node_deleted is None
+    assert set(defenders) == scan_nodes(netframe, 'defender')
+    assert set(fights) == scan_edges(netframe, ('attacker', 'defender'))
+    assert all(defenders[node] == netframe.node_map.map[node] for node in defenders)
+    assert 'k7' not in defenders and 'r1' not in defenders
+
+    netframe.save(tmp_path / 'graph')
+    netframe.append_rows(pd.DataFrame({'attacker': ['new'], 'defender': ['k30'], 'region': ['r1']}))
+    assert 'k30' in defenders and ('new', 'k30') in fights
+    assert len(fights) == len(scan_edges(netframe, ('attacker', 'defender')))
+
+
+def test_edges_shared_by_links(tmp_path):
+    battles = pd.DataFrame({'attacker_king': ['Robb Stark', 'Joffrey', 'Robb Stark'],
+                            'defender_king': ['Joffrey', 'Robb Stark', 'Robb Stark'],
+                            'defender_commander': ['Tywin', 'Robb Stark', 'Robb Stark']})
+    links = [('attacker_king', 'defender_king'), ('defender_commander', 'defender_king')]
+    netframe = NetFrame(battles, nodes=list(battles.columns), links=links)
+    for link in links:
+        assert ('Robb Stark', 'Robb Stark') in netframe.edges_of(link)
+        assert netframe.edges_of(link)[('Robb Stark', 'Robb Stark')]['target_col'] == 'defender_king'
+    assert ('Tywin', 'Joffrey') not in netframe.edges_of(links[0])
+
+    # the edge outlives the rows of the link that created it
+    netframe.remove_rows([2])
+    assert ('Robb Stark', 'Robb Stark') not in netframe.edges_of(links[0])
+    assert netframe.edge_map.map[('Robb Stark', 'Robb Stark')]['source_col'] == 'defender_commander'
+
+    netframe.save(tmp_path / 'graph')
+    loaded = NetFrame.load(tmp_path / 'graph')
+    assert set(loaded.edges_of(links[1])) == set(netframe.edges_of(links[1]))
+    assert set(loaded.subgraph_of(links=[links[1]]).edge_map.map) == {('Tywin', 'Joffrey'),
+                                                                       ('Robb Stark', 'Robb Stark')}
+
+    frameless = NetFrame(battles, nodes=list(battles.columns), links=links)
+    expected = frameless.project('defender_commander', 'defender_king')
+    frameless.frame = None
+    projected = frameless.project('defender_commander', 'defender_king')
+    assert dict(projected.node_map.map) == dict(expected.node_map.map)
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+
+left_df = pd.DataFrame({'person': ['ann', 'bob', 'cat'], 'group': ['red', 'red', 'blue'], 'age': [30, 40, 50]})
+right_df = pd.DataFrame({'person': ['ann', 'dan'], 'team': ['x', 'y'], 'age': [31, 60]})
+
+
+def build():
+    left = NetFrame(left_df, nodes=['person', 'group'], links=[('person', 'group')],
+                    node_attributes={'person': ['age']})
+    right = NetFrame(right_df, nodes=['person', 'team'], links=[('person', 'team')],
+                     node_attributes={'person': ['age']})
+    return left, right
+
+
+@pytest.mark.parametrize('conflict, expected', [('replace', 31), ('keep', 30), ('sum', 61), ('list', [30, 31])])
+def test_join_conflicts(conflict, expected):
+    left, right = build()
+    left.join_graph(right, conflict=conflict)
+    assert left.node_map.map['ann']['attributes']['age'] == expected
+    assert left.net.nodes['ann']['age'] == expected
+    assert left.node_map.map['dan']['attributes']['age'] == 60
+
+
+def test_join_conflict_error_leaves_store():
+    left, right = build()
+    with pytest.raises(ValueError):
+        left.join_graph(right, conflict='error')
+    assert 'dan' not in left.node_map.map
+
+
+def test_join_updates_network_in_place():
+    left, right = build()
+    graph = left.net
+    graph.nodes['bob']['marker'] = True
+    left.join_graph(right)
+    assert left.net is graph
+    assert graph.nodes['bob']['marker']
+    assert set(graph.nodes) == {'ann', 'bob', 'cat', 'red', 'blue', 'dan', 'x', 'y'}
+    assert left.node_map.map['ann']['source_col'] == ['person']
+    assert left.edge_columns == [('person', 'group'), ('person', 'team')]
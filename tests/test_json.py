@@ -0,0 +1,54 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from networkx.readwrite import json_graph
+
+from netrunner.netframe import NetFrame
+
+df = pd.DataFrame({
+    'person': ['ann', 'bob', 'ann', 'cat', 'red'],
+    'group': ['red', 'blue', 'red', 'ann', 'ann'],
+    'score': [1.0, np.nan, 3.0, np.inf, 5.0],
+    'age': [30, 41, 31, 25, 60],
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')],
+                   node_attributes={'person': ['score']}, edge_attributes={('person', 'group'): ['age', 'score']})
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 10000])
+def test_json_stream_matches_network(chunksize):
+    netframe = NetFrame(df, **network_map)
+    buffer = io.StringIO()
+    netframe.to_json_stream(buffer, chunksize=chunksize)
+    graph = json_graph.node_link_graph(json.loads(buffer.getvalue()))
+
+    assert dict(graph.nodes(data=True))['bob'] == {'score': None}
+    assert dict(graph.nodes(data=True))['cat'] == {'score': None}
+    assert set(graph.nodes) == set(netframe.net.nodes)
+    assert set(map(frozenset, graph.edges)) == set(map(frozenset, netframe.net.edges))
+
+    # ann -> red and red -> ann collapse into one edge with the later attributes, as in Graph
+    assert graph.edges['ann', 'red'] == netframe.net.edges['ann', 'red'] == {'age': 60, 'score': 5.0}
+
+
+def test_ndjson_records(tmp_path):
+    netframe = NetFrame(df, **network_map)
+    netframe.to_json_stream(tmp_path / 'graph.ndjson', ndjson=True, chunksize=2)
+    records = [json.loads(line) for line in (tmp_path / 'graph.ndjson').read_text().splitlines()]
+
+    nodes = {record['id']: record['attributes'] for record in records if 'id' in record}
+    edges = [record for record in records if 'source' in record]
+    assert nodes['ann'] == {'score': 3.0}
+    assert nodes['bob'] == {'score': None}
+    assert len(nodes) == netframe.net.number_of_nodes()
+    assert len(edges) == netframe.net.number_of_edges()
+
+
+def test_json_stream_matches_to_json_keys():
+    netframe = NetFrame(df.iloc[:2], **network_map)
+    document = json.loads(''.join(netframe.iter_json()))
+    assert document.keys() == netframe.to_json().keys()
+    assert 'links' in json.loads(''.join(netframe.iter_json(edges='links')))
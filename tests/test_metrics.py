@@ -0,0 +1,78 @@
+import networkx
+import pandas as pd
+import pytest
+from networkx.algorithms import community
+
+from netrunner.netframe import NetFrame
+
+df = pd.DataFrame({
+    'person': ['ann', 'bob', 'ann', 'cat', 'dan'],
+    'group': ['red', 'blue', 'blue', 'gold', 'gold'],
+    'age': [30, 41, 31, 25, 60],
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')], node_attributes={'person': ['age']})
+
+
+def test_update_node_maps_bulk():
+    netframe = NetFrame(df, **network_map)
+    graph = netframe.net
+    partition = community.greedy_modularity_communities(graph)
+    netframe.update_node_maps({
+        'degree': graph.degree(),
+        'centrality': networkx.degree_centrality(graph),
+        'pagerank': pd.Series(networkx.pagerank(graph)),
+        'community': partition,
+        'missing': {'zed': 1},
+    })
+
+    assert netframe.node_map.map['ann']['attributes']['degree'] == 2
+    assert netframe.node_map.map['bob']['attributes']['centrality'] == networkx.degree_centrality(graph)['bob']
+    assert graph.nodes['cat']['pagerank'] == networkx.pagerank(graph)['cat']
+    assert {netframe.net.nodes[node]['community'] for node in partition[0]} == {0}
+    assert netframe.store.node_ids(['zed']).tolist() == [-1]
+
+
+def test_nodes_to_frame_joins_back():
+    netframe = NetFrame(df, **network_map)
+    netframe.update_node_map(netframe.net.degree(), 'degree')
+    nodes = netframe.nodes_to_frame()
+    assert nodes.index.name == 'node'
+    assert nodes.loc['ann', 'age'] == 31 and pd.isna(nodes.loc['red', 'age'])
+
+    joined = df.merge(netframe.nodes_to_frame(['degree']), left_on='person', right_index=True)
+    assert joined['degree'].tolist() == [2, 1, 2, 1, 1]
+
+
+def test_compute_metrics_parallel_matches_serial():
+    metrics = ['degree', 'betweenness', 'pagerank', 'community']
+    serial = NetFrame(df, **network_map)
+    expected = serial.compute_metrics(metrics, n_jobs=1, seed=1)
+    parallel = NetFrame(df, **network_map)
+    results = parallel.compute_metrics(metrics, n_jobs=2, seed=1)
+
+    assert results['degree'] == expected['degree'] == dict(serial.net.degree())
+    assert results['betweenness'] == pytest.approx(expected['betweenness'])
+    assert results['pagerank'] == pytest.approx(expected['pagerank'])
+    assert sorted(map(sorted, results['community'])) == sorted(map(sorted, expected['community']))
+    assert parallel.node_map.map['ann']['attributes']['betweenness'] == pytest.approx(results['betweenness']['ann'])
+
+
+def test_compute_metrics_sampled_betweenness():
+    netframe = NetFrame(df, **network_map)
+    results = netframe.compute_metrics(['betweenness', networkx.triangles], n_jobs=2, k=3, seed=0, write=False)
+    assert set(results) == {'betweenness', 'triangles'}
+    assert results['betweenness'] == networkx.betweenness_centrality(netframe.net, k=3, seed=0)
+    assert 'betweenness' not in netframe.nodes_to_frame()
+
+    with pytest.raises(ValueError):
+        netframe.compute_metrics(['nope'], n_jobs=1)
+
+
+@pytest.mark.parametrize('weight', [None, 'weight'])
+def test_multigraph_metrics_match_across_workers(weight):
+    frame = pd.concat([df, df.iloc[[0, 0, 2]]], ignore_index=True)
+    netframe = NetFrame(frame, multigraph=True, weight='weight', **network_map)
+    serial = netframe.compute_metrics(['degree', 'pagerank'], n_jobs=1, weight=weight, write=False)
+    pooled = netframe.compute_metrics(['degree', 'pagerank'], n_jobs=2, executor='thread', weight=weight, write=False)
+    assert serial['degree'] == pooled['degree'] == dict(netframe.net.degree(weight=weight))
+    assert serial['pagerank'] == pytest.approx(pooled['pagerank'])
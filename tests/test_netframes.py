@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 import pandas as pd
 
 import netrunner as nr
@@ -43,13 +44,13 @@ def test_merge_dicts():
 def test_node_map():
     node_map = nf.node_map
     assert isinstance(node_map, NodeMap)
-    assert isinstance(node_map.map, dict)
+    assert isinstance(node_map.map, Mapping)
 
 
 def test_edge_map():
     edge_map = nf.edge_map
     assert isinstance(edge_map, EdgeMap)
-    assert isinstance(edge_map.map, dict)
+    assert isinstance(edge_map.map, Mapping)
 
 
 def test_graph():
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from networkx.algorithms import bipartite
+
+from netrunner.netframe import NetFrame
+
+pytest.importorskip('scipy')
+
+rng = np.random.default_rng(17)
+df = pd.DataFrame({
+    'name': rng.choice([f'n{i}' for i in range(60)], 300),
+    'house': rng.choice(np.array([f'h{i}' for i in range(15)] + ['unknown', None], dtype=object), 300),
+    'age': rng.integers(18, 80, 300),
+})
+netframe = NetFrame(df, nodes=['name', 'house'], links=[('name', 'house')], node_attributes={'name': ['age']},
+                    ignore_chars='unknown')
+names = sorted(df['name'].unique())
+
+
+def weights(graph):
+    return {frozenset((u, v)): data['weight'] for u, v, data in graph.edges(data=True)}
+
+
+@pytest.mark.parametrize('weight, projection', [('count', bipartite.weighted_projected_graph),
+                                                ('newman', bipartite.collaboration_weighted_projected_graph),
+                                                ('jaccard', bipartite.overlap_weighted_projected_graph)])
+def test_project_matches_networkx(weight, projection):
+    projected = netframe.project('name', 'house', weight=weight, chunksize=7)
+    expected = projection(netframe.net, names)
+    assert sorted(projected.net.nodes) == sorted(expected.nodes)
+    assert weights(projected.net).keys() == weights(expected).keys()
+    assert np.allclose([weights(projected.net)[pair] for pair in weights(expected)], list(weights(expected).values()))
+    assert projected.net.nodes['n1'] == netframe.net.nodes['n1']
+    assert projected.frame is None
+
+
+def test_project_max_group_size():
+    sizes = df[df['house'] != 'unknown'].drop_duplicates(['name', 'house'])['house'].value_counts()
+    small = sizes[sizes <= 20].index
+    projected = netframe.project('name', 'house', max_group_size=20)
+    expected = bipartite.weighted_projected_graph(netframe.net.subgraph(names + list(small)), names)
+    assert weights(projected.net) == weights(expected)
+
+
+def test_project_top_k():
+    full = weights(netframe.project('name', 'house').net)
+    pruned = netframe.project('name', 'house', top_k=3, chunksize=11)
+    assert 0 < pruned.store.n_edges < len(full)
+    assert all(full[pair] == weight for pair, weight in weights(pruned.net).items())
+
+    # every node keeps its heaviest link
+    for node in pruned.net:
+        heaviest = max((weight for pair, weight in full.items() if node in pair), default=None)
+        if heaviest is not None:
+            assert max(data['weight'] for _, _, data in pruned.net.edges(node, data=True)) == heaviest
+
+
+@pytest.mark.parametrize('weight', ['count', 'jaccard'])
+def test_project_without_frame(tmp_path, weight):
+    expected = netframe.project('name', 'house', weight=weight)
+    netframe.save(tmp_path / 'graph')
+    loaded = NetFrame.load(tmp_path / 'graph')
+    projected = loaded.project('name', 'house', weight=weight)
+    assert weights(projected.net) == pytest.approx(weights(expected.net))
+    assert dict(projected.node_map.map) == dict(expected.node_map.map)
+
+    # the link is read in either orientation
+    flipped = NetFrame(df, nodes=['name', 'house'], links=[('house', 'name')], ignore_chars='unknown')
+    flipped.frame = None
+    assert weights(flipped.project('name', 'house', weight=weight).net) == pytest.approx(weights(expected.net))
+
+    with pytest.raises(ValueError, match='link'):
+        loaded.project('name', 'age')
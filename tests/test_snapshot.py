@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+from netrunner.snapshot import Snapshots
+
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')], node_attributes={'person': ['age']},
+                   edge_attributes={('person', 'group'): ['age']}, aggregate='list')
+
+
+def make_frame(rows, seed):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'person': rng.choice([f'p{i}' for i in range(40)], rows),
+        'group': rng.choice([f'g{i}' for i in range(8)], rows),
+        'age': rng.integers(18, 80, rows),
+    })
+
+
+# a day of rows dropped from the front and appended at the back per version
+frames = [make_frame(300, 0)]
+for day in range(1, 6):
+    frames.append(pd.concat([frames[-1].iloc[15:], make_frame(15, day)], ignore_index=True))
+
+
+def test_diff():
+    old = NetFrame(pd.DataFrame({'person': ['ann', 'bob', 'cat'], 'group': ['red', 'red', 'blue'], 'age': [1, 2, 3]}),
+                   **network_map)
+    new = NetFrame(pd.DataFrame({'person': ['ann', 'bob', 'dan'], 'group': ['red', 'blue', 'blue'], 'age': [1, 5, 4]}),
+                   **network_map)
+    diff = old.diff(new)
+    assert diff.added_nodes == ['dan'] and diff.removed_nodes == ['cat'] and diff.changed_nodes == ['bob']
+    assert sorted(diff.added_edges) == [('bob', 'blue'), ('dan', 'blue')]
+    assert sorted(diff.removed_edges) == [('bob', 'red'), ('cat', 'blue')]
+    assert diff.changed_edges == []
+    assert old.diff(old) == ([], [], [], [], [], [])
+
+
+def test_diff_counts():
+    old = NetFrame(frames[0], **network_map)
+    grown = NetFrame(pd.concat([frames[0], frames[0].iloc[:1]], ignore_index=True), **network_map)
+    assert old.diff(grown).changed_edges == [tuple(frames[0].iloc[0, :2])]
+    assert NetFrame(frames[0], **{**network_map, 'aggregate': 'last'}).diff(
+        NetFrame(pd.concat([frames[0], frames[0].iloc[:1]]), **{**network_map, 'aggregate': 'last'}), counts=True) \
+        .changed_edges == [tuple(frames[0].iloc[0, :2])]
+
+
+@pytest.mark.parametrize('full_every', [1, 3])
+def test_snapshots_roundtrip(tmp_path, full_every):
+    snapshots = Snapshots(tmp_path / 'series', full_every=full_every)
+    netframes = [NetFrame(frame, **network_map) for frame in frames]
+
+    for version, netframe in enumerate(netframes):
+        assert snapshots.commit(netframe) == version
+
+    assert snapshots.versions == list(range(len(frames)))
+
+    for version, netframe in enumerate(netframes):
+        loaded = snapshots.load(version)
+        assert loaded.node_map.map == netframe.node_map.map
+        assert loaded.edge_map.map == netframe.edge_map.map
+        assert loaded.diff(netframe, counts=True) == ([], [], [], [], [], [])
+
+    assert [set(changes) for changes in snapshots.diff(0, 1)] == [set(changes) for changes in
+                                                                  netframes[0].diff(netframes[1])]
+
+    with pytest.raises(KeyError):
+        snapshots.load(len(frames))
+
+
+def test_commit_leaves_netframe_alone(tmp_path):
+    snapshots = Snapshots(tmp_path / 'series', full_every=2)
+    netframe = NetFrame(frames[0], **network_map)
+    snapshots.commit(netframe)
+    netframe.delete_nodes(['p0'])
+    labels = netframe.store.labels.copy()
+
+    for _ in range(2):
+        snapshots.commit(netframe)
+        assert netframe.store.node_deleted is not None and netframe.store.labels.equals(labels)
+
+    assert 'p0' not in snapshots.load().node_map.map
+    assert snapshots.load().diff(netframe, counts=True) == ([], [], [], [], [], [])
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from netrunner.netframe import NetFrame
+
+df = pd.DataFrame({
+    'person': ['ann', 'bob', 'ann', 'cat'],
+    'group': ['red', 'blue', 'red', 'gold'],
+    'age': [30, 41, 31, 25],
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')],
+                   node_attributes={'person': ['age']}, edge_attributes={('person', 'group'): ['age']})
+
+
+def test_stats_disabled_by_default():
+    netframe = NetFrame(df, **network_map)
+    netframe.net
+    assert netframe.stats.records == []
+    assert netframe.stats.summary().empty
+
+
+def test_stats_records_phases():
+    netframe = NetFrame(df, profile=True, **network_map)
+    netframe.net
+    netframe.join_graph(NetFrame(df.iloc[:2], **network_map))
+
+    summary = netframe.stats.summary()
+    assert list(summary.index) == ['add_nodes', 'add_edges', 'set_node_attributes', 'set_edge_attributes',
+                                   'populate_network', 'join_graph']
+    assert summary.loc['add_nodes', 'rows'] == 4
+    assert (summary['seconds'] >= 0).all()
+
+    nodes, edges = netframe.stats.records[:2]
+    assert nodes['nodes'] == 6 and nodes['edges'] == 0 and nodes['bytes_delta'] > 0
+    assert edges['edges'] == 3
+    assert netframe.stats.records[-1]['rows'] is None
+
+
+def test_stats_hooks():
+    records = list()
+    netframe = NetFrame(df, hooks=[records.append], **network_map)
+    assert [record['phase'] for record in records] == ['add_nodes', 'add_edges', 'set_node_attributes',
+                                                       'set_edge_attributes']
+    netframe.stats.reset()
+    netframe.apply_map().net
+    assert records[-1]['phase'] == 'populate_network'
+    assert netframe.stats.records == []
@@ -0,0 +1,170 @@
+import networkx
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+from netrunner.store import AttributeTable, GraphStore
+
+
+def test_intern_is_stable():
+    store = GraphStore()
+    first = store.intern(['a', 'b', 'a'])
+    second = store.intern(['c', 'b'])
+    assert first.tolist() == [0, 1, 0]
+    assert second.tolist() == [2, 1]
+    assert store.labels.tolist() == ['a', 'b', 'c']
+
+
+def test_intern_keeps_label_types():
+    store = GraphStore()
+    store.intern([0.5, 1.5])
+    assert store.intern([1, 2]).tolist() == [2, 3]
+    assert store.labels.tolist() == [0.5, 1.5, 1, 2]
+    assert type(store.labels[2]) is int
+    assert store.node_id(1) == 2
+
+
+def test_add_edges_counts_repeats():
+    store = GraphStore()
+    ids = store.intern(['a', 'b', 'c'])
+    store.add_edges(('x', 'y'), ids[[0, 0, 1]], ids[[1, 1, 2]])
+    edge_ids = store.add_edges(('x', 'y'), ids[[0, 2]], ids[[1, 0]])
+    assert store.n_edges == 3
+    assert edge_ids.tolist() == [0, 2]
+    assert store.edge_counts.tolist() == [3, 1, 1]
+
+
+def test_attribute_table_dtypes():
+    table = AttributeTable(3)
+    table.set('size', [0, 2], [1, 5])
+    assert table.columns['size'].dtype.kind == 'i'
+    assert table.row(1) == {}
+    assert table.row(2) == {'size': 5}
+    table.set('size', [1], ['big'])
+    assert table.columns['size'].dtype == object
+    assert list(table.rows()) == [{'size': 1}, {'size': 'big'}, {'size': 5}]
+
+
+def test_datetime_attributes():
+    df = pd.DataFrame({'a': ['x', 'y'], 'b': ['y', 'z'], 't': pd.to_datetime(['2020-01-01', '2020-02-01']),
+                       'd': pd.to_timedelta([1, 2], unit='h')})
+    netframe = NetFrame(df, nodes=['a', 'b'], links=[('a', 'b')], node_attributes={'a': ['t', 'd']},
+                        edge_attributes={('a', 'b'): ['t']})
+    assert netframe.node_map.map['x']['attributes'] == {'t': pd.Timestamp('2020-01-01'), 'd': pd.Timedelta(hours=1)}
+    assert netframe.net.nodes['y'] == {'t': pd.Timestamp('2020-02-01'), 'd': pd.Timedelta(hours=2)}
+    assert netframe.net.edges['x', 'y'] == {'t': pd.Timestamp('2020-01-01')}
+    assert '"t": "2020-01-01T00:00:00"' in ''.join(netframe.iter_json())
+
+
+def test_netframe_uses_store():
+    df = pd.DataFrame({'a': ['x', 'y', 'x', np.nan], 'b': ['p', 'p', 'q', 'q'], 'w': [1, 2, 3, 4]})
+    netframe = NetFrame(df, nodes=['a', 'b'], links=[('a', 'b')], node_attributes={'a': ['w']})
+    assert netframe.store.n_nodes == 4
+    assert netframe.store.counts['a'].tolist() == [2, 1, 0, 0]
+    assert netframe.node_map.map['x'] == {'attributes': {'w': 3}, 'source_col': ['a']}
+    assert sorted(netframe.edge_map.map) == [('x', 'p'), ('x', 'q'), ('y', 'p')]
+    assert netframe.net.nodes['x'] == {'w': 3}
+
+
+def test_join_graph_merges_stores():
+    left = NetFrame(pd.DataFrame({'a': ['x', 'y'], 'b': ['p', 'q']}), nodes=['a', 'b'], links=[('a', 'b')])
+    right = NetFrame(pd.DataFrame({'c': ['x', 'z'], 'd': ['r', 'p']}), nodes=['c', 'd'], links=[('c', 'd')])
+    left.join_graph(right)
+    assert left.node_map.map['x']['source_col'] == ['a', 'c']
+    assert len(left.edge_map.map) == 4
+    assert left.net.number_of_nodes() == 6
+
+
+def test_join_graph_leaves_other_untouched():
+    left = NetFrame(pd.DataFrame({'a': ['x', 'y'], 'b': ['p', 'q']}), nodes=['a', 'b'], links=[('a', 'b')])
+    right = NetFrame(pd.DataFrame({'c': ['x', 'z', 'w', 'v'], 'd': ['r', 'p', 'r', 'r']}), nodes=['c', 'd'],
+                     links=[('c', 'd')])
+    right.delete_nodes(['z'])
+    ids = {label: right.store.node_id(label) for label in ['x', 'w', 'v', 'r']}
+    left.join_graph(right)
+    assert right.store.node_deleted is not None
+    assert {label: right.store.node_id(label) for label in ids} == ids
+    assert 'z' not in left.node_map.map and ('w', 'r') in left.edge_map.map
+
+
+def test_join_graph_mean_of_ints():
+    left = NetFrame(pd.DataFrame({'a': ['x'], 'b': ['p'], 'age': [3]}), nodes=['a', 'b'], links=[('a', 'b')],
+                    node_attributes={'a': ['age']})
+    right = NetFrame(pd.DataFrame({'a': ['x'], 'b': ['q'], 'age': [4]}), nodes=['a', 'b'], links=[('a', 'b')],
+                     node_attributes={'a': ['age']})
+    left.join_graph(right, conflict='mean')
+    assert left.node_map.map['x']['attributes']['age'] == 3.5
+
+
+def test_to_sparse_matches_networkx():
+    pytest.importorskip('scipy')
+    df = pd.DataFrame({'a': ['x', 'y', 'x', 'p', 'z'], 'b': ['p', 'p', 'q', 'x', 'z'], 'w': [1, 2, 3, 4, 5]})
+    netframe = NetFrame(df, nodes=['a', 'b'], links=[('a', 'b')], edge_attributes={('a', 'b'): ['w']})
+    matrix, labels = netframe.to_sparse()
+    expected = networkx.to_scipy_sparse_array(netframe.net, nodelist=labels.tolist(), weight=None)
+    assert (matrix != expected).nnz == 0
+    weighted, _ = netframe.to_sparse(weight='w')
+    assert weighted[labels.get_loc('x'), labels.get_loc('p')] == 4
+    counts, _ = netframe.to_sparse(weight='count', symmetric=False)
+    assert counts.sum() == 5
+
+
+def test_to_sparse_prefers_set_orientation():
+    pytest.importorskip('scipy')
+    df = pd.DataFrame({'a': ['x'], 'b': ['p'], 'c': ['p'], 'd': ['x'], 'w': [8]})
+    netframe = NetFrame(df, nodes=['a', 'b', 'c', 'd'], links=[('a', 'b'), ('c', 'd')],
+                        edge_attributes={('a', 'b'): ['w']})
+    weighted, labels = netframe.to_sparse(weight='w')
+    assert weighted[labels.get_loc('x'), labels.get_loc('p')] == netframe.net.edges['x', 'p']['w'] == 8
+    assert weighted[labels.get_loc('p'), labels.get_loc('x')] == 8
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_save_load_roundtrip(tmp_path, mmap):
+    df = pd.DataFrame({'person': ['ann', 'bob', 'ann', 7], 'group': ['red', 'red', None, 'blue'],
+                       'age': [30, 41, 31, 25]})
+    netframe = NetFrame(df, nodes=['person', 'group'], links=[('person', 'group')], aggregate='mean',
+                        node_attributes={'person': ['age']}, edge_attributes={('person', 'group'): ['age']})
+    netframe.update_node_map({'ann': 'top', 7: 'low'}, 'rank')
+    netframe.save(tmp_path / 'graph')
+
+    loaded = NetFrame.load(tmp_path / 'graph', mmap=mmap)
+    assert loaded.frame is None
+    assert loaded.store.labels.equals(netframe.store.labels)
+    assert dict(loaded.node_map.map) == dict(netframe.node_map.map)
+    assert dict(loaded.edge_map.map) == dict(netframe.edge_map.map)
+    assert loaded.edge_columns == netframe.edge_columns
+    assert loaded.edge_attributes_map == netframe.edge_attributes_map
+    assert set(map(frozenset, loaded.net.edges)) == set(map(frozenset, netframe.net.edges))
+
+    # mapped arrays are copy-on-write, updates after a load stay private
+    loaded.append_rows(pd.DataFrame({'person': ['ann'], 'group': ['red'], 'age': [35]}))
+    assert loaded.node_map.map['ann']['attributes']['age'] == 32
+    assert NetFrame.load(tmp_path / 'graph').node_map.map['ann']['attributes']['age'] == 30.5
+
+
+def test_save_strings_without_pickle(tmp_path):
+    df = pd.DataFrame({'person': ['ann', 'bob', 'ann', 'cat'], 'group': ['red', 'red', None, 'blue'],
+                       'team': ['x', None, 'yy', 'z']})
+    netframe = NetFrame(df, nodes=['person', 'group'], links=[('person', 'group')],
+                        node_attributes={'person': ['team']})
+    netframe.save(tmp_path / 'graph')
+    assert np.load(tmp_path / 'graph' / 'labels.npy').dtype.kind == 'U'
+    assert np.load(tmp_path / 'graph' / 'node_attribute_0.npy').dtype.kind == 'U'
+
+    loaded = NetFrame.load(tmp_path / 'graph', allow_pickle=False)
+    assert loaded.store.labels.equals(netframe.store.labels)
+    assert loaded.store.labels.dtype == netframe.store.labels.dtype
+    assert dict(loaded.node_map.map) == dict(netframe.node_map.map)
+    assert pd.isna(loaded.node_map.map['bob']['attributes']['team'])
+    assert loaded.store.node_attributes.columns['team'].dtype == object
+    loaded.update_node_map({'bob': 'a much longer team name'}, 'team')
+    assert loaded.node_map.map['bob']['attributes']['team'] == 'a much longer team name'
+
+    # lists still need pickle, which has to be allowed
+    netframe.update_node_map({'ann': [1, 2]}, 'history')
+    netframe.save(tmp_path / 'lists')
+    with pytest.raises(ValueError, match='allow_pickle'):
+        NetFrame.load(tmp_path / 'lists', allow_pickle=False)
+    assert NetFrame.load(tmp_path / 'lists').node_map.map['ann']['attributes']['history'] == [1, 2]
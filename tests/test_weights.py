@@ -0,0 +1,92 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from netrunner.netframe import NetFrame
+from netrunner.utils import node_link_edges
+
+df = pd.DataFrame({
+    'person': ['ann', 'ann', 'ann', 'bob', 'bob', 'cat'],
+    'group': ['red', 'red', 'blue', 'red', 'red', 'blue'],
+    'amount': [1.0, 4.0, 2.0, 3.0, np.nan, 5.0],
+    'day': [1, 2, 3, 4, 5, 6],
+})
+network_map = dict(nodes=['person', 'group'], links=[('person', 'group')],
+                   edge_attributes={('person', 'group'): ['amount', 'day']})
+
+
+def test_weight_counts_repeated_pairs():
+    netframe = NetFrame(df, weight='weight', **network_map)
+    assert netframe.net.edges['ann', 'red']['weight'] == 2
+    assert netframe.net.edges['cat', 'blue']['weight'] == 1
+    matrix, labels = netframe.to_sparse(weight='weight')
+    assert matrix[labels.get_loc('ann'), labels.get_loc('red')] == 2
+
+
+def test_per_attribute_aggregation():
+    aggregate = {'amount': 'max', 'day': 'min'}
+    netframe = NetFrame(df, aggregate=aggregate, **network_map)
+    assert netframe.edge_map.map[('ann', 'red')]['attributes'] == {'amount': 4.0, 'day': 1}
+    assert netframe.edge_map.map[('bob', 'red')]['attributes'] == {'amount': 3.0, 'day': 4}
+
+    netframe.set_edge_attributes({('person', 'group'): ['amount', 'day']}, aggregate={'amount': 'mean'})
+    assert netframe.edge_map.map[('ann', 'red')]['attributes'] == {'amount': 2.5, 'day': 2}
+
+
+def test_min_max_fold_on_append():
+    netframe = NetFrame(df.iloc[:4], aggregate={'amount': 'min', 'day': 'max'}, weight='weight', **network_map)
+    netframe.net
+    netframe.append_rows(pd.DataFrame({'person': ['ann'], 'group': ['red'], 'amount': [0.5], 'day': [9]},
+                                      index=[10]))
+    assert netframe.net.edges['ann', 'red'] == {'amount': 0.5, 'day': 9, 'weight': 3}
+
+    netframe.remove_rows([0])
+    assert netframe.net.edges['ann', 'red'] == {'amount': 0.5, 'day': 9, 'weight': 2}
+    assert netframe.net.edges['ann', 'red'] == netframe.apply_map().net.edges['ann', 'red']
+
+
+@pytest.mark.parametrize('materialize', [True, False])
+def test_multigraph(materialize):
+    netframe = NetFrame(df, multigraph=True, aggregate={'day': 'list'}, **network_map)
+    assert netframe.net.number_of_edges('ann', 'red') == 2
+    assert sorted(data['day'] for _, _, data in netframe.net.edges(data=True)) == [1, 2, 3, 4, 5, 6]
+
+    if not materialize:
+        netframe.flush_network()
+
+    netframe.remove_rows([1])
+    assert netframe.net.number_of_edges('ann', 'red') == 1
+    assert netframe.net.number_of_edges() == len(df) - 1
+
+    document = json.loads(''.join(netframe.iter_json()))
+    assert document['multigraph'] is True
+    assert len(document[node_link_edges()]) == len(df) - 1
+
+
+def test_weight_roundtrip(tmp_path):
+    netframe = NetFrame(df, weight='weight', multigraph=True, **network_map)
+    netframe.save(tmp_path / 'graph')
+    loaded = NetFrame.load(tmp_path / 'graph')
+    assert loaded.store.weight == 'weight' and loaded.multigraph
+    assert loaded.net.number_of_edges() == netframe.net.number_of_edges()
+
+
+def test_weight_sums_both_orientations():
+    frame = pd.DataFrame({'a': ['x', 'y', 'x', 'z'], 'b': ['y', 'x', 'y', 'z']})
+    netframe = NetFrame(frame, nodes=['a', 'b'], links=[('a', 'b')], weight='weight')
+    assert netframe.net.edges['x', 'y']['weight'] == 3
+    assert netframe.net.edges['z', 'z']['weight'] == 1
+    document = json.loads(''.join(netframe.iter_json()))
+    links = {(link['source'], link['target']): link['weight'] for link in document[node_link_edges()]}
+    assert links == {('x', 'y'): 3, ('z', 'z'): 1}
+    for weight in ('weight', 'count'):
+        matrix, labels = netframe.to_sparse(weight=weight)
+        assert matrix[labels.get_loc('x'), labels.get_loc('y')] == matrix[labels.get_loc('y'), labels.get_loc('x')] == 3
+
+    netframe.remove_rows([1])
+    assert netframe.net.edges['x', 'y']['weight'] == 2
+    assert netframe.net.edges['x', 'y'] == netframe.apply_map().net.edges['x', 'y']
+    assert NetFrame(frame, nodes=['a', 'b'], links=[('a', 'b')], weight='weight', multigraph=True) \
+        .store.edge_attributes.get('weight', [0, 1])[0].tolist() == [2, 1]